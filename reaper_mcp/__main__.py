@@ -1,6 +1,9 @@
 import argparse
 import logging
-from reaper_mcp.mcp_core import mcp
+import os
+from reaper_mcp.mcp_core import PROFILES, mcp
+from reaper_mcp.pool import BridgeUnavailable, parse_instances, pool
+from reaper_mcp.tracing import tracer
 
 # Configure logging to help debug validation errors
 logging.basicConfig(
@@ -8,13 +11,7 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
-# Import tool modules so their @mcp.tool functions register
-from reaper_mcp import project as _project  # noqa: F401
-from reaper_mcp import tracks as _tracks  # noqa: F401
-from reaper_mcp import tempo as _tempo  # noqa: F401
-from reaper_mcp import midi as _midi  # noqa: F401
-from reaper_mcp import fx as _fx  # noqa: F401
-from reaper_mcp import samples as _samples  # noqa: F401
+logger = logging.getLogger(__name__)
 
 
 def _parse_args() -> argparse.Namespace:
@@ -39,6 +36,43 @@ def _parse_args() -> argparse.Namespace:
         default=None,
         help="Allowed CORS origin (can be specified multiple times). Only passed if supported.",
     )
+    parser.add_argument(
+        "--instance",
+        dest="instances",
+        action="append",
+        default=None,
+        help=(
+            "REAPER instance as [name=]host:port (web interface port; repeatable). "
+            "Overrides REAPER_MCP_INSTANCES; tools then take an instance argument."
+        ),
+    )
+    parser.add_argument(
+        "--tools",
+        default=os.environ.get("REAPER_MCP_TOOLS", "all"),
+        help=(
+            "Comma-separated tool profiles to expose (default: all, or REAPER_MCP_TOOLS). "
+            f"Available: {', '.join(sorted(PROFILES))}"
+        ),
+    )
+    parser.add_argument(
+        "--trace-dir",
+        default=os.environ.get("REAPER_MCP_TRACE_DIR"),
+        help=(
+            "Write Chrome/Perfetto JSON traces of tool calls here (default: REAPER_MCP_TRACE_DIR). "
+            "Tools then take a trace argument; see also --trace-rate and --profile-tools."
+        ),
+    )
+    parser.add_argument(
+        "--trace-rate",
+        type=float,
+        default=float(os.environ.get("REAPER_MCP_TRACE_RATE", "0") or 0),
+        help="Fraction of tool calls to trace when --trace-dir is set (0..1, default: 0 or REAPER_MCP_TRACE_RATE)",
+    )
+    parser.add_argument(
+        "--profile-tools",
+        default=os.environ.get("REAPER_MCP_PROFILE_TOOLS", ""),
+        help="Comma-separated tools to always trace and run under cProfile (default: REAPER_MCP_PROFILE_TOOLS)",
+    )
     return parser.parse_args()
 
 
@@ -46,6 +80,33 @@ def main():
     """Main entry point for the reaper-mcp CLI."""
     args = _parse_args()
 
+    if args.instances:
+        try:
+            pool.configure(parse_instances(",".join(args.instances)))
+        except ValueError as e:
+            raise SystemExit(str(e))
+    if pool.enabled:
+        logger.info(f"Routing across REAPER instances: {', '.join(pool.instances)}")
+        # Tool modules call RPR functions, which reapy only defines if its default REAPER answered
+        try:
+            pool.load_api()
+        except BridgeUnavailable as e:
+            raise SystemExit(str(e))
+
+    # Tracing must be configured before registration, which adds the trace argument
+    profile_tools = [t.strip() for t in args.profile_tools.split(",") if t.strip()]
+    tracer.configure(args.trace_dir, args.trace_rate, profile_tools)
+    if tracer.enabled:
+        logger.info(f"Tracing tool calls to {tracer.directory} (rate {tracer.rate:g})")
+
+    # Only the selected profiles' modules are imported and registered
+    profiles = [p.strip() for p in args.tools.split(",") if p.strip()] or ["all"]
+    try:
+        modules = mcp.enable(profiles)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    logger.info(f"Enabled tool modules: {', '.join(modules)} ({len(mcp.tool_names)} tools)")
+
     # Build kwargs for mcp.run without signature inspection; FastMCP.run accepts **kwargs
     kw = {"show_banner": False}
 
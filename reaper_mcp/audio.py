@@ -0,0 +1,449 @@
+from __future__ import annotations
+
+import math
+import mmap
+import os
+import re
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from reaper_mcp.cache import CACHE_DIR, DiskLRUCache, LRUCache
+from reaper_mcp.tracing import tracer
+
+# ----------------------
+# Local audio file analysis (no REAPER bridge involved)
+# ----------------------
+
+
+@dataclass(slots=True)
+class WavInfo:
+    channels: int
+    sample_rate: int
+    bits: int
+    is_float: bool
+    data_offset: int
+    data_size: int
+    acid_bpm: Optional[float] = None
+    acid_beats: Optional[int] = None
+
+    @property
+    def frame_size(self) -> int:
+        return self.channels * self.bits // 8
+
+    @property
+    def n_frames(self) -> int:
+        return self.data_size // self.frame_size if self.frame_size else 0
+
+    @property
+    def duration(self) -> float:
+        return self.n_frames / self.sample_rate if self.sample_rate else 0.0
+
+
+def file_key(path: str) -> Tuple[str, int, int]:
+    """Cache key for a file: (absolute path, size, mtime in ns)."""
+    st = os.stat(path)
+    return (str(Path(path).resolve()), st.st_size, st.st_mtime_ns)
+
+
+def read_wav_info(path: str) -> WavInfo:
+    """Parse the RIFF chunks of a WAV file (fmt, data and optional ACID chunk).
+
+    Raises ValueError for anything that is not PCM/float WAV.
+    """
+    with open(path, "rb") as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] not in (b"RIFF", b"RF64") or header[8:12] != b"WAVE":
+            raise ValueError(f"Not a WAV file: {path}")
+        fmt = None
+        data_offset = data_size = None
+        acid_bpm = acid_beats = None
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                break
+            cid, size = chunk[:4], struct.unpack("<I", chunk[4:])[0]
+            if cid == b"fmt ":
+                fmt = f.read(size)
+            elif cid == b"data":
+                data_offset, data_size = f.tell(), size
+                if size == 0xFFFFFFFF:  # RF64 / streaming writers: data runs to EOF
+                    data_size = os.fstat(f.fileno()).st_size - data_offset
+                f.seek(data_size, os.SEEK_CUR)
+            elif cid == b"acid" and size >= 24:
+                acid = f.read(size)
+                _flags, _root, _, _, beats, _den, _num, tempo = struct.unpack("<IHHfIHHf", acid[:24])
+                acid_bpm = float(tempo) if tempo > 0 else None
+                acid_beats = int(beats) if beats > 0 else None
+            else:
+                f.seek(size, os.SEEK_CUR)
+            if size % 2:
+                f.seek(1, os.SEEK_CUR)
+    if fmt is None or data_offset is None:
+        raise ValueError(f"WAV file is missing fmt or data chunk: {path}")
+    tag, channels, sample_rate, _, _, bits = struct.unpack("<HHIIHH", fmt[:16])
+    if tag == 0xFFFE and len(fmt) >= 26:  # WAVE_FORMAT_EXTENSIBLE: real tag is the subformat GUID prefix
+        tag = struct.unpack("<H", fmt[24:26])[0]
+    if tag not in (1, 3) or bits not in (8, 16, 24, 32) or (tag == 3 and bits != 32):
+        raise ValueError(f"Unsupported WAV encoding (format {tag}, {bits} bit): {path}")
+    return WavInfo(channels, sample_rate, bits, tag == 3, data_offset, data_size, acid_bpm, acid_beats)
+
+
+def load_wav_mono(path: str, max_seconds: Optional[float] = None) -> Tuple[np.ndarray, WavInfo]:
+    """Return (mono float32 samples in -1..1, info), reading PCM through a memory map."""
+    info = read_wav_info(path)
+    n = info.n_frames
+    if max_seconds is not None:
+        n = min(n, int(max_seconds * info.sample_rate))
+    with tracer.span("read", "file", path=path, bytes=n * info.frame_size):
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            raw = mm[info.data_offset:info.data_offset + n * info.frame_size]
+    return _decode_pcm(raw, info).mean(axis=1), info
+
+
+def _decode_pcm(raw: bytes, info: WavInfo) -> np.ndarray:
+    """Decode interleaved PCM bytes to a (frames, channels) float32 array."""
+    if info.is_float:
+        data = np.frombuffer(raw, dtype="<f4")
+    elif info.bits == 8:
+        data = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif info.bits == 16:
+        data = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif info.bits == 24:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = (b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)) << 8 >> 8
+        data = ints.astype(np.float32) / 8388608.0
+    else:
+        data = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+    return data.reshape(-1, info.channels)
+
+
+# ----------------------
+# Waveform peaks
+# ----------------------
+_PEAKS_MAGIC = b"RMPK\x01"
+_peak_cache = DiskLRUCache(
+    CACHE_DIR / "peaks",
+    max_bytes=int(os.environ.get("REAPER_MCP_PEAK_CACHE_MB", "256")) * 1024 * 1024,
+    suffix=".peaks",
+)
+
+
+def compute_peaks(path: str, levels: List[int], block_frames: int = 1 << 20) -> Tuple[WavInfo, Dict[int, np.ndarray]]:
+    """Compute min/max peaks of a WAV file at several zoom levels.
+
+    ``levels`` are samples per peak. Returns (info, {level: int16 array of shape
+    (n_peaks, channels, 2)}) where the last axis is (min, max). PCM is read in
+    blocks through a memory map, so memory use does not grow with file size.
+    """
+    info = read_wav_info(path)
+    levels = sorted(set(int(x) for x in levels))
+    if not levels or levels[0] <= 0:
+        raise ValueError("levels must be positive sample counts")
+    # Every level is reduced from one shared fine pass at the levels' common divisor
+    finest = math.gcd(*levels)
+    block_frames = max(finest, block_frames // finest * finest)
+    fine_parts = []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for start in range(0, info.n_frames, block_frames):
+            n = min(block_frames, info.n_frames - start)
+            begin = info.data_offset + start * info.frame_size
+            data = _decode_pcm(mm[begin:begin + n * info.frame_size], info)
+            pad = (-n) % finest
+            if pad:
+                data = np.concatenate([data, np.repeat(data[-1:], pad, axis=0)])
+            blocks = data.reshape(-1, finest, info.channels)
+            fine_parts.append(np.stack([blocks.min(axis=1), blocks.max(axis=1)], axis=-1))
+    fine = np.concatenate(fine_parts) if fine_parts else np.zeros((0, info.channels, 2), dtype=np.float32)
+    peaks: Dict[int, np.ndarray] = {}
+    for level in levels:
+        factor = level // finest
+        p = fine
+        if factor > 1:
+            pad = (-len(fine)) % factor
+            src = np.concatenate([fine, np.repeat(fine[-1:], pad, axis=0)]) if pad else fine
+            grouped = src.reshape(-1, factor, info.channels, 2)
+            p = np.stack([grouped[..., 0].min(axis=1), grouped[..., 1].max(axis=1)], axis=-1)
+        peaks[level] = np.clip(np.rint(p * 32767.0), -32768, 32767).astype("<i2")
+    return info, peaks
+
+
+def _encode_peaks(info: WavInfo, peaks: Dict[int, np.ndarray]) -> bytes:
+    parts = [_PEAKS_MAGIC, struct.pack("<IIHH", info.sample_rate, info.n_frames, info.channels, len(peaks))]
+    for level, p in peaks.items():
+        parts.append(struct.pack("<II", level, len(p)))
+        parts.append(p.tobytes())
+    return b"".join(parts)
+
+
+def _decode_peaks(data: bytes) -> Tuple[int, int, int, Dict[int, np.ndarray]]:
+    if not data.startswith(_PEAKS_MAGIC):
+        raise ValueError("Bad peak cache entry")
+    offset = len(_PEAKS_MAGIC)
+    sample_rate, n_frames, channels, n_levels = struct.unpack_from("<IIHH", data, offset)
+    offset += 12
+    peaks: Dict[int, np.ndarray] = {}
+    for _ in range(n_levels):
+        level, count = struct.unpack_from("<II", data, offset)
+        offset += 8
+        size = count * channels * 2 * 2
+        peaks[level] = np.frombuffer(data, dtype="<i2", count=count * channels * 2, offset=offset).reshape(count, channels, 2)
+        offset += size
+    return sample_rate, n_frames, channels, peaks
+
+
+def get_peaks(path: str, levels: List[int]) -> Tuple[int, int, int, Dict[int, np.ndarray], bool]:
+    """Return (sample_rate, n_frames, channels, peaks, cached), using the on-disk peak cache."""
+    key = (*file_key(path), tuple(sorted(set(int(x) for x in levels))))
+    data = _peak_cache.get(key)
+    if data is not None:
+        try:
+            return (*_decode_peaks(data), True)
+        except (ValueError, struct.error):
+            pass
+    info, peaks = compute_peaks(path, levels)
+    _peak_cache.put(key, _encode_peaks(info, peaks))
+    return info.sample_rate, info.n_frames, info.channels, peaks, False
+
+
+# ----------------------
+# Timbre features for similarity search
+# ----------------------
+N_MFCC = 20
+FEATURE_DIM = 2 * N_MFCC + 7
+
+
+def _mel_filterbank(sample_rate: int, n_fft: int, n_mels: int = 40) -> np.ndarray:
+    def hz_to_mel(f):
+        return 2595.0 * np.log10(1.0 + f / 700.0)
+
+    def mel_to_hz(m):
+        return 700.0 * (10.0 ** (m / 2595.0) - 1.0)
+
+    fmax = min(sample_rate / 2.0, 16000.0)
+    edges = mel_to_hz(np.linspace(hz_to_mel(20.0), hz_to_mel(fmax), n_mels + 2))
+    freqs = np.fft.rfftfreq(n_fft, 1.0 / sample_rate)
+    lower, center, upper = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    up = (freqs[None, :] - lower) / (center - lower)
+    down = (upper - freqs[None, :]) / (upper - center)
+    return np.maximum(0.0, np.minimum(up, down))
+
+
+def features_from_samples(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Describe a sound as a fixed-size vector of spectral/MFCC statistics.
+
+    Layout: MFCC means (20), MFCC std devs (20), then spectral centroid mean/std,
+    roll-off, flatness, zero-crossing rate, RMS and log duration.
+    """
+    win, hop = 2048, 512
+    if len(samples) < win:
+        samples = np.pad(samples, (0, win - len(samples)))
+    n_frames = 1 + (len(samples) - win) // hop
+    idx = np.arange(win)[None, :] + hop * np.arange(n_frames)[:, None]
+    frames = samples[idx]
+    power = np.abs(np.fft.rfft(frames * np.hanning(win), axis=1)) ** 2 + 1e-12
+    freqs = np.fft.rfftfreq(win, 1.0 / sample_rate)
+
+    log_mel = np.log(power @ _mel_filterbank(sample_rate, win).T + 1e-10)
+    n_mels = log_mel.shape[1]
+    dct = np.cos(np.pi / n_mels * (np.arange(n_mels)[None, :] + 0.5) * np.arange(N_MFCC)[:, None])
+    mfcc = log_mel @ dct.T
+
+    total = power.sum(axis=1)
+    centroid = (power * freqs).sum(axis=1) / total
+    rolloff = freqs[np.minimum((np.cumsum(power, axis=1) < 0.85 * total[:, None]).sum(axis=1), len(freqs) - 1)]
+    flatness = np.exp(np.log(power).mean(axis=1)) / power.mean(axis=1)
+    zcr = (np.abs(np.diff(np.signbit(frames), axis=1))).mean(axis=1)
+    rms = np.sqrt((frames ** 2).mean(axis=1))
+    nyquist = sample_rate / 2.0
+    return np.concatenate([
+        mfcc.mean(axis=0),
+        mfcc.std(axis=0),
+        [
+            centroid.mean() / nyquist,
+            centroid.std() / nyquist,
+            rolloff.mean() / nyquist,
+            flatness.mean(),
+            zcr.mean(),
+            np.log10(rms.mean() + 1e-6),
+            np.log10(len(samples) / sample_rate + 1e-3),
+        ],
+    ]).astype(np.float32)
+
+
+def compute_features(path: str) -> Optional[np.ndarray]:
+    """Feature vector for the first 10 seconds of a WAV file, or None if it can't be read."""
+    try:
+        samples, info = load_wav_mono(path, max_seconds=10.0)
+    except (OSError, ValueError):
+        return None
+    if info.sample_rate <= 0 or len(samples) == 0:
+        return None
+    return features_from_samples(samples, info.sample_rate)
+
+
+# ----------------------
+# Tempo estimation
+# ----------------------
+_BPM_TAG = re.compile(r"(?<![\d.])(\d{2,3}(?:\.\d+)?)\s*bpm", re.IGNORECASE)
+_BPM_FIELD = re.compile(r"(?:^|[_\-\s])(\d{2,3})(?=[_\-\s.]|$)")
+_MIN_BPM, _MAX_BPM = 50.0, 250.0
+# Relative distance within which a bare number in the name confirms the onset tempo
+_FIELD_AGREEMENT = 0.04
+
+# (path, size, mtime_ns) -> {"bpm": float | None, "source": str}
+_tempo_cache = LRUCache(maxsize=8192)
+
+
+def tempo_from_filename(path: str) -> Optional[float]:
+    """Read an explicit tempo tag such as "Loop_120bpm.wav" or "Break 96 BPM.wav" from a file name."""
+    for match in _BPM_TAG.finditer(Path(path).stem):
+        bpm = float(match.group(1))
+        if _MIN_BPM <= bpm <= _MAX_BPM:
+            return bpm
+    return None
+
+
+def _tempo_fields(path: str) -> List[float]:
+    """Bare numbers in a file name that could be a tempo ("Break_96_Am.wav").
+
+    Just as often a note, take or model number ("Kick_808.wav", "Vox_Take_64.wav"),
+    so only trusted when the audio agrees.
+    """
+    fields = (float(m.group(1)) for m in _BPM_FIELD.finditer(Path(path).stem))
+    return [bpm for bpm in fields if _MIN_BPM <= bpm <= _MAX_BPM]
+
+
+def _confirmed_field(fields: List[float], onset_bpm: float) -> Optional[float]:
+    """The name field matching ``onset_bpm`` (or its double/half), if any."""
+    for bpm in fields:
+        for candidate in (onset_bpm, onset_bpm * 2.0, onset_bpm / 2.0):
+            if abs(candidate - bpm) / bpm <= _FIELD_AGREEMENT:
+                return bpm
+    return None
+
+
+def tempo_from_onsets(samples: np.ndarray, sample_rate: int) -> Optional[float]:
+    """Estimate tempo by autocorrelating a spectral-flux onset envelope.
+
+    Returns None for material that is too short or shows no clear periodicity.
+    """
+    hop, win = 512, 1024
+    if len(samples) < sample_rate or len(samples) < win * 4:
+        return None
+    n_frames = 1 + (len(samples) - win) // hop
+    idx = np.arange(win)[None, :] + hop * np.arange(n_frames)[:, None]
+    spec = np.abs(np.fft.rfft(samples[idx] * np.hanning(win), axis=1))
+    flux = np.maximum(np.diff(np.log1p(spec), axis=0), 0.0).sum(axis=1)
+    flux -= flux.mean()
+    ac = np.correlate(flux, flux, mode="full")[len(flux) - 1:]
+    if ac[0] <= 0:
+        return None
+    frame_rate = sample_rate / hop
+    lo = max(1, int(frame_rate * 60.0 / _MAX_BPM))
+    hi = min(len(ac) - 1, int(frame_rate * 60.0 / _MIN_BPM))
+    if hi <= lo:
+        return None
+    lags = np.arange(lo, hi + 1)
+    # Log-Gaussian prior around 120 BPM damps octave errors towards very slow tempos
+    prior = np.exp(-0.5 * (np.log2(60.0 * frame_rate / lags / 120.0)) ** 2)
+    lag = int(lags[np.argmax(ac[lo:hi + 1] * prior)])
+    if ac[lag] / ac[0] < 0.1:
+        return None
+    half = lag / 2.0
+    if half >= lo and np.interp(half, np.arange(len(ac)), ac) >= 0.5 * ac[lag]:
+        lag = half
+    bpm = 60.0 * frame_rate / lag
+    # Loops usually span a whole number of bars: snap to the closest exact loop tempo
+    duration = len(samples) / sample_rate
+    beats = round(duration * bpm / 60.0 / 4.0) * 4
+    if beats:
+        exact = beats * 60.0 / duration
+        if abs(exact - bpm) / bpm < 0.04:
+            bpm = exact
+    return bpm
+
+
+def _analyze_tempo(path: str) -> Dict[str, Optional[float]]:
+    """Tempo detection for one file; failures are reported in the result, not raised."""
+    try:
+        return _detect_tempo(path)
+    except Exception as e:
+        return {"bpm": None, "source": None, "error": str(e)}
+
+
+def _detect_tempo(path: str) -> Dict[str, Optional[float]]:
+    """Tempo detection for one file, in order: filename tag, ACID chunk, onset analysis.
+
+    A bare number in the name only replaces the onset estimate when the two agree;
+    one-shots without a detectable tempo get None whatever their name says.
+    """
+    bpm = tempo_from_filename(path)
+    if bpm is not None:
+        return {"bpm": bpm, "source": "filename"}
+    try:
+        info = read_wav_info(path)
+    except (OSError, ValueError):
+        return {"bpm": None, "source": None}
+    if info.acid_bpm:
+        return {"bpm": info.acid_bpm, "source": "acid"}
+    if info.acid_beats and info.duration:
+        return {"bpm": info.acid_beats * 60.0 / info.duration, "source": "acid"}
+    samples, info = load_wav_mono(path, max_seconds=60.0)
+    bpm = tempo_from_onsets(samples, info.sample_rate)
+    if bpm is not None:
+        field = _confirmed_field(_tempo_fields(path), bpm)
+        if field is not None:
+            return {"bpm": field, "source": "filename+onsets"}
+    return {"bpm": bpm, "source": "onsets"}
+
+
+def estimate_tempos(paths: List[str], max_workers: Optional[int] = None) -> Dict[str, Dict[str, Optional[float]]]:
+    """Return cached tempo estimates for ``paths``, analysing uncached files in a process pool.
+
+    A file that cannot be analysed gets ``{"bpm": None, "error": ...}`` without failing the rest.
+    """
+    results: Dict[str, Dict[str, Optional[float]]] = {}
+    pending: Dict[str, Tuple[str, int, int]] = {}
+    for path in dict.fromkeys(paths):
+        try:
+            key = file_key(path)
+        except OSError as e:
+            results[path] = {"bpm": None, "source": None, "error": str(e)}
+            continue
+        cached = _tempo_cache.get(key)
+        if cached is not None:
+            results[path] = cached
+        else:
+            pending[path] = key
+    if len(pending) == 1:
+        path = next(iter(pending))
+        results[path] = _analyze_tempo(path)
+    elif pending:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            for path, res in zip(pending, pool.map(_analyze_tempo, pending)):
+                results[path] = res
+    for path, key in pending.items():
+        if "error" not in results[path]:
+            _tempo_cache.put(key, results[path])
+    return {path: results[path] for path in dict.fromkeys(paths)}
+
+
+__all__ = [
+    "WavInfo",
+    "file_key",
+    "read_wav_info",
+    "load_wav_mono",
+    "FEATURE_DIM",
+    "compute_features",
+    "features_from_samples",
+    "compute_peaks",
+    "get_peaks",
+    "tempo_from_filename",
+    "tempo_from_onsets",
+    "estimate_tempos",
+]
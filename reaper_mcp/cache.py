@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional, TypeVar
+
+from reaper_mcp.tracing import tracer
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Kept free of reapy imports so worker processes can use it without a bridge.
+
+
+def _default_cache_dir() -> Path:
+    if os.name == "nt":
+        base = Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local")
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return base / "reaper-mcp"
+
+
+# Root for on-disk caches; override with REAPER_MCP_CACHE_DIR
+CACHE_DIR = Path(os.environ.get("REAPER_MCP_CACHE_DIR") or _default_cache_dir())
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    """Write ``data`` to ``path`` via a temp file + rename so readers never see partial data."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with tracer.span("write", "file", path=str(path), bytes=len(data)):
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class LRUCache:
+    """Small thread-safe LRU mapping with a maximum entry count."""
+
+    def __init__(self, maxsize: int = 128) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+                return self._data[key]
+            except KeyError:
+                return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class DiskLRUCache:
+    """Directory of binary blobs with least-recently-used eviction by total size.
+
+    Reads refresh a file's mtime, which doubles as its recency for eviction.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, suffix: str = ".bin") -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._lock = threading.Lock()
+
+    def _path(self, key: Hashable) -> Path:
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}{self.suffix}"
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with tracer.span("read", "file", path=str(path)):
+                data = path.read_bytes()
+            os.utime(path)
+            return data
+        except OSError:
+            return None
+
+    def put(self, key: Hashable, data: bytes) -> None:
+        atomic_write(self._path(key), data)
+        self._evict()
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = []
+            for path in self.directory.glob(f"*{self.suffix}"):
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    path.unlink()
+                    total -= size
+                except OSError:
+                    pass
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+def single_flight(
+    ttl: float = 0.0, maxsize: int = 128, scope: Optional[Callable[[], Hashable]] = None
+) -> Callable[[F], F]:
+    """Share one execution of a read between concurrent identical calls.
+
+    Calls are keyed by their bound arguments (defaults applied). While a call is in
+    flight, identical calls wait for it and receive the same result or exception.
+    With ``ttl`` > 0 results are also reused for that many seconds; tool error
+    results (dicts with an "error" key) are shared with waiters but never cached.
+    ``scope`` adds ambient state to the key (e.g. which REAPER instance is targeted).
+    Apply below ``@mcp.tool()`` so the tool keeps the wrapped function's signature.
+    """
+
+    def decorator(fn: F) -> F:
+        signature = inspect.signature(fn)
+        lock = threading.Lock()
+        flights: Dict[str, _Flight] = {}
+        results = LRUCache(maxsize=maxsize)
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = json.dumps([scope() if scope else None, bound.arguments], sort_keys=True, default=repr)
+            if ttl > 0:
+                hit = results.get(key)
+                if hit is not None and hit[0] > time.monotonic():
+                    return hit[1]
+            with lock:
+                flight = flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = flights[key] = _Flight()
+            if not leader:
+                flight.done.wait()
+                if flight.error is not None:
+                    raise flight.error
+                return flight.result
+            try:
+                flight.result = fn(*args, **kwargs)
+                is_error = isinstance(flight.result, dict) and "error" in flight.result
+                if ttl > 0 and not is_error:
+                    results.put(key, (time.monotonic() + ttl, flight.result))
+                return flight.result
+            except BaseException as e:
+                flight.error = e
+                raise
+            finally:
+                with lock:
+                    del flights[key]
+                flight.done.set()
+
+        wrapper.cache_clear = results.clear  # type: ignore[attr-defined]
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+__all__ = ["CACHE_DIR", "DiskLRUCache", "LRUCache", "atomic_write", "single_flight"]
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import reapy
+from reapy import reascript_api as RPR
+
+from reaper_mcp.audio import file_key
+from reaper_mcp.cache import LRUCache
+from reaper_mcp.tracing import tracer
+
+# Initial buffer for reading state chunks; grown automatically for bigger tracks
+CHUNK_BUFFER_SIZE = 1 << 20
+_MAX_CHUNK_BUFFER_SIZE = 1 << 28
+
+_GUID_RE = re.compile(r"\{[0-9A-Fa-f]{8}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{12}\}")
+_AUXRECV_RE = re.compile(r"^(\s*AUXRECV\s+)(-?\d+)(.*)$", re.MULTILINE)
+
+# template file content hash -> tuple of track chunks
+_templates = LRUCache(maxsize=32)
+# (path, size, mtime) -> content hash, so unchanged files are not re-read
+_template_digests = LRUCache(maxsize=256)
+
+
+def get_track_chunk(track_id: str) -> str:
+    """Read a track's full state chunk (FX, items, envelopes, receives)."""
+    size = CHUNK_BUFFER_SIZE
+    while True:
+        ok, _, chunk, _, _ = RPR.GetTrackStateChunk(track_id, "", size, False)
+        if not ok:
+            raise RuntimeError("GetTrackStateChunk failed")
+        # A result that fills the buffer may have been truncated
+        if len(chunk) < size - 1 or size >= _MAX_CHUNK_BUFFER_SIZE:
+            return chunk
+        size *= 4
+
+
+def set_track_chunk(track_id: str, chunk: str) -> None:
+    if not RPR.SetTrackStateChunk(track_id, chunk, False):
+        raise RuntimeError("SetTrackStateChunk failed")
+
+
+def new_guid() -> str:
+    return "{" + str(uuid.uuid4()).upper() + "}"
+
+
+def regenerate_guids(chunk: str) -> str:
+    """Give every GUID in ``chunk`` a fresh value, consistently within the chunk.
+
+    Needed whenever a chunk is applied to a new track, otherwise REAPER would see
+    duplicate track/item/take/FX/envelope GUIDs.
+    """
+    mapping: Dict[str, str] = {}
+
+    def replace(m: re.Match) -> str:
+        old = m.group(0).upper()
+        if old not in mapping:
+            mapping[old] = new_guid()
+        return mapping[old]
+
+    return _GUID_RE.sub(replace, chunk)
+
+
+def rewrite_receives(chunk: str, remap: Callable[[int], Optional[int]]) -> str:
+    """Rewrite the source track index of every AUXRECV line; ``remap`` returning None drops it."""
+
+    def replace(m: re.Match) -> str:
+        new = remap(int(m.group(2)))
+        return "" if new is None else f"{m.group(1)}{new}{m.group(3)}"
+
+    rewritten = _AUXRECV_RE.sub(replace, chunk)
+    return re.sub(r"\n\s*\n", "\n", rewritten)
+
+
+def split_blocks(text: str, tag: str) -> List[str]:
+    """Return the top-level ``<TAG ...>`` blocks of ``text`` (e.g. the tracks of a template)."""
+    blocks: List[str] = []
+    current: List[str] = []
+    depth = 0
+    for line in text.splitlines():
+        stripped = line.strip()
+        if depth == 0:
+            if stripped.startswith("<" + tag) and (len(stripped) == len(tag) + 1 or stripped[len(tag) + 1] in " \t"):
+                current = [line]
+                depth = 1
+            continue
+        current.append(line)
+        if stripped.startswith("<"):
+            depth += 1
+        elif stripped.startswith(">"):
+            depth -= 1
+            if depth == 0:
+                blocks.append("\n".join(current))
+    return blocks
+
+
+def find_block(chunk: str, tag: str) -> Optional[Tuple[int, int]]:
+    """``(start, end)`` offsets of the first ``<TAG`` block directly inside the chunk's outer block."""
+    depth = 0
+    pos = 0
+    start = None
+    for line in chunk.splitlines(keepends=True):
+        stripped = line.strip()
+        if stripped.startswith("<"):
+            depth += 1
+            if depth == 2 and start is None and stripped[1:].split(None, 1)[0] == tag:
+                start = pos
+        elif stripped.startswith(">"):
+            if start is not None and depth == 2:
+                return start, pos + len(line)
+            depth -= 1
+        pos += len(line)
+    return None
+
+
+# Window/display state at the top of an <FXCHAIN> block; not part of .RfxChain files
+_FXCHAIN_HEADER_KEYS = ("WNDRECT", "SHOW", "LASTSEL", "DOCKED")
+
+
+def extract_fx_chain(track_chunk: str) -> str:
+    """Return a track's FX chain in .RfxChain form (the FXCHAIN body without window state)."""
+    span = find_block(track_chunk, "FXCHAIN")
+    if span is None:
+        return ""
+    lines = track_chunk[span[0]:span[1]].splitlines()[1:-1]
+    i = 0
+    while i < len(lines) and lines[i].split(None, 1)[0] in _FXCHAIN_HEADER_KEYS:
+        i += 1
+    return "\n".join(line.strip() for line in lines[i:])
+
+
+def apply_fx_chain(track_chunk: str, fx_chain: str, append: bool = False) -> str:
+    """Return ``track_chunk`` with its FX chain replaced by (or extended with) ``fx_chain``.
+
+    FX GUIDs in ``fx_chain`` are regenerated so the same snapshot can be loaded on many tracks.
+    """
+    body = regenerate_guids(fx_chain.strip())
+    span = find_block(track_chunk, "FXCHAIN")
+    if span is None:
+        block = f"<FXCHAIN\nSHOW 0\nLASTSEL 0\nDOCKED 0\n{body}\n>\n" if body else ""
+        # FX chains sit before the track's items; fall back to just before the closing ">"
+        item = find_block(track_chunk, "ITEM")
+        at = item[0] if item is not None else track_chunk.rstrip().rfind(">")
+        return track_chunk[:at] + block + track_chunk[at:]
+    lines = track_chunk[span[0]:span[1]].splitlines()
+    header = [lines[0]]
+    i = 1
+    while i < len(lines) - 1 and lines[i].split(None, 1)[0] in _FXCHAIN_HEADER_KEYS:
+        header.append(lines[i])
+        i += 1
+    kept = lines[i:-1] if append else []
+    block = "\n".join(header + kept + ([body] if body else []) + [lines[-1]]) + "\n"
+    return track_chunk[:span[0]] + block + track_chunk[span[1]:]
+
+
+def resolve_track_template(name_or_path: str) -> Path:
+    """Find a track template by path, or by name under REAPER's TrackTemplates folder."""
+    path = Path(name_or_path).expanduser()
+    if path.is_file():
+        return path
+    base = Path(reapy.get_resource_path()) / "TrackTemplates"
+    for candidate in (base / name_or_path, base / f"{name_or_path}.RTrackTemplate"):
+        if candidate.is_file():
+            return candidate
+    matches = sorted(base.rglob(f"{Path(name_or_path).stem}.RTrackTemplate")) if base.is_dir() else []
+    if matches:
+        return matches[0]
+    raise FileNotFoundError(f"Track template not found: {name_or_path}")
+
+
+def load_track_template(path: Path) -> Tuple[str, ...]:
+    """Track chunks of a .RTrackTemplate file, parsed once per distinct file content."""
+    key = file_key(str(path))
+    digest = _template_digests.get(key)
+    chunks = _templates.get(digest) if digest is not None else None
+    if chunks is None:
+        with tracer.span("read", "file", path=str(path)):
+            data = Path(path).read_bytes()
+        digest = hashlib.sha1(data).hexdigest()
+        _template_digests.put(key, digest)
+        chunks = _templates.get(digest)
+        if chunks is None:
+            chunks = tuple(split_blocks(data.decode("utf-8", errors="replace"), "TRACK"))
+            if not chunks:
+                raise ValueError(f"No tracks found in template: {path}")
+            _templates.put(digest, chunks)
+    return chunks
+
+
+__all__ = [
+    "apply_fx_chain",
+    "extract_fx_chain",
+    "find_block",
+    "get_track_chunk",
+    "load_track_template",
+    "new_guid",
+    "regenerate_guids",
+    "resolve_track_template",
+    "rewrite_receives",
+    "set_track_chunk",
+    "split_blocks",
+]
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from reapy import reascript_api as RPR
+
+from reaper_mcp.mcp_core import mcp
+from reaper_mcp.pool import pool
+from reaper_mcp.util import bridge_batch, current_project, note_local_write, selected_project, use_project
+
+logger = logging.getLogger(__name__)
+
+# Applies one coalesced write: (project, target, value)
+Applier = Callable[[Any, Tuple, float], None]
+
+
+class WriteCoalescer:
+    """Buffers high-frequency setter calls and writes only the latest value per target.
+
+    Each submitted write gets a ticket. Writes to the same (kind, target) within
+    ``window`` seconds replace each other; the surviving values are applied together
+    in one bridge batch. A ticket counts as acknowledged once a flush covering it has
+    run, including superseded writes whose newer value was applied instead.
+
+    Submitting never blocks: a dedicated flusher thread waits out the window and
+    applies the batch. Its reapy calls go through the pool's per-instance connection
+    lock like any tool call's, so they never interleave with other bridge requests.
+    """
+
+    def __init__(self, window: float) -> None:
+        self.window = window
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+        self._wake = threading.Condition(self._lock)
+        self._worker: Optional[threading.Thread] = None
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[Tuple[Optional[str], Any, str, Hashable], Tuple[float, int]] = {}
+        # (instance, project id) -> selected reapy.Project, for writes made with an explicit project tab
+        self._projects: Dict[Tuple[Optional[str], str], Any] = {}
+        self._appliers: Dict[str, Applier] = {}
+        self._scheduled = False
+        self._next_ticket = 1
+        self._done_through = 0
+        self._errors: Dict[int, str] = {}
+        self.submitted = 0
+        self.written = 0
+
+    def register(self, kind: str, applier: Applier) -> None:
+        self._appliers[kind] = applier
+
+    def submit(self, kind: str, target: Tuple, value: float) -> int:
+        if kind not in self._appliers:
+            raise KeyError(f"No applier registered for '{kind}'")
+        with self._lock:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            # Targets are per REAPER instance and project tab; the flush routes each write back to them
+            instance = pool.current_name()
+            project = selected_project()
+            if project is not None:
+                self._projects[(instance, project.id)] = project
+            project_id = project.id if project is not None else None
+            self._pending[(instance, project_id, kind, target)] = (value, ticket)
+            self.submitted += 1
+            if not self._scheduled:
+                self._scheduled = True
+                self._wake.notify()
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="write-coalescer", daemon=True)
+                self._worker.start()
+        return ticket
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                self._wake.wait_for(lambda: self._scheduled)
+            time.sleep(self.window)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Coalesced write flush failed: {e}", exc_info=True)
+
+    def flush(self) -> Dict[str, Any]:
+        """Apply all pending writes now, in one bridge batch per REAPER instance and project tab."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                projects, self._projects = self._projects, {}
+                self._scheduled = False
+                through = self._next_ticket - 1
+            errors: Dict[int, str] = {}
+            groups: Dict[Tuple[Optional[str], Any], list] = {}
+            for (instance, project_id, kind, target), (value, ticket) in batch.items():
+                groups.setdefault((instance, project_id), []).append((kind, target, value, ticket))
+            for (instance, project_id), writes in groups.items():
+                route = pool.use(instance) if instance is not None else nullcontext()
+                try:
+                    with route, use_project(projects.get((instance, project_id))):
+                        project = current_project()
+                        with bridge_batch():
+                            for kind, target, value, ticket in writes:
+                                try:
+                                    self._appliers[kind](project, target, value)
+                                except Exception as e:
+                                    errors[ticket] = f"{kind} {list(target)}: {e}"
+                except Exception as e:
+                    logger.error(f"Coalesced write flush failed: {e}", exc_info=True)
+                    errors.update({w[3]: str(e) for w in writes})
+            if batch:
+                note_local_write()
+            with self._lock:
+                self.written += len(batch) - len(errors)
+                self._errors.update(errors)
+                for old in sorted(self._errors)[:-1000]:
+                    del self._errors[old]
+                self._done_through = max(self._done_through, through)
+                self._done.notify_all()
+        return {"written": len(batch) - len(errors), "through_ticket": through, "errors": list(errors.values())}
+
+    def status(self, ticket: int, wait: bool = False, timeout: float = 1.0) -> Dict[str, Any]:
+        with self._lock:
+            if wait:
+                self._done.wait_for(lambda: self._done_through >= ticket, timeout)
+            return {
+                "ticket": ticket,
+                "acknowledged": self._done_through >= ticket,
+                "error": self._errors.get(ticket),
+            }
+
+
+def _track_id(project, index: int) -> str:
+    if index < 0 or index >= RPR.CountTracks(project.id):
+        raise IndexError(f"Track index out of range: {index}")
+    return RPR.GetTrack(project.id, index)
+
+
+def _set_track_volume(project, target: Tuple, value: float) -> None:
+    RPR.SetMediaTrackInfo_Value(_track_id(project, target[0]), "D_VOL", value)
+
+
+def _set_track_pan(project, target: Tuple, value: float) -> None:
+    RPR.SetMediaTrackInfo_Value(_track_id(project, target[0]), "D_PAN", value)
+
+
+def _set_fx_param(project, target: Tuple, value: float) -> None:
+    track_index, fx_index, param_index = target
+    if not RPR.TrackFX_SetParamNormalized(_track_id(project, track_index), fx_index, param_index, value):
+        raise IndexError(f"FX {fx_index} parameter {param_index} not found")
+
+
+coalescer = WriteCoalescer(window=float(os.environ.get("REAPER_MCP_COALESCE_MS", "20")) / 1000.0)
+coalescer.register("track_volume", _set_track_volume)
+coalescer.register("track_pan", _set_track_pan)
+coalescer.register("fx_param", _set_fx_param)
+atexit.register(coalescer.flush)
+
+
+@mcp.tool()
+def flush_writes() -> Dict[str, Any]:
+    """Apply all queued coalesced writes (setters called with coalesce=True) immediately.
+
+    Returns:
+        Dict with the number of writes applied, the highest ticket now acknowledged,
+        any errors, and running totals of submitted vs. written values
+    """
+    try:
+        result = coalescer.flush()
+        return {"ok": True, **result, "submitted_total": coalescer.submitted, "written_total": coalescer.written}
+    except Exception as e:
+        return {"error": f"Failed to flush writes: {e}"}
+
+
+@mcp.tool()
+def get_write_status(ticket: int, wait: bool = True, timeout: float = 1.0) -> Dict[str, Any]:
+    """Check (or wait for) acknowledgement of a coalesced write.
+
+    Args:
+        ticket: Ticket returned by a setter called with coalesce=True
+        wait: Block until the write is applied or timeout elapses
+        timeout: Maximum seconds to wait
+
+    Returns:
+        Dict with acknowledged (True once applied or superseded by a newer applied value
+        for the same target) and error (if applying the value failed)
+    """
+    try:
+        return coalescer.status(int(ticket), wait=bool(wait), timeout=max(0.0, float(timeout)))
+    except Exception as e:
+        return {"error": f"Failed to get write status: {e}"}
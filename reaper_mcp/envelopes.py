@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from reapy import reascript_api as RPR
+
+from reaper_mcp.chunks import find_block, get_track_chunk, new_guid, set_track_chunk
+from reaper_mcp.mcp_core import mcp
+from reaper_mcp.util import bridge_batch, current_project
+
+logger = logging.getLogger(__name__)
+
+# REAPER envelope point shapes
+SHAPES = {"linear": 0, "square": 1, "slow": 2, "fast_start": 3, "fast_end": 4, "bezier": 5}
+# Built-in track envelopes by chunk name
+_TRACK_ENVELOPES = {"volume": "VOLENV2", "pan": "PANENV2"}
+CURVES = ("linear", "exponential", "logarithmic", "scurve", "sine", "triangle", "square", "saw")
+# Volume levels (dB) at which REAPER's envelope scaling curve is sampled, once per scaling mode
+_SCALE_KNOTS_DB = np.arange(-150.0, 24.5, 0.5)
+_scale_tables: Dict[int, np.ndarray] = {}
+
+
+def _shape_code(shape: Any) -> int:
+    if isinstance(shape, str):
+        if shape not in SHAPES:
+            raise ValueError(f"Unknown shape '{shape}' (valid: {', '.join(SHAPES)})")
+        return SHAPES[shape]
+    code = int(shape)
+    if not 0 <= code <= 5:
+        raise ValueError(f"shape must be 0-5, got {shape}")
+    return code
+
+
+def generate_curve(spec: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Generate ``(times, values, shapes)`` for a curve spec, vectorized.
+
+    Ramps ("linear", "scurve") map to two points using REAPER's own point shapes;
+    "exponential"/"logarithmic" ramps and LFOs ("sine", "triangle", "square", "saw")
+    are sampled at ``resolution`` points per second (or cycle vertices where exact).
+    """
+    kind = spec.get("type", "linear")
+    if kind not in CURVES:
+        raise ValueError(f"Unknown curve type '{kind}' (valid: {', '.join(CURVES)})")
+    t0, t1 = float(spec["start"]), float(spec["end"])
+    if t1 <= t0:
+        raise ValueError("curve end must be after start")
+    v0 = float(spec.get("from", 0.0))
+    v1 = float(spec.get("to", 1.0))
+    resolution = float(spec.get("resolution", 50.0))
+
+    if kind in ("linear", "scurve"):
+        shape = SHAPES["linear"] if kind == "linear" else SHAPES["slow"]
+        return np.array([t0, t1]), np.array([v0, v1]), np.array([shape, shape])
+    if kind in ("exponential", "logarithmic"):
+        n = max(2, int(np.ceil((t1 - t0) * resolution)) + 1)
+        x = np.linspace(0.0, 1.0, n)
+        k = float(spec.get("steepness", 4.0))
+        y = np.expm1(k * x) / np.expm1(k)
+        if kind == "logarithmic":
+            y = 1.0 - y[::-1]
+        return t0 + x * (t1 - t0), v0 + y * (v1 - v0), np.zeros(n, dtype=np.int64)
+
+    # LFOs oscillate between "from" and "to" at "frequency" Hz
+    freq = float(spec.get("frequency", 1.0))
+    if freq <= 0:
+        raise ValueError("frequency must be positive")
+    phase = float(spec.get("phase", 0.0))
+    lo, hi = v0, v1
+    period = 1.0 / freq
+    if kind == "sine":
+        n = max(2, int(np.ceil((t1 - t0) * max(resolution, 8.0 * freq))) + 1)
+        t = np.linspace(t0, t1, n)
+        y = 0.5 + 0.5 * np.sin(2.0 * np.pi * (freq * (t - t0) + phase))
+        return t, lo + y * (hi - lo), np.zeros(n, dtype=np.int64)
+    # Position in cycles; the shapes below are functions of its fractional part
+    u0, u1 = phase, (t1 - t0) * freq + phase
+    if kind == "saw":
+        # Ramp up each cycle, jump back at cycle start
+        vertices = _cycle_vertices(u0, u1, 1)
+        jumps = t0 + (vertices - phase) * period
+        eps = period * 1e-6
+        t = np.concatenate([[t0], np.column_stack([jumps - eps, jumps]).ravel(), [t1]])
+        y = np.concatenate([[u0 % 1.0], np.tile([1.0, 0.0], len(vertices)), [_left_frac(u1)]])
+        shapes = np.concatenate([
+            [SHAPES["linear"]],
+            np.tile([SHAPES["square"], SHAPES["linear"]], len(vertices)),
+            [SHAPES["linear"]],
+        ]).astype(np.int64)
+        return t, lo + y * (hi - lo), shapes
+    # Triangle and square change course every half cycle
+    vertices = _cycle_vertices(u0, u1, 2)
+    u = np.concatenate([[u0], vertices, [u1]])
+    t = t0 + (u - phase) * period
+    if kind == "triangle":
+        y = 1.0 - np.abs(2.0 * (u % 1.0) - 1.0)
+        return t, lo + y * (hi - lo), np.zeros(len(t), dtype=np.int64)
+    # Square: high for the first half of each cycle; every point holds its level until the next
+    mid = np.append((u[:-1] + u[1:]) / 2.0, u1)
+    y = np.where(mid % 1.0 < 0.5, hi, lo)
+    if len(y) > 1:
+        y[-1] = y[-2]
+    return t, y, np.full(len(t), SHAPES["square"], dtype=np.int64)
+
+
+def _cycle_vertices(u0: float, u1: float, per_cycle: int) -> np.ndarray:
+    """Multiples of ``1 / per_cycle`` strictly between cycle positions ``u0`` and ``u1``."""
+    k = np.arange(np.floor(u0 * per_cycle) + 1, np.ceil(u1 * per_cycle)) / per_cycle
+    return k[(k > u0 + 1e-9) & (k < u1 - 1e-9)]
+
+
+def _left_frac(u: float) -> float:
+    """Fractional cycle position approached from below (1.0 rather than 0.0 at a cycle end)."""
+    f = u % 1.0
+    return 1.0 if f < 1e-9 and u > 0 else f
+
+
+def thin_points(times: np.ndarray, values: np.ndarray, tolerance: float) -> np.ndarray:
+    """Indices to keep so linear interpolation stays within ``tolerance`` (Ramer-Douglas-Peucker)."""
+    n = len(times)
+    if n <= 2 or tolerance <= 0:
+        return np.arange(n)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        seg_t = times[a + 1:b]
+        span = times[b] - times[a]
+        frac = (seg_t - times[a]) / span if span > 0 else np.zeros(len(seg_t))
+        err = np.abs(values[a + 1:b] - (values[a] + frac * (values[b] - values[a])))
+        i = int(np.argmax(err))
+        if err[i] > tolerance:
+            m = a + 1 + i
+            keep[m] = True
+            stack.append((a, m))
+            stack.append((m, b))
+    return np.flatnonzero(keep)
+
+
+def _scale_to_envelope_mode(mode: int, values: np.ndarray) -> np.ndarray:
+    """Vectorized ``ScaleToEnvelopeMode`` for volume amplitudes.
+
+    REAPER's scaling (e.g. fader scaling) is a fixed function of the level in dB: it
+    is sampled through the bridge on first use per mode and interpolated from then on.
+    """
+    table = _scale_tables.get(mode)
+    if table is None:
+        # Silence (-inf dB) first, then the knots
+        amplitudes = np.concatenate([[0.0], np.power(10.0, _SCALE_KNOTS_DB / 20.0)])
+        table = np.array([RPR.ScaleToEnvelopeMode(mode, float(a)) for a in amplitudes])
+        _scale_tables[mode] = table
+    db = 20.0 * np.log10(np.maximum(values, 1e-300))
+    return np.where(db < _SCALE_KNOTS_DB[0], table[0], np.interp(db, _SCALE_KNOTS_DB, table[1:]))
+
+
+def _track_envelope(track_id: str, name: str) -> str:
+    """Return the track's built-in envelope, creating (and showing) it if needed."""
+    chunk_name = _TRACK_ENVELOPES[name]
+    env = RPR.GetTrackEnvelopeByChunkName(track_id, f"<{chunk_name}")
+    if not str(env).endswith("0x0000000000000000"):
+        return env
+    chunk = get_track_chunk(track_id)
+    block = f"<{chunk_name}\nEGUID {new_guid()}\nACT 1 -1\nVIS 1 1 1\nLANEHEIGHT 0 0\nARM 0\nDEFSHAPE 0 -1 -1\n>\n"
+    # Track envelopes sit before the FX chain and items
+    anchor = find_block(chunk, "FXCHAIN") or find_block(chunk, "ITEM")
+    at = anchor[0] if anchor is not None else chunk.rstrip().rfind(">")
+    set_track_chunk(track_id, chunk[:at] + block + chunk[at:])
+    env = RPR.GetTrackEnvelopeByChunkName(track_id, f"<{chunk_name}")
+    if str(env).endswith("0x0000000000000000"):
+        raise RuntimeError(f"Could not create {name} envelope")
+    return env
+
+
+@mcp.tool()
+def write_envelope(
+    track_index: int,
+    envelope: str = "volume",
+    points: Optional[List[Dict[str, Any]]] = None,
+    curve: Optional[Dict[str, Any]] = None,
+    fx_index: Optional[int] = None,
+    param_index: Optional[int] = None,
+    thin_tolerance: float = 0.0,
+    clear_existing: bool = True,
+) -> Dict[str, Any]:
+    """Write automation points to a track volume/pan or FX parameter envelope in one batch.
+
+    Points are inserted unsorted and sorted once at the end; the envelope is created if
+    it does not exist yet. All points land in a single undo point.
+
+    Args:
+        track_index: Track index (0-based)
+        envelope: "volume" (values as amplitude, 1.0 = 0dB), "pan" (-1.0 left to 1.0 right)
+            or "fx" (normalized 0..1 parameter values; needs fx_index and param_index)
+        points: List of {"time": seconds, "value": v, "shape": 0-5 or name, "tension": -1..1}.
+            Shapes: linear, square, slow, fast_start, fast_end, bezier. Default linear.
+        curve: Generate points locally instead of (or in addition to) points:
+            {"type": "linear"|"scurve"|"exponential"|"logarithmic"|"sine"|"triangle"|"square"|"saw",
+             "start": s, "end": s, "from": v, "to": v, "resolution": points/s (default 50),
+             "frequency": Hz for LFOs, "phase": 0..1 (fraction of a cycle), "steepness": for exponential/logarithmic}
+        fx_index: FX index on the track (envelope="fx")
+        param_index: Parameter index of that FX (envelope="fx")
+        thin_tolerance: Drop points whose removal changes the linear curve by at most this
+            much (in the value units above); 0 disables thinning
+        clear_existing: Delete existing points in the written time range first
+
+    Returns:
+        Dict with the number of points written and the time range
+    """
+    logger.info(
+        f"write_envelope called with track_index={track_index}, envelope={envelope}, "
+        f"points={len(points) if points else 0}, curve={curve}"
+    )
+    try:
+        if envelope not in ("volume", "pan", "fx"):
+            return {"error": f"Unknown envelope '{envelope}' (expected 'volume', 'pan' or 'fx')"}
+        if envelope == "fx" and (fx_index is None or param_index is None):
+            return {"error": "fx_index and param_index are required for envelope='fx'"}
+        try:
+            times, values, shapes, tensions = [], [], [], []
+            for p in points or []:
+                times.append(float(p["time"]))
+                values.append(float(p["value"]))
+                shapes.append(_shape_code(p.get("shape", 0)))
+                tensions.append(float(p.get("tension", 0.0)))
+            t = np.asarray(times, dtype=np.float64)
+            v = np.asarray(values, dtype=np.float64)
+            s = np.asarray(shapes, dtype=np.int64)
+            tension = np.asarray(tensions, dtype=np.float64)
+            if curve:
+                ct, cv, cs = generate_curve(curve)
+                t, v, s = np.concatenate([t, ct]), np.concatenate([v, cv]), np.concatenate([s, cs])
+                tension = np.concatenate([tension, np.zeros(len(ct))])
+        except (KeyError, ValueError, TypeError) as e:
+            return {"error": f"Invalid points/curve: {e}"}
+        if len(t) == 0:
+            return {"error": "No points given"}
+        if np.any(t < 0):
+            return {"error": "Point times must be >= 0"}
+
+        order = np.argsort(t, kind="stable")
+        t, v, s, tension = t[order], v[order], s[order], tension[order]
+        if thin_tolerance > 0 and not np.any(s) and not np.any(tension):
+            keep = thin_points(t, v, float(thin_tolerance))
+            t, v, s, tension = t[keep], v[keep], s[keep], tension[keep]
+        if envelope == "volume":
+            v = np.maximum(v, 0.0)
+        elif envelope == "pan":
+            # Pan envelopes store right as -1 (inverse of D_PAN)
+            v = -np.clip(v, -1.0, 1.0)
+        else:
+            v = np.clip(v, 0.0, 1.0)
+
+        project = current_project()
+        n_tracks = project.n_tracks
+        if track_index < 0 or track_index >= n_tracks:
+            return {"error": f"Track index out of range: {track_index} (valid: 0-{n_tracks-1})"}
+        with bridge_batch("Write envelope"):
+            track_id = RPR.GetTrack(project.id, int(track_index))
+            if envelope == "fx":
+                if not 0 <= fx_index < RPR.TrackFX_GetCount(track_id):
+                    return {"error": f"FX index out of range: {fx_index}"}
+                if not 0 <= param_index < RPR.TrackFX_GetNumParams(track_id, fx_index):
+                    return {"error": f"Parameter index out of range: {param_index}"}
+                env = RPR.GetFXEnvelope(track_id, int(fx_index), int(param_index), True)
+                _, _, _, _, pmin, pmax = RPR.TrackFX_GetParam(track_id, int(fx_index), int(param_index), 0, 0)
+                v = pmin + v * (pmax - pmin)
+            else:
+                env = _track_envelope(track_id, envelope)
+            if envelope == "volume":
+                mode = RPR.GetEnvelopeScalingMode(env)
+                if mode:
+                    v = _scale_to_envelope_mode(mode, v)
+            if clear_existing:
+                RPR.DeleteEnvelopePointRange(env, float(t[0]) - 1e-9, float(t[-1]) + 1e-9)
+            for ti, vi, si, te in zip(t.tolist(), v.tolist(), s.tolist(), tension.tolist()):
+                RPR.InsertEnvelopePoint(env, ti, vi, si, te, False, True)
+            RPR.Envelope_SortPoints(env)
+        logger.info(f"Wrote {len(t)} points to {envelope} envelope on track {track_index}")
+        return {"ok": True, "points": int(len(t)), "start": float(t[0]), "end": float(t[-1])}
+    except Exception as e:
+        error_msg = f"Failed to write envelope: {e}"
+        logger.error(error_msg, exc_info=True)
+        return {"error": error_msg}
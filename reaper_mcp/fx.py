@@ -1,35 +1,108 @@
 from __future__ import annotations
 
+import re
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import reapy
+from reapy import reascript_api as RPR
 
+from reaper_mcp.audio import file_key
+from reaper_mcp.cache import LRUCache, atomic_write, single_flight
+from reaper_mcp.chunks import apply_fx_chain, extract_fx_chain, get_track_chunk, set_track_chunk
+from reaper_mcp.coalesce import coalescer
 from reaper_mcp.mcp_core import mcp
+from reaper_mcp.rpp import read_rpp
+from reaper_mcp.snapshot import collect_snapshot
+from reaper_mcp.tracing import tracer
+from reaper_mcp.util import DATA_DIR, bridge_batch, cache_scope, current_project, paginate, select_fields
+
+# Named FX chain snapshots, stored as .RfxChain files
+FX_CHAINS_DIR = DATA_DIR / "fx_chains"
+_FX_CHAIN_NAME_RE = re.compile(r"^[\w .()+-]+$")
+# (path, size, mtime) -> .RfxChain text
+_fx_chains = LRUCache(maxsize=64)
+# Seconds to reuse the installed plugin list; it only changes when REAPER rescans
+PLUGIN_LIST_TTL = 30.0
+# (path, size, mtime) of each plugin .ini -> plugin names
+_plugin_names = LRUCache(maxsize=4)
+# Per-FX fields list_fx_on_track can return
+FX_LIST_FIELDS = ("guid", "name", "enabled")
+
+
+def _fx_chain_path(name: str) -> Path:
+    """Locate a stored chain: our store first, then REAPER's FXChains folder.
+
+    ``name`` may use "/" for FXChains subfolders; each part must be a valid chain
+    name, and the file must stay inside the two chain directories.
+    """
+    parts = (name or "").split("/")
+    if not all(_FX_CHAIN_NAME_RE.match(part) and part.strip(".") for part in parts):
+        raise ValueError(f"Invalid FX chain name: {name!r}")
+    reaper_dir = Path(reapy.get_resource_path()) / "FXChains"
+    for base, candidates in ((FX_CHAINS_DIR, (f"{name}.RfxChain",)), (reaper_dir, (name, f"{name}.RfxChain"))):
+        root = base.resolve()
+        for candidate in candidates:
+            path = (base / candidate).resolve()
+            if path.is_relative_to(root) and path.is_file():
+                return path
+    raise FileNotFoundError(f"FX chain not found: {name}")
+
+
+def _read_fx_chain(path: Path) -> str:
+    key = file_key(str(path))
+    text = _fx_chains.get(key)
+    if text is None:
+        with tracer.span("read", "file", path=str(path)):
+            text = path.read_text(encoding="utf-8", errors="replace")
+        _fx_chains.put(key, text)
+    return text
+
+
+def _installed_plugins() -> List[str]:
+    """Plugin names from REAPER's vstplugins*.ini files, re-read only when a file changes."""
+    base = Path(reapy.get_resource_path())
+    candidates = [
+        base / "reaper-vstplugins64.ini",
+        base / "reaper-vstplugins.ini",
+        base / "reaper-vstplugins-arm64.ini",
+    ]
+    existing = [p for p in candidates if p.exists()]
+    key = tuple(file_key(str(p)) for p in existing)
+    plugins = _plugin_names.get(key)
+    if plugins is None:
+        seen: Dict[str, None] = {}
+        for p in existing:
+            with tracer.span("read", "file", path=str(p)), p.open("r", encoding="utf-8", errors="ignore") as f:
+                for line in f:
+                    line = line.strip()
+                    if line and "=" in line:
+                        name = line.split("=", 1)[0].strip()
+                        if name:
+                            seen.setdefault(name)
+        plugins = list(seen)
+        _plugin_names.put(key, plugins)
+    return plugins
 
 
 @mcp.tool()
-def list_vst_plugins() -> Dict[str, Any]:
-    """List available VST plugins by parsing REAPER resource files (vstplugins*.ini)."""
+@single_flight(ttl=PLUGIN_LIST_TTL, scope=cache_scope)
+def list_vst_plugins(offset: int = 0, limit: Optional[int] = None, name_filter: Optional[str] = None) -> Dict[str, Any]:
+    """List available VST plugins by parsing REAPER resource files (vstplugins*.ini).
+
+    Args:
+        offset: Skip this many (matching) plugins
+        limit: Return at most this many (default: all); pass next_offset back as offset
+            to get the following page
+        name_filter: Only plugins whose name contains this text (case-insensitive)
+
+    Returns: { plugins: [...] }, plus total/offset/next_offset when offset or limit is given
+    """
     try:
-        resource = reapy.get_resource_path()
-        base = Path(resource)
-        candidates = [
-            base / "reaper-vstplugins64.ini",
-            base / "reaper-vstplugins.ini",
-            base / "reaper-vstplugins-arm64.ini",
-        ]
-        plugins: List[str] = []
-        for p in candidates:
-            if p.exists():
-                with p.open("r", encoding="utf-8", errors="ignore") as f:
-                    for line in f:
-                        line = line.strip()
-                        if line and "=" in line:
-                            name = line.split("=", 1)[0].strip()
-                            if name and name not in plugins:
-                                plugins.append(name)
-        return {"plugins": plugins}
+        page = paginate(_installed_plugins(), "plugins", offset, limit, name_filter)
+        if not offset and limit is None:
+            return {"plugins": page["plugins"]}
+        return page
     except Exception as e:
         return {"error": f"Failed to list VST plugins: {e}"}
 
@@ -38,7 +111,7 @@ def list_vst_plugins() -> Dict[str, Any]:
 def add_fx_to_track(track_index: int, fx_name: str, record_fx_chain: bool = False) -> Dict[str, Any]:
     """Add an FX/VST by name to a track. fx_name must match REAPER's FX browser name (e.g., 'VST3: ReaComp (Cockos)')."""
     try:
-        project = reapy.Project()
+        project = current_project()
         tracks = list(project.tracks)
         if track_index < 0 or track_index >= len(tracks):
             return {"error": f"Track index out of range: {track_index}"}
@@ -53,27 +126,63 @@ def add_fx_to_track(track_index: int, fx_name: str, record_fx_chain: bool = Fals
 
 
 @mcp.tool()
-def list_fx_on_track(track_index: int) -> Dict[str, Any]:
-    """List FX names on a given track."""
+@single_flight(scope=cache_scope)
+def list_fx_on_track(
+    track_index: int,
+    rpp_path: Optional[str] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    name_filter: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """List FX names on a given track.
+
+    Args:
+        track_index: Track index (0-based)
+        rpp_path: Read a saved .rpp file from disk instead of the live project
+        offset: Skip this many (matching) FX
+        limit: Return at most this many FX (default: all)
+        name_filter: Only FX whose name contains this text (case-insensitive)
+        fields: Per-FX fields besides index (default ["name"]): guid, name, enabled
+    """
     try:
-        project = reapy.Project()
-        tracks = list(project.tracks)
-        if track_index < 0 or track_index >= len(tracks):
-            return {"error": f"Track index out of range: {track_index}"}
-        track = tracks[track_index]
-        fx = []
-        for i, fx_obj in enumerate(track.fxs):
-            fx.append({"index": i, "name": fx_obj.name})
-        return {"fx": fx}
+        want = select_fields(fields, FX_LIST_FIELDS, ("name",))
+        if rpp_path:
+            tracks = read_rpp(rpp_path)["tracks"]
+            if track_index < 0 or track_index >= len(tracks):
+                return {"error": f"Track index out of range: {track_index}"}
+            fx = tracks[track_index]["fx"]
+        else:
+            project = current_project()
+            if track_index < 0 or track_index >= project.n_tracks:
+                return {"error": f"Track index out of range: {track_index}"}
+            read = select_fields(set(want) | ({"name"} if name_filter else set()), FX_LIST_FIELDS, want)
+            _, snapshot = collect_snapshot(
+                project, {"track": ("fx",), "fx": read}, track_indices=[track_index], cached=False
+            )
+            if not snapshot["tracks"]:
+                return {"error": f"Track index out of range: {track_index}"}
+            fx = snapshot["tracks"][0]["fx"]
+        return paginate(fx, "fx", offset, limit, name_filter, fields=want)
     except Exception as e:
         return {"error": f"Failed to list FX: {e}"}
 
 
 @mcp.tool()
-def set_fx_param(track_index: int, fx_index: int, param_index: int, value_normalized: float) -> Dict[str, Any]:
-    """Set an FX parameter (normalized 0..1)."""
+def set_fx_param(
+    track_index: int, fx_index: int, param_index: int, value_normalized: float, coalesce: bool = False
+) -> Dict[str, Any]:
+    """Set an FX parameter (normalized 0..1).
+
+    With coalesce=True the write is queued and a ticket returned; rapid writes to the same
+    parameter are merged and applied in batches by a background flusher once the
+    coalescing window has passed (see flush_writes/get_write_status).
+    """
     try:
-        project = reapy.Project()
+        if coalesce:
+            target = (int(track_index), int(fx_index), int(param_index))
+            return {"ok": True, "queued": True, "ticket": coalescer.submit("fx_param", target, float(value_normalized))}
+        project = current_project()
         tracks = list(project.tracks)
         track = tracks[int(track_index)]
         fxs = list(track.fxs)
@@ -90,7 +199,7 @@ def set_fx_param(track_index: int, fx_index: int, param_index: int, value_normal
 def get_fx_param(track_index: int, fx_index: int, param_index: int) -> Dict[str, Any]:
     """Get an FX parameter value and name."""
     try:
-        project = reapy.Project()
+        project = current_project()
         tracks = list(project.tracks)
         track = tracks[int(track_index)]
         fxs = list(track.fxs)
@@ -100,3 +209,78 @@ def get_fx_param(track_index: int, fx_index: int, param_index: int) -> Dict[str,
         return {"value_normalized": param.normalized, "name": param.name}
     except Exception as e:
         return {"error": f"Failed to get FX param: {e}"}
+
+
+@mcp.tool()
+def save_fx_chain(track_index: int, name: str) -> Dict[str, Any]:
+    """Save a track's whole FX chain (plugins and their state) as a named snapshot.
+
+    Args:
+        track_index: Track index (0-based)
+        name: Snapshot name (letters, digits, spaces and ._()+- only); overwrites an existing one
+
+    Returns:
+        Dict with the snapshot name, its file path and the number of FX captured
+    """
+    try:
+        if not _FX_CHAIN_NAME_RE.match(name or ""):
+            return {"error": f"Invalid FX chain name: {name!r}"}
+        project = current_project()
+        if track_index < 0 or track_index >= project.n_tracks:
+            return {"error": f"Track index out of range: {track_index}"}
+        with bridge_batch():
+            chunk = get_track_chunk(RPR.GetTrack(project.id, int(track_index)))
+        fx_chain = extract_fx_chain(chunk)
+        path = FX_CHAINS_DIR / f"{name}.RfxChain"
+        atomic_write(path, fx_chain.encode("utf-8"))
+        _fx_chains.put(file_key(str(path)), fx_chain)
+        fx_count = sum(1 for line in fx_chain.splitlines() if line.startswith("BYPASS "))
+        return {"ok": True, "name": name, "path": str(path), "fx_count": fx_count}
+    except Exception as e:
+        return {"error": f"Failed to save FX chain: {e}"}
+
+
+@mcp.tool()
+def load_fx_chain(track_index: int, name: str, append: bool = False) -> Dict[str, Any]:
+    """Load a named FX chain snapshot onto a track in one batch (single undo point).
+
+    Args:
+        track_index: Track index (0-based)
+        name: Snapshot saved with save_fx_chain, or the name of a chain in REAPER's FXChains
+            folder ("/" separates subfolders)
+        append: Add the chain after the track's existing FX instead of replacing them
+
+    Returns:
+        Dict with ok status and the snapshot file used
+    """
+    try:
+        try:
+            path = _fx_chain_path(name)
+        except (FileNotFoundError, ValueError) as e:
+            return {"error": str(e)}
+        fx_chain = _read_fx_chain(path)
+        project = current_project()
+        if track_index < 0 or track_index >= project.n_tracks:
+            return {"error": f"Track index out of range: {track_index}"}
+        with bridge_batch("Load FX chain"):
+            track_id = RPR.GetTrack(project.id, int(track_index))
+            set_track_chunk(track_id, apply_fx_chain(get_track_chunk(track_id), fx_chain, append=append))
+        return {"ok": True, "name": name, "path": str(path)}
+    except Exception as e:
+        return {"error": f"Failed to load FX chain: {e}"}
+
+
+@mcp.tool()
+def list_fx_chains(offset: int = 0, limit: Optional[int] = None, name_filter: Optional[str] = None) -> Dict[str, Any]:
+    """List saved FX chain snapshots (names usable with load_fx_chain).
+
+    Args:
+        offset: Skip this many (matching) chains
+        limit: Return at most this many (default: all)
+        name_filter: Only chains whose name contains this text (case-insensitive)
+    """
+    try:
+        names = sorted(p.stem for p in FX_CHAINS_DIR.glob("*.RfxChain")) if FX_CHAINS_DIR.is_dir() else []
+        return {**paginate(names, "fx_chains", offset, limit, name_filter), "directory": str(FX_CHAINS_DIR)}
+    except Exception as e:
+        return {"error": f"Failed to list FX chains: {e}"}
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict
+
+from reaper_mcp.mcp_core import mcp
+from reaper_mcp.pool import pool
+
+logger = logging.getLogger(__name__)
+
+
+@mcp.tool()
+def list_instances() -> Dict[str, Any]:
+    """List the REAPER instances this server can drive, with connection health and load.
+
+    Configure several instances with REAPER_MCP_INSTANCES (or --instance); every tool
+    then accepts instance="<name>" or instance="auto" (least-loaded healthy instance).
+    An instance whose bridge keeps failing or timing out is put on hold (circuit
+    "open"): calls to it fail fast until retry_in has passed and a probe succeeds.
+
+    Returns:
+        Dict with status ("ok", "degraded" or "unavailable"), whether pooled routing is
+        active, and instances (name, host, port, connected, healthy, state, retry_in,
+        in_flight, requests, failures, consecutive_failures, last_error)
+    """
+    try:
+        return pool.health()
+    except Exception as e:
+        error_msg = f"Failed to list instances: {e}"
+        logger.error(error_msg, exc_info=True)
+        return {"error": error_msg}
@@ -1,4 +1,7 @@
-INSTRUCTIONS = f"""
+import re
+from typing import Iterable, List, Optional
+
+INSTRUCTIONS = """
 Reaper MCP Server
 
 This server exposes small, focused tools to automate common REAPER tasks via reapy / ReaScript.
@@ -13,6 +16,7 @@ Project:
 - get_play_state: Get the current playback state (playing, paused, stopped, recording)
 - get_play_position: Get the current play position in seconds
 - get_play_rate: Get the current playback rate (1.0 is normal speed)
+- list_projects: List open project tabs (index, name, file, current); every tool accepts project=<tab index or .rpp path/name> to act on that tab without switching to it
 - get_project_name: Get the project name
 - get_project_path: Get the project file path
 - is_project_dirty: Check if the project has unsaved changes
@@ -22,6 +26,7 @@ Project:
 - can_redo: Check if redo is available
 - beats_to_time: Convert beats (quarter notes) to time in seconds
 - time_to_beats: Convert time in seconds to beats (quarter notes)
+- index_rpp_projects: Summarise saved .rpp projects under directories (tracks, FX, sources) without REAPER, parsed in parallel and cached
 
 Playback Control:
 - play: Start playback
@@ -44,6 +49,10 @@ Markers & Regions:
 Tracks:
 - create_track: Create a new track at optional index; returns its index
 - delete_track: Delete track by index
+- create_tracks: Create many tracks in one batch (names, positions, colors, folder depth) with a single undo point
+- delete_tracks: Delete many tracks (or all tracks) in one batch with a single undo point
+- duplicate_tracks: Duplicate fully configured tracks (FX, items, envelopes, sends) from their state chunks, optionally several copies each; folder parents are copied with all their children
+- instantiate_track_template: Insert one or more instances of a .RTrackTemplate (by path or name) in one batch; templates are cached by content hash
 - list_tracks: List tracks with indices and names
 - get_track_name: Get the name of a track by index
 - get_track_item_count: Get the number of items on a track by index
@@ -53,9 +62,9 @@ Tracks:
 - solo_track: Solo a track by index
 - unsolo_track: Unsolo a track by index
 - get_track_volume: Get track volume (0.0 to 2.0+, where 1.0 = 0dB)
-- set_track_volume: Set track volume (0.0 to 2.0+, where 1.0 = 0dB)
+- set_track_volume: Set track volume (0.0 to 2.0+, where 1.0 = 0dB); coalesce=True queues the write for batched application
 - get_track_pan: Get track pan (-1.0 = left, 0.0 = center, 1.0 = right)
-- set_track_pan: Set track pan (-1.0 to 1.0)
+- set_track_pan: Set track pan (-1.0 to 1.0); coalesce=True queues the write for batched application
 - select_track: Select a track by index
 - unselect_track: Unselect a track by index
 
@@ -64,25 +73,95 @@ Tempo:
 - set_bpm: Set current project BPM (must be between 1 and 960)
 
 MIDI:
-- add_midi_to_track: Add a list of MIDI notes to a track as a new MIDI item
+- add_midi_to_track: Add MIDI notes to a track as a new MIDI item (list of note dicts, parallel columns, or a packed base64 buffer for large inserts)
 - generate_midi_pattern: Generate a simple step-sequenced MIDI pattern (returns note data for add_midi_to_track)
 - generate_pretty_midi: Generate a MIDI file (base64) using pretty_midi following a simple step sequence
 - add_midi_file_to_track: Import a MIDI file (base64-encoded .mid data) onto a track at time position
+- import_midi_file_split: Import a multi-part MIDI file (base64) with one track per instrument/channel and the file's tempo, in one batch
+- transform_midi_items: Apply a chain of transforms (transpose, velocity curve, humanize, quantize, length clamp) to existing MIDI items in place
 
 FX/Plugins:
 - list_vst_plugins: List available VST plugins by parsing REAPER resource files (vstplugins*.ini)
 - add_fx_to_track: Add an FX/VST by name to a track (fx_name must match REAPER's FX browser name)
 - list_fx_on_track: List FX names on a given track
-- set_fx_param: Set an FX parameter (normalized 0..1)
+- set_fx_param: Set an FX parameter (normalized 0..1); coalesce=True queues the write for batched application
 - get_fx_param: Get an FX parameter value and name
+- save_fx_chain: Save a track's whole FX chain (plugins and state) as a named snapshot (.RfxChain in the data dir)
+- load_fx_chain: Replace (or append to) a track's FX chain from a named snapshot in one batch
+- list_fx_chains: List saved FX chain snapshots
+
+Write coalescing (for controller/UI streams of set_track_volume, set_track_pan, set_fx_param with coalesce=True):
+- flush_writes: Apply all queued writes now (only the latest value per target is written)
+- get_write_status: Check or wait for acknowledgement of a queued write by ticket
+
+Automation:
+- write_envelope: Write many automation points (or a generated curve/LFO, optionally thinned) to a track volume/pan or FX parameter envelope in one batch
+
+Items:
+- find_items: Find media items across the project by time range, source file (path or file name), track and take name (indexed, rebuilt only after edits)
 
 Samples:
 - list_sample_dirs: List configured sample directories
 - add_sample_dir: Add a sample directory (persisted)
 - remove_sample_dir: Remove a sample directory
 - search_samples: Search for audio samples across configured directories (supports query filter, extension filter, and limit)
-- import_sample_to_track: Import a sample onto a track at time position (optionally set take playrate for time-stretching)
+- import_sample_to_track: Import a sample onto a track at time position (optionally set take playrate, or match_tempo to stretch it to the project tempo)
+- import_samples: Import many samples in one batch, from explicit (track, file, position, playrate) entries or a kit plus step grid (supports match_tempo)
+- update_sample_index: Incrementally (re)build the sample similarity index from the configured sample directories
+- find_similar_samples: Find the k samples most similar in sound to a given file (uses the similarity index)
+- get_sample_peaks: Get min/max waveform peaks of a WAV sample at several zoom levels for previews (disk-cached)
+- detect_sample_tempo: Detect the tempo of audio files from file name tags, WAV ACID metadata or onset analysis (cached per file)
+
+Sync:
+- export_project_snapshot: Export tracks, items, FX, sends, markers and tempo in one round trip (field projection, track filter, optional msgpack)
+- get_project_changes: Return only tracks, items, FX, markers and tempo points added/removed/modified since a version token from a previous call
+
+Offline reads:
+- get_project_details, get_project_length, list_tracks, get_track_name, get_track_item_count, get_track_volume, get_track_pan, list_fx_on_track, list_markers, list_regions, get_marker_count, get_region_count, get_bpm and export_project_snapshot accept rpp_path to read a saved .rpp file from disk instead of the live project
+
+Instances:
+- list_instances: List the REAPER instances this server drives with their health (circuit breaker state) and load; when several are configured every tool accepts instance="<name>" or instance="auto" (least-loaded healthy)
+
+Paging & projection:
+- get_project_details, list_tracks, list_fx_on_track, list_markers, list_regions, list_vst_plugins, list_fx_chains, list_sample_dirs and search_samples accept offset/limit and return next_offset (None on the last page); the list tools also take name_filter, and get_project_details, list_tracks, list_fx_on_track, list_markers and list_regions take fields to choose per-entry fields
 
 Caveats
 - Some operations depend on REAPER configuration, OS, and installed plugins. Tools return helpful error messages when unavailable.
-"""
\ No newline at end of file
+- If REAPER stops answering (modal dialog, plugin scan), calls fail with a timeout; after repeated failures they fail fast for a few seconds instead of waiting. Retry once REAPER is responsive again.
+"""
+
+_TOOL_LINE_RE = re.compile(r"^- (\w+):", re.MULTILINE)
+_WORD_RE = re.compile(r"\w+")
+_ALL_TOOLS = frozenset(_TOOL_LINE_RE.findall(INSTRUCTIONS))
+
+
+def render_instructions(tools: Optional[Iterable[str]] = None) -> str:
+    """INSTRUCTIONS restricted to ``tools`` (all tools when None).
+
+    Tool lines ("- name: ...") of disabled tools are dropped, notes that mention
+    tools are kept only if one of them is enabled, and sections left empty are removed.
+    """
+    if tools is None:
+        return INSTRUCTIONS
+    enabled = set(tools)
+    out: List[str] = []
+    header: Optional[str] = None
+    for line in INSTRUCTIONS.splitlines():
+        if line.startswith("- "):
+            m = _TOOL_LINE_RE.match(line)
+            names = [m.group(1)] if m else [w for w in _WORD_RE.findall(line) if w in _ALL_TOOLS]
+            # General notes that name no tool are always kept
+            if names and not any(n in enabled for n in names):
+                continue
+            if header is not None:
+                out.append(header)
+                header = None
+        elif line.endswith(":") and out and out[-1] == "":
+            header = line
+            continue
+        elif header is not None and not line.strip():
+            continue
+        else:
+            header = None
+        out.append(line)
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(out)) + "\n"
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from reapy import reascript_api as RPR
+
+from reaper_mcp.cache import LRUCache
+from reaper_mcp.mcp_core import mcp
+from reaper_mcp.util import bridge_batch, current_project, project_cache_key, project_state_version
+
+logger = logging.getLogger(__name__)
+
+
+class IntervalTree:
+    """Static centered interval tree over closed intervals ``[starts[i], ends[i]]``.
+
+    Built once per item index; ``overlapping`` returns the ids of intervals that
+    intersect a query range in O(log n + k).
+    """
+
+    __slots__ = ("starts", "ends", "root")
+
+    def __init__(self, starts: List[float], ends: List[float]) -> None:
+        self.starts = starts
+        self.ends = ends
+        self.root = self._build(list(range(len(starts))))
+
+    def _build(self, ids: List[int]) -> Optional[tuple]:
+        if not ids:
+            return None
+        mids = sorted((self.starts[i] + self.ends[i]) / 2.0 for i in ids)
+        center = mids[len(mids) // 2]
+        left, right, here = [], [], []
+        for i in ids:
+            if self.ends[i] < center:
+                left.append(i)
+            elif self.starts[i] > center:
+                right.append(i)
+            else:
+                here.append(i)
+        by_start = sorted(here, key=self.starts.__getitem__)
+        by_end = sorted(here, key=self.ends.__getitem__, reverse=True)
+        return (center, by_start, by_end, self._build(left), self._build(right))
+
+    def overlapping(self, lo: float, hi: float) -> List[int]:
+        out: List[int] = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            center, by_start, by_end, left, right = node
+            if hi < center:
+                for i in by_start:
+                    if self.starts[i] > hi:
+                        break
+                    out.append(i)
+                stack.append(left)
+            elif lo > center:
+                for i in by_end:
+                    if self.ends[i] < lo:
+                        break
+                    out.append(i)
+                stack.append(right)
+            else:
+                out.extend(by_start)
+                stack.append(left)
+                stack.append(right)
+        return out
+
+
+def _source_key(path: str) -> str:
+    return os.path.normcase(os.path.normpath(path)) if path else ""
+
+
+class ItemIndex:
+    """All media items of a project with time and source lookups."""
+
+    __slots__ = ("items", "tree", "by_source", "by_basename")
+
+    def __init__(self, items: List[Dict[str, Any]]) -> None:
+        self.items = items
+        self.tree = IntervalTree([it["position"] for it in items], [it["position"] + it["length"] for it in items])
+        self.by_source: Dict[str, List[int]] = {}
+        self.by_basename: Dict[str, List[int]] = {}
+        for row, it in enumerate(items):
+            if it["source"]:
+                key = _source_key(it["source"])
+                self.by_source.setdefault(key, []).append(row)
+                self.by_basename.setdefault(os.path.basename(key), []).append(row)
+
+    def rows_for_source(self, source: str) -> List[int]:
+        """Rows whose source is ``source`` (full path, else file name, else substring)."""
+        key = _source_key(source)
+        if key in self.by_source:
+            return list(self.by_source[key])
+        name = os.path.basename(key)
+        if name in self.by_basename:
+            return list(self.by_basename[name])
+        needle = os.path.normcase(source)
+        return sorted(row for k, rows in self.by_source.items() if needle in k for row in rows)
+
+
+# (instance, project id, state version) -> ItemIndex
+_item_indexes = LRUCache(maxsize=4)
+
+
+def _collect_items(project) -> List[Dict[str, Any]]:
+    items = []
+    for t in range(RPR.CountTracks(project.id)):
+        track_id = RPR.GetTrack(project.id, t)
+        track_guid = RPR.GetTrackGUID(track_id)
+        for j in range(RPR.CountTrackMediaItems(track_id)):
+            item_id = RPR.GetTrackMediaItem(track_id, j)
+            take = RPR.GetActiveTake(item_id)
+            has_take = not str(take).endswith("0x0000000000000000")
+            source = ""
+            if has_take and not RPR.TakeIsMIDI(take):
+                src = RPR.GetMediaItemTake_Source(take)
+                source = RPR.GetMediaSourceFileName(src, "", 4096)[1]
+            items.append({
+                "track_index": t,
+                "track_guid": track_guid,
+                "item_index": j,
+                "guid": RPR.GetSetMediaItemInfo_String(item_id, "GUID", "", False)[3],
+                "position": float(RPR.GetMediaItemInfo_Value(item_id, "D_POSITION")),
+                "length": float(RPR.GetMediaItemInfo_Value(item_id, "D_LENGTH")),
+                "mute": bool(RPR.GetMediaItemInfo_Value(item_id, "B_MUTE")),
+                "take_name": RPR.GetTakeName(take) if has_take else "",
+                "source": source,
+                "playrate": float(RPR.GetMediaItemTakeInfo_Value(take, "D_PLAYRATE")) if has_take else 1.0,
+                "midi": bool(RPR.TakeIsMIDI(take)) if has_take else False,
+            })
+    return items
+
+
+def get_item_index(project) -> Tuple[int, ItemIndex]:
+    """Return ``(state version, ItemIndex)``, rebuilding in one bridge pass only after edits."""
+    version = project_state_version(project)
+    index = _item_indexes.get((*project_cache_key(project), version))
+    if index is None:
+        with bridge_batch():
+            version = project_state_version(project)
+            index = ItemIndex(_collect_items(project))
+        _item_indexes.put((*project_cache_key(project), version), index)
+    return version, index
+
+
+@mcp.tool()
+def find_items(
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    source: Optional[str] = None,
+    track_indices: Optional[List[int]] = None,
+    name_query: Optional[str] = None,
+    fully_inside: bool = False,
+    limit: int = 500,
+) -> Dict[str, Any]:
+    """Find media items across the whole project by time range, source file and/or name.
+
+    Served from a per-project item index that is rebuilt only after the project changes.
+
+    Args:
+        start: Range start in seconds (default: project start)
+        end: Range end in seconds (default: no limit). Items overlapping [start, end] match.
+        source: Source file: a full path, a file name like "kick_07.wav", or part of a path
+        track_indices: Only items on these tracks (0-based)
+        name_query: Only items whose take name contains this text (case-insensitive)
+        fully_inside: Require items to lie entirely within [start, end]
+        limit: Maximum number of items to return
+
+    Returns:
+        Dict with matching items (track_index, item_index, guid, position, length,
+        take_name, source, playrate, mute, midi) sorted by position, the total match
+        count and the project state version the index was built at
+    """
+    logger.info(
+        f"find_items called with start={start}, end={end}, source={source}, "
+        f"track_indices={track_indices}, name_query={name_query}"
+    )
+    try:
+        project = current_project()
+        version, index = get_item_index(project)
+        lo = float(start) if start is not None else float("-inf")
+        hi = float(end) if end is not None else float("inf")
+        if lo > hi:
+            return {"error": f"start ({start}) must not be after end ({end})"}
+        if start is None and end is None:
+            rows = range(len(index.items))
+        else:
+            rows = index.tree.overlapping(lo, hi)
+        if source:
+            rows = set(rows).intersection(index.rows_for_source(source))
+        tracks = set(int(t) for t in track_indices) if track_indices is not None else None
+        needle = name_query.lower() if name_query else None
+        matches = []
+        for row in rows:
+            it = index.items[row]
+            if tracks is not None and it["track_index"] not in tracks:
+                continue
+            if needle and needle not in it["take_name"].lower():
+                continue
+            if fully_inside and (it["position"] < lo or it["position"] + it["length"] > hi):
+                continue
+            matches.append(it)
+        matches.sort(key=lambda it: (it["position"], it["track_index"], it["item_index"]))
+        return {"items": matches[:max(0, int(limit))], "count": len(matches), "version": version}
+    except Exception as e:
+        error_msg = f"Failed to find items: {e}"
+        logger.error(error_msg, exc_info=True)
+        return {"error": error_msg}
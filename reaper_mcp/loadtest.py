@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from fastmcp import Client
+
+from reaper_mcp.stub_bridge import WEB_INTERFACE_PORT
+
+
+# One tool call of a workload: (tool name, arguments)
+Call = Tuple[str, Dict[str, Any]]
+
+DEFAULT_MIX = "transport=4,mixer=3,midi=1,samples=2"
+_SAMPLE_WORDS = ("kick", "snare", "hat", "clap", "bass", "pad", "lead", "vox", "perc", "fx")
+
+
+@dataclass
+class Workload:
+    tracks: int = 16
+    notes: int = 16
+    coalesce: bool = False
+
+    def transport(self, rng: random.Random) -> Call:
+        return ("get_cursor_position", {}) if rng.random() < 0.5 else ("get_time_selection", {})
+
+    def mixer(self, rng: random.Random) -> Call:
+        index = rng.randrange(self.tracks)
+        if rng.random() < 0.5:
+            return "set_track_volume", {"index": index, "volume": round(rng.uniform(0.0, 1.5), 3), "coalesce": self.coalesce}
+        return "set_track_pan", {"index": index, "pan": round(rng.uniform(-1.0, 1.0), 3), "coalesce": self.coalesce}
+
+    def midi(self, rng: random.Random) -> Call:
+        start = sorted(round(rng.uniform(0.0, 4.0), 3) for _ in range(self.notes))
+        columns = {
+            "start": start,
+            "end": [s + 0.25 for s in start],
+            "pitch": [rng.randrange(36, 96) for _ in start],
+            "velocity": 100,
+        }
+        return "add_midi_to_track", {
+            "track_index": rng.randrange(self.tracks),
+            "columns": columns,
+            "start_time": round(rng.uniform(0.0, 120.0), 3),
+        }
+
+    def samples(self, rng: random.Random) -> Call:
+        return "search_samples", {"query": rng.choice(_SAMPLE_WORDS), "limit": 20}
+
+
+WORKLOADS = ("transport", "mixer", "midi", "samples")
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parse ``"name=weight,..."`` into workload weights."""
+    mix: Dict[str, float] = {}
+    for entry in (e.strip() for e in spec.split(",")):
+        if not entry:
+            continue
+        name, _, weight = entry.partition("=")
+        if name not in WORKLOADS:
+            raise ValueError(f"Unknown workload '{name}' (valid: {', '.join(WORKLOADS)})")
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("Workload mix needs at least one positive weight")
+    return mix
+
+
+@dataclass
+class Samples:
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+
+
+class Recorder:
+    """Latencies and errors per workload, counting only calls that finish inside the window."""
+
+    def __init__(self, start: float, end: float) -> None:
+        self.start = start
+        self.end = end
+        self.workloads: Dict[str, Samples] = {}
+        self.error_messages: Dict[str, int] = {}
+
+    def add(self, workload: str, finished: float, latency: float, error: Optional[str]) -> None:
+        if not self.start <= finished <= self.end:
+            return
+        samples = self.workloads.setdefault(workload, Samples())
+        samples.latencies.append(latency)
+        if error is not None:
+            samples.errors += 1
+            message = error.splitlines()[0][:160] if error else "error"
+            self.error_messages[message] = self.error_messages.get(message, 0) + 1
+
+    def report(self) -> Dict[str, Any]:
+        seconds = self.end - self.start
+        rows = {name: _summary(s.latencies, s.errors, seconds) for name, s in sorted(self.workloads.items())}
+        everything = [x for s in self.workloads.values() for x in s.latencies]
+        rows["total"] = _summary(everything, sum(s.errors for s in self.workloads.values()), seconds)
+        top = sorted(self.error_messages.items(), key=lambda kv: -kv[1])[:5]
+        return {"seconds": round(seconds, 3), "workloads": rows, "top_errors": [{"error": e, "count": n} for e, n in top]}
+
+
+def _summary(latencies: List[float], errors: int, seconds: float) -> Dict[str, Any]:
+    if not latencies:
+        return {"calls": 0, "errors": errors, "error_rate": 0.0, "throughput": 0.0,
+                "p50_ms": None, "p99_ms": None, "max_ms": None}
+    ms = np.asarray(latencies) * 1000.0
+    return {
+        "calls": len(latencies),
+        "errors": errors,
+        "error_rate": round(errors / len(latencies), 4),
+        "throughput": round(len(latencies) / seconds, 2),
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p99_ms": round(float(np.percentile(ms, 99)), 2),
+        "max_ms": round(float(ms.max()), 2),
+    }
+
+
+def _call_error(result: Any) -> Optional[str]:
+    if result.is_error:
+        return " ".join(getattr(c, "text", "") for c in result.content) or "tool error"
+    data = result.structured_content
+    if isinstance(data, dict) and "error" in data:
+        return str(data["error"])
+    return None
+
+
+async def _simulated_client(
+    url: str,
+    workload: Workload,
+    mix: Dict[str, float],
+    recorder: Recorder,
+    seed: int,
+    timeout: float,
+) -> None:
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    generators: Dict[str, Callable[[random.Random], Call]] = {n: getattr(workload, n) for n in names}
+    async with Client(url, timeout=timeout) as client:
+        while time.perf_counter() < recorder.end:
+            name = rng.choices(names, weights)[0]
+            tool, args = generators[name](rng)
+            started = time.perf_counter()
+            try:
+                error = _call_error(await client.call_tool(tool, args, raise_on_error=False))
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            finished = time.perf_counter()
+            recorder.add(name, finished, finished - started, error)
+
+
+async def run_load(
+    url: str,
+    clients: int = 8,
+    duration: float = 30.0,
+    warmup: float = 2.0,
+    mix: Optional[Dict[str, float]] = None,
+    workload: Optional[Workload] = None,
+    sample_dir: Optional[str] = None,
+    timeout: float = 60.0,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Drive ``clients`` concurrent MCP sessions against ``url``; returns the report.
+
+    Calls finishing in the first ``warmup`` seconds are not counted.
+    """
+    mix = mix or parse_mix(DEFAULT_MIX)
+    workload = workload or Workload()
+    if sample_dir:
+        async with Client(url, timeout=timeout) as client:
+            await client.call_tool("add_sample_dir", {"path": sample_dir}, raise_on_error=False)
+    start = time.perf_counter() + warmup
+    recorder = Recorder(start, start + duration)
+    await asyncio.gather(*(
+        _simulated_client(url, workload, mix, recorder, seed + i, timeout) for i in range(clients)
+    ))
+    report = recorder.report()
+    report.update(url=url, clients=clients, mix=mix, coalesce=workload.coalesce)
+    return report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    header = f"{'workload':<10} {'calls':>7} {'errors':>7} {'err%':>6} {'calls/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    lines = [
+        f"{report['clients']} clients against {report['url']} for {report['seconds']}s",
+        header,
+        "-" * len(header),
+    ]
+
+    def cell(value: Any) -> str:
+        return "-" if value is None else f"{value:.1f}"
+
+    for name, row in report["workloads"].items():
+        lines.append(
+            f"{name:<10} {row['calls']:>7} {row['errors']:>7} {row['error_rate'] * 100:>6.1f} "
+            f"{row['throughput']:>8.1f} {cell(row['p50_ms']):>8} {cell(row['p99_ms']):>8} {cell(row['max_ms']):>8}"
+        )
+    for entry in report["top_errors"]:
+        lines.append(f"  {entry['count']}x {entry['error']}")
+    return "\n".join(lines)
+
+
+def _wait_for_port(port: int, process: subprocess.Popen, what: str, log: Path, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            tail = "\n".join(log.read_text(encoding="utf-8", errors="replace").splitlines()[-20:])
+            raise RuntimeError(f"{what} exited with code {process.returncode}:\n{tail}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{what} did not listen on port {port} within {timeout:.0f}s")
+
+
+@contextmanager
+def spawned_server(
+    transport: str = "sse",
+    port: int = 8765,
+    tracks: int = 16,
+    tick_ms: float = 30.0,
+    server_args: Tuple[str, ...] = (),
+) -> Iterator[Tuple[str, str]]:
+    """Start a stub bridge and a server using it; yields ``(url, sample_dir)``.
+
+    The stub takes REAPER's web interface port (reapy always discovers REAPER
+    there), so no REAPER may run on this machine meanwhile. The server gets
+    throwaway data/cache directories; its log is kept in the temp directory.
+    """
+    with tempfile.TemporaryDirectory(prefix="reaper-mcp-load-") as tmp:
+        samples = Path(tmp) / "samples"
+        for i, word in enumerate(_SAMPLE_WORDS * 20):
+            folder = samples / word
+            folder.mkdir(parents=True, exist_ok=True)
+            (folder / f"{word}_{i:03d}.wav").touch()
+        env = {
+            **os.environ,
+            "REAPER_MCP_CONFIGURE_REAPER": "0",
+            "REAPER_MCP_DATA_DIR": str(Path(tmp) / "data"),
+            "REAPER_MCP_CACHE_DIR": str(Path(tmp) / "cache"),
+        }
+        processes: List[subprocess.Popen] = []
+        with open(Path(tmp) / "stub.log", "wb") as stub_log, open(Path(tmp) / "server.log", "wb") as server_log:
+            try:
+                stub = subprocess.Popen(
+                    [sys.executable, "-m", "reaper_mcp.stub_bridge", "--tracks", str(tracks), "--tick-ms", str(tick_ms)],
+                    stdout=stub_log, stderr=subprocess.STDOUT, env=env,
+                )
+                processes.append(stub)
+                _wait_for_port(WEB_INTERFACE_PORT, stub, "Stub bridge", Path(stub_log.name))
+                server = subprocess.Popen(
+                    [sys.executable, "-m", "reaper_mcp", "--transport", transport, "--port", str(port), *server_args],
+                    stdout=server_log, stderr=subprocess.STDOUT, env=env,
+                )
+                processes.append(server)
+                _wait_for_port(port, server, "Server", Path(server_log.name))
+                yield f"http://127.0.0.1:{port}/sse", str(samples)
+            finally:
+                for process in reversed(processes):
+                    process.terminate()
+                    try:
+                        process.wait(timeout=10)
+                    except subprocess.TimeoutExpired:
+                        process.kill()
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Load-test a Reaper MCP server with concurrent simulated clients and a mixed tool workload"
+    )
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="MCP endpoint of a running server, e.g. http://127.0.0.1:8000/sse")
+    target.add_argument(
+        "--spawn",
+        choices=["sse", "http"],
+        help="Start a server with this transport plus a stub REAPER bridge, and test that",
+    )
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent simulated clients (default: 8)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds (default: 30)")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds before measuring starts (default: 2)")
+    parser.add_argument(
+        "--mix",
+        default=DEFAULT_MIX,
+        help=f"Workload weights as name=weight,... from {', '.join(WORKLOADS)} (default: {DEFAULT_MIX})",
+    )
+    parser.add_argument("--tracks", type=int, default=16, help="Tracks the mixer/MIDI workloads address (default: 16)")
+    parser.add_argument("--notes", type=int, default=16, help="Notes per MIDI insert (default: 16)")
+    parser.add_argument("--coalesce", action="store_true", help="Send mixer writes with coalesce=True")
+    parser.add_argument("--sample-dir", help="Sample directory to register before a samples workload (--url only)")
+    parser.add_argument("--port", type=int, default=8765, help="Port of the spawned server (default: 8765)")
+    parser.add_argument("--tick-ms", type=float, default=30.0, help="Stub bridge polling interval in ms (default: 30)")
+    parser.add_argument("--server-arg", action="append", default=[], help="Extra argument for the spawned server (repeatable)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-call timeout in seconds (default: 60)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the first client (default: 0)")
+    parser.add_argument("--json", dest="json_path", help="Also write the report as JSON to this file")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    workload = Workload(tracks=args.tracks, notes=args.notes, coalesce=args.coalesce)
+
+    def run(url: str, sample_dir: Optional[str]) -> Dict[str, Any]:
+        return asyncio.run(run_load(
+            url, args.clients, args.duration, args.warmup, mix, workload,
+            sample_dir if "samples" in mix else None, args.timeout, args.seed,
+        ))
+
+    if args.spawn:
+        with spawned_server(args.spawn, args.port, args.tracks, args.tick_ms, tuple(args.server_arg)) as (url, samples):
+            report = run(url, samples)
+        report["transport"] = args.spawn
+    else:
+        report = run(args.url, args.sample_dir)
+    print(format_report(report))
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
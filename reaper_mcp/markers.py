@@ -3,12 +3,26 @@ from __future__ import annotations
 import logging
 from typing import Any, Dict, List, Optional
 
-import reapy
-
 from reaper_mcp.mcp_core import mcp
+from reaper_mcp.rpp import read_rpp
+from reaper_mcp.snapshot import collect_snapshot
+from reaper_mcp.util import current_project, paginate, select_fields
 
 logger = logging.getLogger(__name__)
 
+MARKER_FIELDS = ("position", "name", "color")
+REGION_FIELDS = ("start", "end", "name", "color")
+# Everything both list tools need, so they share one cached snapshot per project version
+_MARKER_SPEC = {"markers": ("region", "position", "end", "name", "number", "color")}
+
+
+def _project_markers(rpp_path: Optional[str]) -> List[Dict[str, Any]]:
+    """Markers and regions in snapshot form, from a saved .rpp or the live project's snapshot cache."""
+    if rpp_path:
+        return read_rpp(rpp_path)["markers"]
+    _, snapshot = collect_snapshot(current_project(), dict(_MARKER_SPEC))
+    return snapshot["markers"]
+
 
 @mcp.tool()
 def add_marker(position: float, name: str = "", color: int = 0) -> Dict[str, Any]:
@@ -24,7 +38,7 @@ def add_marker(position: float, name: str = "", color: int = 0) -> Dict[str, Any
     """
     logger.info(f"add_marker called with position={position}, name='{name}', color={color}")
     try:
-        project = reapy.Project()
+        project = current_project()
         index = project.add_marker(position=float(position), name=name, color=int(color))
         logger.info(f"Successfully added marker at position {position}")
         return {"ok": True, "index": index, "position": position, "name": name}
@@ -49,7 +63,7 @@ def add_region(start: float, end: float, name: str = "", color: int = 0) -> Dict
     """
     logger.info(f"add_region called with start={start}, end={end}, name='{name}', color={color}")
     try:
-        project = reapy.Project()
+        project = current_project()
         index = project.add_region(start=float(start), end=float(end), name=name, color=int(color))
         logger.info(f"Successfully added region from {start} to {end}")
         return {"ok": True, "index": index, "start": start, "end": end, "name": name}
@@ -60,25 +74,36 @@ def add_region(start: float, end: float, name: str = "", color: int = 0) -> Dict
 
 
 @mcp.tool()
-def list_markers() -> Dict[str, Any]:
+def list_markers(
+    rpp_path: Optional[str] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    name_filter: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+) -> Dict[str, Any]:
     """List all markers in the project.
     
+    Args:
+        rpp_path: Read a saved .rpp file from disk instead of the live project
+        offset: Skip this many (matching) markers
+        limit: Return at most this many markers (default: all); pass next_offset back
+            as offset to get the following page
+        name_filter: Only markers whose name contains this text (case-insensitive)
+        fields: Fields to return besides index (default all): position, name, color
+    
     Returns:
         Dict with list of markers, each containing index, position, and name
     """
-    logger.info("list_markers called")
+    logger.info(f"list_markers called with rpp_path={rpp_path}, offset={offset}, limit={limit}")
     try:
-        project = reapy.Project()
-        markers_list = []
-        for marker in project.markers:
-            markers_list.append({
-                "index": marker.index,
-                "position": marker.position,
-                "name": marker.name,
-                "color": marker.color
-            })
-        logger.info(f"Found {len(markers_list)} markers")
-        return {"markers": markers_list, "count": len(markers_list)}
+        want = select_fields(fields, MARKER_FIELDS, MARKER_FIELDS)
+        rows = (
+            {"index": m["number"], "position": m["position"], "name": m["name"], "color": m["color"]}
+            for m in _project_markers(rpp_path) if not m["region"]
+        )
+        page = paginate(rows, "markers", offset, limit, name_filter, fields=want)
+        logger.info(f"Found {page['total']} markers")
+        return {**page, "count": page["total"]}
     except Exception as e:
         error_msg = f"Failed to list markers: {e}"
         logger.error(error_msg, exc_info=True)
@@ -86,26 +111,36 @@ def list_markers() -> Dict[str, Any]:
 
 
 @mcp.tool()
-def list_regions() -> Dict[str, Any]:
+def list_regions(
+    rpp_path: Optional[str] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    name_filter: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+) -> Dict[str, Any]:
     """List all regions in the project.
     
+    Args:
+        rpp_path: Read a saved .rpp file from disk instead of the live project
+        offset: Skip this many (matching) regions
+        limit: Return at most this many regions (default: all); pass next_offset back
+            as offset to get the following page
+        name_filter: Only regions whose name contains this text (case-insensitive)
+        fields: Fields to return besides index (default all): start, end, name, color
+    
     Returns:
         Dict with list of regions, each containing index, start, end, and name
     """
-    logger.info("list_regions called")
+    logger.info(f"list_regions called with rpp_path={rpp_path}, offset={offset}, limit={limit}")
     try:
-        project = reapy.Project()
-        regions_list = []
-        for region in project.regions:
-            regions_list.append({
-                "index": region.index,
-                "start": region.start,
-                "end": region.end,
-                "name": region.name,
-                "color": region.color
-            })
-        logger.info(f"Found {len(regions_list)} regions")
-        return {"regions": regions_list, "count": len(regions_list)}
+        want = select_fields(fields, REGION_FIELDS, REGION_FIELDS)
+        rows = (
+            {"index": m["number"], "start": m["position"], "end": m["end"], "name": m["name"], "color": m["color"]}
+            for m in _project_markers(rpp_path) if m["region"]
+        )
+        page = paginate(rows, "regions", offset, limit, name_filter, fields=want)
+        logger.info(f"Found {page['total']} regions")
+        return {**page, "count": page["total"]}
     except Exception as e:
         error_msg = f"Failed to list regions: {e}"
         logger.error(error_msg, exc_info=True)
@@ -113,14 +148,19 @@ def list_regions() -> Dict[str, Any]:
 
 
 @mcp.tool()
-def get_marker_count() -> Dict[str, Any]:
+def get_marker_count(rpp_path: Optional[str] = None) -> Dict[str, Any]:
     """Get the number of markers in the project.
     
+    Args:
+        rpp_path: Read a saved .rpp file from disk instead of the live project
+    
     Returns:
         Dict with marker count
     """
     try:
-        project = reapy.Project()
+        if rpp_path:
+            return {"count": sum(1 for m in read_rpp(rpp_path)["markers"] if not m["region"])}
+        project = current_project()
         count = project.n_markers
         return {"count": count}
     except Exception as e:
@@ -128,14 +168,19 @@ def get_marker_count() -> Dict[str, Any]:
 
 
 @mcp.tool()
-def get_region_count() -> Dict[str, Any]:
+def get_region_count(rpp_path: Optional[str] = None) -> Dict[str, Any]:
     """Get the number of regions in the project.
     
+    Args:
+        rpp_path: Read a saved .rpp file from disk instead of the live project
+    
     Returns:
         Dict with region count
     """
     try:
-        project = reapy.Project()
+        if rpp_path:
+            return {"count": sum(1 for m in read_rpp(rpp_path)["markers"] if m["region"])}
+        project = current_project()
         count = project.n_regions
         return {"count": count}
     except Exception as e:
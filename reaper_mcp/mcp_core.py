@@ -1,7 +1,198 @@
+from __future__ import annotations
+
+import functools
+import importlib
+import inspect
+import typing
+from contextlib import AbstractContextManager, ExitStack
+from typing import Annotated, Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import pydantic_core
 from fastmcp import FastMCP
-from reaper_mcp.instructions import INSTRUCTIONS
+from pydantic import Field
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from reaper_mcp.instructions import render_instructions
+from reaper_mcp.pool import pool
+from reaper_mcp.tracing import tracer
+from reaper_mcp.util import note_local_write, use_project
+
+# Tool modules per profile; select with --tools / REAPER_MCP_TOOLS (comma-separated)
+PROFILES: Dict[str, Tuple[str, ...]] = {
+    "project": ("project",),
+    "transport": ("playback",),
+    "markers": ("markers",),
+    "tracks": ("tracks",),
+    "mixer": ("tracks", "fx", "coalesce", "envelopes"),
+    "fx": ("fx",),
+    "automation": ("envelopes",),
+    "tempo": ("tempo",),
+    "midi": ("midi",),
+    "items": ("items",),
+    "samples": ("samples",),
+    "sync": ("snapshot",),
+    "instances": ("instances",),
+}
+PROFILES["all"] = tuple(dict.fromkeys(m for modules in PROFILES.values() for m in modules))
+# Tools named like this only read; every other tool counts as a write (see noting_writes)
+READ_ONLY_PREFIXES = (
+    "list_", "get_", "find_", "search_", "detect_", "export_", "index_", "is_", "can_", "time_to_", "beats_to_",
+)
+
+
+def with_argument(
+    fn: Callable, name: str, annotation: Any, enter: Callable[[Any], AbstractContextManager]
+) -> Callable:
+    """Give a tool an extra optional keyword argument that selects the context it runs in.
+
+    ``enter(value)`` returns the context manager to run the tool in; a failure to
+    enter it (e.g. an unknown project or instance) is returned as a tool error.
+    """
+    signature = inspect.signature(fn)
+    if name in signature.parameters:
+        return fn
+    hints = typing.get_type_hints(fn)
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        value = kwargs.pop(name, None)
+        with ExitStack() as stack:
+            try:
+                stack.enter_context(enter(value))
+            except Exception as e:
+                detail = e.args[0] if isinstance(e, KeyError) and e.args else e
+                return {"error": f"Invalid {name} '{value}': {detail}"}
+            return fn(*args, **kwargs)
+
+    params = [p.replace(annotation=hints.get(n, p.annotation)) for n, p in signature.parameters.items()]
+    params.append(inspect.Parameter(name, inspect.Parameter.KEYWORD_ONLY, default=None, annotation=annotation))
+    returns = hints.get("return", signature.return_annotation)
+    wrapper.__signature__ = signature.replace(parameters=params, return_annotation=returns)
+    wrapper.__annotations__ = {**hints, name: annotation}
+    del wrapper.__wrapped__
+    return wrapper
+
+
+def traced_result(fn: Callable) -> Callable:
+    """Record the tool's arguments and result serialization in the active trace.
+
+    Calls that asked for a trace (``trace=True``) get the trace file's path back as
+    ``trace_file`` in their result.
+    """
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        trace = tracer.active()
+        if trace is None:
+            return fn(*args, **kwargs)
+        trace.args.update(kwargs, instance=pool.current_name())
+        result = fn(*args, **kwargs)
+        with tracer.span("serialize result", "serialize") as span:
+            span["bytes"] = len(pydantic_core.to_json(result, fallback=repr))
+        if trace.requested and isinstance(result, dict):
+            result = {**result, "trace_file": str(trace.path)}
+        return result
+
+    return wrapper
+
+
+def noting_writes(fn: Callable) -> Callable:
+    """Invalidate state-version keyed caches after the tool ran (see ``util.note_local_write``)."""
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            note_local_write()
+
+    return wrapper
+
+
+ProjectArg = Annotated[
+    Optional[Union[int, str]],
+    Field(description="Project tab to act on: tab index or .rpp path/file name (default: current tab)"),
+]
+InstanceArg = Annotated[
+    Optional[str],
+    Field(description='REAPER instance name, or "auto" for the least-loaded one (default: first instance)'),
+]
+TraceArg = Annotated[
+    Optional[bool],
+    Field(description="Record a timing trace of this call (true) or never trace it (false); default: sampled"),
+]
+
+
+class ToolRegistry:
+    """Collects ``@mcp.tool()`` functions per module and registers them on demand.
+
+    Tool modules import each other for helpers (e.g. tracks uses project), so
+    registration is decoupled from import: a module's tools are only added to the
+    server once it is enabled. Each tool also gets a ``project`` argument (tab index
+    or .rpp path/name), with tracing enabled a ``trace`` argument, and with several
+    REAPER instances configured an ``instance`` argument. Everything else is
+    delegated to the FastMCP server.
+    """
+
+    def __init__(self, server: FastMCP) -> None:
+        self.server = server
+        self._pending: Dict[str, List[Tuple[Callable, tuple, dict]]] = {}
+        self._enabled: Set[str] = set()
+        self.tool_names: List[str] = []
+
+    def tool(self, *args: Any, **kwargs: Any) -> Callable[[Callable], Callable]:
+        def decorator(fn: Callable) -> Callable:
+            if fn.__module__ in self._enabled:
+                self._register(fn, args, kwargs)
+            else:
+                self._pending.setdefault(fn.__module__, []).append((fn, args, kwargs))
+            return fn
+
+        return decorator
+
+    def _register(self, fn: Callable, args: tuple, kwargs: dict) -> None:
+        name = kwargs.get("name") or fn.__name__
+        tool = fn if name.startswith(READ_ONLY_PREFIXES) else noting_writes(fn)
+        tool = with_argument(tool, "project", ProjectArg, use_project)
+        if tracer.enabled:
+            tool = with_argument(traced_result(tool), "trace", TraceArg, functools.partial(tracer.record, name))
+        if pool.enabled:
+            # Outermost, so the project is resolved on the selected instance
+            tool = with_argument(tool, "instance", InstanceArg, pool.use)
+        self.server.tool(*args, **kwargs)(tool)
+        self.tool_names.append(name)
+
+    def enable(self, profiles: Iterable[str]) -> List[str]:
+        """Import and register the modules of ``profiles``; returns the enabled module names."""
+        modules: List[str] = []
+        for profile in profiles:
+            if profile not in PROFILES:
+                raise ValueError(f"Unknown tool profile '{profile}' (valid: {', '.join(sorted(PROFILES))})")
+            modules.extend(PROFILES[profile])
+        for name in dict.fromkeys(modules):
+            qualified = f"reaper_mcp.{name}"
+            if qualified in self._enabled:
+                continue
+            importlib.import_module(qualified)
+            self._enabled.add(qualified)
+            for fn, args, kwargs in self._pending.pop(qualified, []):
+                self._register(fn, args, kwargs)
+        self.server.instructions = render_instructions(self.tool_names)
+        return sorted(m.rsplit(".", 1)[1] for m in self._enabled)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.server, name)
+
 
 # Central MCP instance used by all tool modules
-mcp = FastMCP("Reaper MCP Server", INSTRUCTIONS)
+server = FastMCP("Reaper MCP Server", render_instructions())
+mcp = ToolRegistry(server)
+
+
+@server.custom_route("/health", methods=["GET"])
+async def health(request: Request) -> JSONResponse:
+    """Bridge health for load balancers (network transports): 503 once no REAPER instance accepts calls."""
+    report = pool.health()
+    return JSONResponse(report, status_code=503 if report["status"] == "unavailable" else 200)
 
-__all__ = ["mcp"]
+__all__ = ["PROFILES", "READ_ONLY_PREFIXES", "ToolRegistry", "mcp", "noting_writes", "server", "traced_result", "with_argument"]
@@ -1,61 +1,111 @@
 from __future__ import annotations
 
+import io
 import logging
 import os
 import tempfile
 import base64 as _b64
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+import mido
+import numpy as np
 import pretty_midi as pm
-import reapy
+from reapy import reascript_api as RPR
 
 from reaper_mcp.mcp_core import mcp
+from reaper_mcp.tempo_map import get_tempo_map
+from reaper_mcp.util import NoteBuffer, bridge_batch, current_project
 
 logger = logging.getLogger(__name__)
 
+# Ticks per quarter note used to quantize notes before their item (and take) exists
+_GRID_PPQ = 960.0
+
 
 @mcp.tool()
 def add_midi_to_track(
     track_index: int,
-    notes: List[Dict[str, Any]],
+    notes: Optional[List[Dict[str, Any]]] = None,
     start_time: float = 0.0,
     quantize_qn: Optional[float] = None,
+    columns: Optional[Dict[str, Any]] = None,
+    packed_notes: Optional[str] = None,
 ) -> Dict[str, Any]:
-    """Add a list of MIDI notes to a track as a new MIDI item.
+    """Add MIDI notes to a track as a new MIDI item.
+
+    Notes can be given in one of three forms; the columnar forms are much smaller and
+    faster to parse for large inserts:
 
     Args:
         track_index: Track index (0-based) to add MIDI to
         notes: List of dicts with keys: start (s), end (s), pitch (0-127), velocity (1-127), channel (0-15)
         start_time: Offset seconds for the item
         quantize_qn: If provided, quantize note starts/ends to this quarter-note grid
+        columns: Parallel arrays {"start": [...], "end": [...], "pitch": [...], "velocity": [...] or int,
+            "channel": [...] or int}; velocity/channel are optional
+        packed_notes: Base64 of a packed little-endian buffer: uint32 count, float64 start[count],
+            float64 end[count], uint8 pitch[count], uint8 velocity[count], uint8 channel[count]
     
     Note: If you receive a 422 error, ensure numeric parameters (track_index, start_time, quantize_qn)
           are sent as numbers, not strings.
     """
     logger.info(f"add_midi_to_track called with track_index={track_index}, start_time={start_time}, "
-                f"quantize_qn={quantize_qn}, notes count={len(notes) if notes else 0}")
+                f"quantize_qn={quantize_qn}, notes count={len(notes) if notes else 0}, "
+                f"columns={columns is not None}, packed_notes={packed_notes is not None}")
+    if sum(x is not None for x in (notes, columns, packed_notes)) != 1:
+        return {"error": "Provide exactly one of notes, columns or packed_notes"}
     try:
-        project = reapy.Project()
-        tracks = list(project.tracks)
-        if track_index < 0 or track_index >= len(tracks):
-            error_msg = f"Track index out of range: {track_index} (valid: 0-{len(tracks)-1})"
-            logger.warning(error_msg)
-            return {"error": error_msg}
-        track = tracks[track_index]
-        item_start = float(start_time)
-        item_length = max((float(n["end"]) for n in notes), default=0.0)
-        # Create new MIDI item in project
-        item = track.add_midi_item(start=item_start, length=item_length)
-        # Insert notes
-        for nd in notes:
-            start = float(nd.get("start", 0.0))
-            end = float(nd.get("end", start + 0.25))
-            channel = int(nd.get("channel", 0))
-            pitch = int(nd.get("pitch", 60))
-            velocity = int(nd.get("velocity", 100))
-            item.add_note(pitch=pitch, start=start, end=end, velocity=velocity, channel=channel)
-        logger.info(f"Successfully added {len(notes)} MIDI notes to track {track_index}")
-        return {"ok": True}
+        if packed_notes is not None:
+            buf = NoteBuffer.from_packed(_b64.b64decode(packed_notes.encode("ascii")))
+        elif columns is not None:
+            buf = NoteBuffer.from_columns(columns)
+        else:
+            buf = NoteBuffer.from_dicts(notes)
+    except Exception as e:
+        error_msg = f"Invalid note data: {e}"
+        logger.warning(error_msg)
+        return {"error": error_msg}
+    try:
+        project = current_project()
+        with bridge_batch("Add MIDI notes"):
+            tracks = list(project.tracks)
+            if track_index < 0 or track_index >= len(tracks):
+                error_msg = f"Track index out of range: {track_index} (valid: 0-{len(tracks)-1})"
+                logger.warning(error_msg)
+                return {"error": error_msg}
+            track = tracks[track_index]
+            item_start = float(start_time)
+            start = np.frombuffer(buf.start, dtype=np.float64)
+            end = np.frombuffer(buf.end, dtype=np.float64)
+            item_end = item_start + buf.max_end
+            if quantize_qn:
+                # Quantize on the project QN grid first so the item is sized to the quantized notes
+                base_qn = float(_time_to_qn(project, np.array([item_start]))[0])
+                cols = {"start": (_time_to_qn(project, item_start + start) - base_qn) * _GRID_PPQ,
+                        "end": (_time_to_qn(project, item_start + end) - base_qn) * _GRID_PPQ,
+                        "pitch": np.frombuffer(buf.pitch, dtype=np.uint8)}
+                _apply_midi_transforms(
+                    cols, [{"type": "quantize", "grid_qn": quantize_qn, "ends": True}],
+                    base_qn, _GRID_PPQ, 0.0, np.random.default_rng(),
+                )
+                if len(buf):
+                    item_end = _qn_to_time(project, base_qn + float(cols["end"].max()) / _GRID_PPQ)
+            # Create new MIDI item in project
+            item = track.add_midi_item(start=item_start, end=item_end)
+            take = item.active_take
+            if quantize_qn:
+                qn_offset, ppq_per_qn = _take_qn_grid(take)
+                start = (base_qn - qn_offset) * ppq_per_qn + cols["start"] * (ppq_per_qn / _GRID_PPQ)
+                end = (base_qn - qn_offset) * ppq_per_qn + cols["end"] * (ppq_per_qn / _GRID_PPQ)
+            else:
+                start = _seconds_to_ppq(project, take, item_start, start)
+                end = _seconds_to_ppq(project, take, item_start, end)
+            pitch = np.frombuffer(buf.pitch, dtype=np.uint8)
+            velocity = np.frombuffer(buf.velocity, dtype=np.uint8)
+            channel = np.frombuffer(buf.channel, dtype=np.uint8)
+            _insert_take_notes(take, start, end, pitch, velocity, channel)
+        logger.info(f"Successfully added {len(buf)} MIDI notes to track {track_index}")
+        return {"ok": True, "notes": len(buf)}
     except Exception as e:
         error_msg = f"Failed to add MIDI: {e}"
         logger.error(error_msg, exc_info=True)
@@ -79,7 +129,7 @@ def generate_midi_pattern(
         qn_per_step = 4.0 / steps_per_bar
         bpm = 120.0
         try:
-            project = reapy.Project()
+            project = current_project()
             bpm = project.bpm
         except Exception:
             pass
@@ -128,7 +178,7 @@ def generate_pretty_midi(
         # Determine BPM from REAPER if possible
         bpm = 120.0
         try:
-            project = reapy.Project()
+            project = current_project()
             bpm = project.bpm
         except Exception:
             pass
@@ -177,7 +227,7 @@ def add_midi_file_to_track(track_index: int, midi_base64: str, insert_time: floa
     """
     logger.info(f"add_midi_file_to_track called with track_index={track_index}, insert_time={insert_time}")
     try:
-        project = reapy.Project()
+        project = current_project()
         tracks = list(project.tracks)
         if track_index < 0 or track_index >= len(tracks):
             error_msg = f"Track index out of range: {track_index} (valid: 0-{len(tracks)-1})"
@@ -203,3 +253,383 @@ def add_midi_file_to_track(track_index: int, midi_base64: str, insert_time: floa
         error_msg = f"Failed to add MIDI file: {e}"
         logger.error(error_msg, exc_info=True)
         return {"error": error_msg}
+
+
+# Column order of a take's note data as returned by RPR.MIDI_GetNote (after the
+# take/index echo). Times are in MIDI ticks (ppq) relative to the take start.
+_NOTE_COLUMNS = ("selected", "muted", "start", "end", "channel", "pitch", "velocity")
+
+
+def _read_take_notes(take) -> Dict[str, np.ndarray]:
+    """Read all notes of a MIDI take into column arrays (ppq timing)."""
+    rows = [RPR.MIDI_GetNote(take.id, i, 0, 0, 0, 0, 0, 0, 0)[3:] for i in range(take.n_notes)]
+    data = np.array(rows, dtype=np.float64).reshape(-1, len(_NOTE_COLUMNS))
+    return {name: data[:, i] for i, name in enumerate(_NOTE_COLUMNS)}
+
+
+def _write_take_notes(take, cols: Dict[str, np.ndarray]) -> None:
+    """Write column arrays back over the take's notes, sorting once at the end."""
+    for i in range(len(cols["pitch"])):
+        RPR.MIDI_SetNote(
+            take.id, i,
+            bool(cols["selected"][i]), bool(cols["muted"][i]),
+            float(cols["start"][i]), float(cols["end"][i]),
+            int(cols["channel"][i]), int(cols["pitch"][i]), int(cols["velocity"][i]),
+            True,
+        )
+    RPR.MIDI_Sort(take.id)
+
+
+def _take_qn_grid(take) -> Tuple[float, float]:
+    """Return (project QN at take start, ppq per quarter note) for a MIDI take."""
+    qn_offset = RPR.MIDI_GetProjQNFromPPQPos(take.id, 0.0)
+    ppq_per_qn = RPR.MIDI_GetPPQPosFromProjQN(take.id, qn_offset + 1.0)
+    ppq_per_qn -= RPR.MIDI_GetPPQPosFromProjQN(take.id, qn_offset)
+    return qn_offset, ppq_per_qn
+
+
+def _seconds_to_ppq(project, take, item_start: float, seconds: np.ndarray) -> np.ndarray:
+    """Convert item-relative seconds to take ppq.
+
+    Uses the locally cached tempo map; only projects with gradual tempo ramps fall
+    back to converting each position through REAPER.
+    """
+    tempo_map = get_tempo_map(project)
+    if not tempo_map.has_ramps:
+        qn_offset, ppq_per_qn = _take_qn_grid(take)
+        return (tempo_map.time_to_qn(item_start + seconds) - qn_offset) * ppq_per_qn
+    return np.array([take.time_to_ppq(item_start + float(t)) for t in seconds], dtype=np.float64)
+
+
+def _time_to_qn(project, times: np.ndarray) -> np.ndarray:
+    """Convert project times (seconds) to quarter notes, through REAPER only for tempo ramps."""
+    tempo_map = get_tempo_map(project)
+    if not tempo_map.has_ramps:
+        return tempo_map.time_to_qn(times)
+    return np.array([RPR.TimeMap2_timeToQN(project.id, float(t)) for t in times], dtype=np.float64)
+
+
+def _qn_to_time(project, qn: float) -> float:
+    """Convert a quarter-note position to project time (seconds)."""
+    tempo_map = get_tempo_map(project)
+    if not tempo_map.has_ramps:
+        return float(tempo_map.qn_to_time(qn))
+    return float(RPR.TimeMap2_QNToTime(project.id, qn))
+
+
+def _insert_take_notes(
+    take,
+    start: np.ndarray,
+    end: np.ndarray,
+    pitch: np.ndarray,
+    velocity: np.ndarray,
+    channel: np.ndarray,
+) -> None:
+    """Insert notes (ppq timing) into a take, sorting once at the end."""
+    for i in range(len(pitch)):
+        RPR.MIDI_InsertNote(
+            take.id, False, False,
+            float(start[i]), float(end[i]),
+            int(channel[i]), int(pitch[i]), int(velocity[i]),
+            True,
+        )
+    RPR.MIDI_Sort(take.id)
+
+
+def _apply_midi_transforms(
+    cols: Dict[str, np.ndarray],
+    transforms: List[Dict[str, Any]],
+    qn_offset: float,
+    ppq_per_qn: float,
+    ppq_per_second: float,
+    rng: np.random.Generator,
+) -> None:
+    """Apply a chain of transforms in place to note columns (ppq timing)."""
+    for t in transforms:
+        kind = str(t.get("type", "")).lower()
+        if kind == "transpose":
+            cols["pitch"] = cols["pitch"] + int(t.get("semitones", 0))
+        elif kind == "velocity":
+            scale = float(t.get("scale", 1.0))
+            offset = float(t.get("offset", 0.0))
+            curve = float(t.get("curve", 1.0))
+            v = 127.0 * np.power(cols["velocity"] / 127.0, curve) * scale + offset
+            cols["velocity"] = np.clip(np.rint(v), int(t.get("min", 1)), int(t.get("max", 127)))
+        elif kind == "humanize":
+            n = len(cols["start"])
+            timing = float(t.get("timing_ms", 0.0)) / 1000.0 * ppq_per_second
+            if timing > 0:
+                shift = rng.uniform(-timing, timing, n)
+                shift = np.maximum(shift, -cols["start"])
+                cols["start"] = cols["start"] + shift
+                cols["end"] = cols["end"] + shift
+            vel = float(t.get("velocity", 0.0))
+            if vel > 0:
+                v = cols["velocity"] + rng.uniform(-vel, vel, n)
+                cols["velocity"] = np.clip(np.rint(v), 1, 127)
+        elif kind == "quantize":
+            grid = float(t.get("grid_qn", 0.25))
+            if grid <= 0:
+                raise ValueError(f"quantize grid_qn must be > 0, got {grid}")
+            strength = float(t.get("strength", 1.0))
+            start_qn = qn_offset + cols["start"] / ppq_per_qn
+            delta = (np.round(start_qn / grid) * grid - start_qn) * strength * ppq_per_qn
+            length = cols["end"] - cols["start"]
+            cols["start"] = np.maximum(cols["start"] + delta, 0.0)
+            if t.get("ends", False):
+                end_qn = qn_offset + cols["end"] / ppq_per_qn
+                end_delta = (np.round(end_qn / grid) * grid - end_qn) * strength * ppq_per_qn
+                cols["end"] = cols["end"] + end_delta
+            else:
+                cols["end"] = cols["start"] + length
+        elif kind == "clamp_length":
+            length = cols["end"] - cols["start"]
+            if t.get("min_qn") is not None:
+                length = np.maximum(length, float(t["min_qn"]) * ppq_per_qn)
+            if t.get("max_qn") is not None:
+                length = np.minimum(length, float(t["max_qn"]) * ppq_per_qn)
+            cols["end"] = cols["start"] + length
+        else:
+            raise ValueError(f"Unknown transform type: {t.get('type')}")
+    cols["pitch"] = np.clip(cols["pitch"], 0, 127)
+    # Never leave zero-length (or inverted) notes behind
+    cols["end"] = np.maximum(cols["end"], cols["start"] + 1)
+
+
+@mcp.tool()
+def transform_midi_items(
+    transforms: List[Dict[str, Any]],
+    track_indices: Optional[List[int]] = None,
+    item_indices: Optional[List[int]] = None,
+    selected_items: bool = False,
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Apply a chain of note transforms to existing MIDI items in place.
+
+    Notes are read once per item, transformed locally, and written back in a single
+    bridge session with one undo point.
+
+    Args:
+        transforms: Ordered list of transform dicts, each with a "type" key:
+            - {"type": "transpose", "semitones": int}
+            - {"type": "velocity", "scale": 1.0, "offset": 0, "curve": 1.0, "min": 1, "max": 127}
+              (curve is a gamma applied to velocity/127; <1 boosts soft notes, >1 softens them)
+            - {"type": "humanize", "timing_ms": float, "velocity": float}
+            - {"type": "quantize", "grid_qn": 0.25, "strength": 1.0, "ends": false}
+            - {"type": "clamp_length", "min_qn": float, "max_qn": float}
+        track_indices: Tracks (0-based) whose MIDI items are transformed
+        item_indices: Optional item indices (0-based, per track) to restrict to
+        selected_items: If true, transform the selected items instead of track_indices
+        seed: Random seed for humanize (a seed is generated and returned if omitted)
+
+    Returns:
+        Dict with the number of items and notes transformed and the seed used; items
+        that were not transformed (index out of range, no active take, or not a MIDI
+        take) are listed under "skipped" with the reason
+    """
+    logger.info(f"transform_midi_items called with track_indices={track_indices}, item_indices={item_indices}, "
+                f"selected_items={selected_items}, transforms={transforms}")
+    if not transforms:
+        return {"error": "At least one transform is required"}
+    if not selected_items and not track_indices:
+        return {"error": "Provide track_indices or set selected_items"}
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy % (2**32))
+    rng = np.random.default_rng(seed)
+    try:
+        project = current_project()
+        with bridge_batch("Transform MIDI items"):
+            # (track index, item index, item); indices of selected items are looked up only when reported
+            items = []
+            skipped = []
+            if selected_items:
+                items = [(None, None, item) for item in project.selected_items]
+            else:
+                tracks = list(project.tracks)
+                for ti in track_indices:
+                    if ti < 0 or ti >= len(tracks):
+                        error_msg = f"Track index out of range: {ti} (valid: 0-{len(tracks)-1})"
+                        logger.warning(error_msg)
+                        return {"error": error_msg}
+                    track_items = list(tracks[ti].items)
+                    for i in item_indices if item_indices is not None else range(len(track_items)):
+                        if 0 <= i < len(track_items):
+                            items.append((ti, i, track_items[i]))
+                        else:
+                            skipped.append({"track_index": ti, "item_index": i, "reason": "item index out of range"})
+
+            n_items = 0
+            n_notes = 0
+            for ti, ii, item in items:
+                take = item.active_take if item.n_takes else None
+                if take is None or not take.is_midi:
+                    if ti is None:
+                        ti = item.track.index
+                        ii = int(RPR.GetMediaItemInfo_Value(item.id, "IP_ITEMNUMBER"))
+                    reason = "no active take" if take is None else "not a MIDI take"
+                    skipped.append({"track_index": ti, "item_index": ii, "reason": reason})
+                    continue
+                cols = _read_take_notes(take)
+                if len(cols["pitch"]) == 0:
+                    continue
+                qn_offset, ppq_per_qn = _take_qn_grid(take)
+                position = item.position
+                ppq_per_second = take.time_to_ppq(position + 1.0) - take.time_to_ppq(position)
+                _apply_midi_transforms(cols, transforms, qn_offset, ppq_per_qn, ppq_per_second, rng)
+                _write_take_notes(take, cols)
+                n_items += 1
+                n_notes += len(cols["pitch"])
+        logger.info(f"Transformed {n_notes} notes across {n_items} MIDI items")
+        result = {"ok": True, "items": n_items, "notes": n_notes, "seed": seed}
+        if skipped:
+            result["skipped"] = skipped
+        return result
+    except Exception as e:
+        error_msg = f"Failed to transform MIDI items: {e}"
+        logger.error(error_msg, exc_info=True)
+        return {"error": error_msg}
+
+
+def _split_midi_parts(midi_file: mido.MidiFile) -> List[Dict[str, Any]]:
+    """Collect a MIDI file's notes into parts keyed by (program, channel).
+
+    Parts are returned in order of their first note; each holds the part's program,
+    channel, the name of the first track it appears on, and its notes as
+    (start tick, end tick, pitch, velocity) tuples.
+    """
+    parts: Dict[Tuple[int, int], Dict[str, Any]] = {}
+    for track in midi_file.tracks:
+        tick = 0
+        name = ""
+        program = [0] * 16
+        # (channel, pitch) -> sounding notes as (start tick, velocity, program), oldest first
+        sounding: Dict[Tuple[int, int], List[Tuple[int, int, int]]] = {}
+        for msg in track:
+            tick += msg.time
+            if msg.type == "track_name":
+                name = msg.name
+            elif msg.type == "program_change":
+                program[msg.channel] = msg.program
+            elif msg.type == "note_on" and msg.velocity > 0:
+                sounding.setdefault((msg.channel, msg.note), []).append((tick, msg.velocity, program[msg.channel]))
+            elif msg.type in ("note_on", "note_off") and sounding.get((msg.channel, msg.note)):
+                start, velocity, prog = sounding[(msg.channel, msg.note)].pop(0)
+                part = parts.setdefault(
+                    (prog, msg.channel), {"program": prog, "channel": msg.channel, "name": name, "notes": []}
+                )
+                part["notes"].append((start, max(tick, start + 1), msg.note, velocity))
+    return sorted(parts.values(), key=lambda part: min(note[0] for note in part["notes"]))
+
+
+@mcp.tool()
+def import_midi_file_split(
+    midi_base64: str,
+    insert_time: float = 0.0,
+    track_indices: Optional[List[int]] = None,
+    new_track_index: Optional[int] = None,
+    use_file_tempo: bool = True,
+) -> Dict[str, Any]:
+    """Import a multi-part MIDI file with one track per (program, channel) part, in one batch.
+
+    The file is parsed locally; every part becomes a MIDI item on its own track, keeping
+    the notes' original MIDI channel, and all tracks, items and notes are inserted in a
+    single bridge session with one undo point.
+
+    Args:
+        midi_base64: Base64-encoded MIDI file data
+        insert_time: Time position in seconds where the file starts
+        track_indices: Existing tracks (0-based) to assign parts to, in file order.
+            Parts without an assigned track get a new track.
+        new_track_index: Where to insert new tracks (default: end of project)
+        use_file_tempo: Insert the file's tempo changes as project tempo markers
+
+    Returns: { tracks: [{part, name, track_index, program, channel, is_drum, notes}], tempo_changes: int }
+    """
+    logger.info(f"import_midi_file_split called with insert_time={insert_time}, track_indices={track_indices}, "
+                f"new_track_index={new_track_index}, use_file_tempo={use_file_tempo}")
+    try:
+        data = _b64.b64decode(midi_base64.encode("ascii"))
+        midi_file = mido.MidiFile(file=io.BytesIO(data))
+        file_tempo = pm.PrettyMIDI(io.BytesIO(data)).get_tempo_changes() if use_file_tempo else ([], [])
+    except Exception as e:
+        return {"error": f"Failed to parse MIDI file: {e}"}
+    parts = _split_midi_parts(midi_file)
+    if not parts:
+        return {"error": "MIDI file contains no notes"}
+    try:
+        resolution = float(midi_file.ticks_per_beat)
+        project = current_project()
+        with bridge_batch("Import MIDI file"):
+            tracks = list(project.tracks)
+            assigned = list(track_indices or [])
+            for ti in assigned:
+                if ti < 0 or ti >= len(tracks):
+                    error_msg = f"Track index out of range: {ti} (valid: 0-{len(tracks)-1})"
+                    logger.warning(error_msg)
+                    return {"error": error_msg}
+
+            tempo_changes = 0
+            if use_file_tempo:
+                for t, bpm in zip(*file_tempo):
+                    RPR.SetTempoTimeSigMarker(project.id, -1, float(insert_time) + float(t), -1, -1, float(bpm), 0, 0, False)
+                    tempo_changes += 1
+                if tempo_changes:
+                    RPR.UpdateTimeline()
+            insert_qn = project.time_to_beats(float(insert_time))
+
+            n_new = len(parts) - min(len(parts), len(assigned))
+            next_index = len(tracks) if new_track_index is None else max(0, min(int(new_track_index), len(tracks)))
+            created = []
+            for k in range(n_new):
+                created.append(project.add_track(index=next_index + k))
+            # Inserted tracks shift assigned indices at or after the insertion point
+            assigned = [ti + n_new if ti >= next_index else ti for ti in assigned]
+
+            result = []
+            for n, part in enumerate(parts):
+                if n < len(assigned):
+                    track, track_index = project.tracks[assigned[n]], assigned[n]
+                else:
+                    track, track_index = created[n - len(assigned)], next_index + n - len(assigned)
+                is_drum = part["channel"] == 9
+                name = part["name"].strip() or ("Drums" if is_drum else pm.program_to_instrument_name(part["program"]))
+                if n >= len(assigned):
+                    track.name = name
+
+                notes = np.array(part["notes"], dtype=np.int64).reshape(-1, 4)
+                start_tick = notes[:, 0].astype(np.float64)
+                end_tick = notes[:, 1].astype(np.float64)
+                pitch, velocity = notes[:, 2], notes[:, 3]
+                channel = np.full(len(pitch), part["channel"], dtype=np.int64)
+
+                item_start_qn = insert_qn + start_tick.min() / resolution
+                item_end_qn = insert_qn + end_tick.max() / resolution
+                item = track.add_midi_item(
+                    start=project.beats_to_time(item_start_qn),
+                    end=project.beats_to_time(item_end_qn),
+                )
+                take = item.active_take
+                RPR.GetSetMediaItemTakeInfo_String(take.id, "P_NAME", name, True)
+                _, ppq_per_qn = _take_qn_grid(take)
+                offset_qn = item_start_qn - insert_qn
+                _insert_take_notes(
+                    take,
+                    (start_tick / resolution - offset_qn) * ppq_per_qn,
+                    (end_tick / resolution - offset_qn) * ppq_per_qn,
+                    pitch, velocity, channel,
+                )
+                result.append({
+                    "part": n,
+                    "name": name,
+                    "track_index": track_index,
+                    "program": part["program"],
+                    "channel": part["channel"],
+                    "is_drum": is_drum,
+                    "notes": len(pitch),
+                })
+        logger.info(f"Imported {len(result)} MIDI parts ({n_new} new tracks)")
+        return {"tracks": result, "tempo_changes": tempo_changes}
+    except Exception as e:
+        error_msg = f"Failed to import MIDI file: {e}"
+        logger.error(error_msg, exc_info=True)
+        return {"error": error_msg}
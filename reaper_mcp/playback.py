@@ -3,9 +3,10 @@ from __future__ import annotations
 import logging
 from typing import Any, Dict
 
-import reapy
+from reapy import reascript_api as RPR
 
 from reaper_mcp.mcp_core import mcp
+from reaper_mcp.util import current_project
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +20,7 @@ def play() -> Dict[str, Any]:
     """
     logger.info("play called")
     try:
-        project = reapy.Project()
+        project = current_project()
         project.play()
         logger.info("Playback started")
         return {"ok": True, "action": "play"}
@@ -38,7 +39,7 @@ def pause() -> Dict[str, Any]:
     """
     logger.info("pause called")
     try:
-        project = reapy.Project()
+        project = current_project()
         project.pause()
         logger.info("Playback paused")
         return {"ok": True, "action": "pause"}
@@ -57,7 +58,7 @@ def stop() -> Dict[str, Any]:
     """
     logger.info("stop called")
     try:
-        project = reapy.Project()
+        project = current_project()
         project.stop()
         logger.info("Playback stopped")
         return {"ok": True, "action": "stop"}
@@ -76,7 +77,7 @@ def record() -> Dict[str, Any]:
     """
     logger.info("record called")
     try:
-        project = reapy.Project()
+        project = current_project()
         project.record()
         logger.info("Recording started")
         return {"ok": True, "action": "record"}
@@ -98,8 +99,9 @@ def set_cursor_position(position: float) -> Dict[str, Any]:
     """
     logger.info(f"set_cursor_position called with position={position}")
     try:
-        project = reapy.Project()
-        project.cursor_position = float(position)
+        project = current_project()
+        # reapy's cursor_position setter moves the cursor of the current tab
+        RPR.SetEditCurPos2(project.id, float(position), True, True)
         logger.info(f"Cursor position set to {position}")
         return {"ok": True, "position": position}
     except Exception as e:
@@ -117,7 +119,7 @@ def get_cursor_position() -> Dict[str, Any]:
     """
     logger.info("get_cursor_position called")
     try:
-        project = reapy.Project()
+        project = current_project()
         position = project.cursor_position
         logger.info(f"Cursor position: {position}")
         return {"position": position}
@@ -140,7 +142,7 @@ def set_time_selection(start: float, end: float) -> Dict[str, Any]:
     """
     logger.info(f"set_time_selection called with start={start}, end={end}")
     try:
-        project = reapy.Project()
+        project = current_project()
         project.select(start=float(start), end=float(end))
         logger.info(f"Time selection set from {start} to {end}")
         return {"ok": True, "start": start, "end": end, "length": end - start}
@@ -159,7 +161,7 @@ def get_time_selection() -> Dict[str, Any]:
     """
     logger.info("get_time_selection called")
     try:
-        project = reapy.Project()
+        project = current_project()
         time_sel = project.time_selection
         result = {
             "start": time_sel.start,
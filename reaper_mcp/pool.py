@@ -0,0 +1,405 @@
+from __future__ import annotations
+
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import reapy
+from reapy.errors import DistError
+from reapy.tools import json
+from reapy.tools.network import machines
+from reapy.tools.network.client import Client
+from reapy.tools.network.socket import Socket
+from reapy.tools.network.web_interface import WebInterface
+
+from reaper_mcp.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Remote-call wrapper reapy defines for each ReaScript API function (see load_api)
+_API_FUNCTION = "@reapy.inside_reaper()\ndef {name}(*args): return {name}(*args)"
+
+# Selector value that routes a call to the least-loaded healthy instance
+AUTO = "auto"
+
+# Seconds to wait for REAPER to answer one bridge request (0 waits forever)
+CALL_TIMEOUT = float(os.environ.get("REAPER_MCP_CALL_TIMEOUT", "30"))
+CONNECT_TIMEOUT = 2.0
+# Extra attempts for read-only requests that fail on the connection
+READ_RETRIES = int(os.environ.get("REAPER_MCP_READ_RETRIES", "2"))
+# Consecutive failures that open an instance's circuit breaker, and seconds it stays open
+BREAKER_THRESHOLD = int(os.environ.get("REAPER_MCP_BREAKER_THRESHOLD", "3"))
+BREAKER_COOLDOWN = float(os.environ.get("REAPER_MCP_BREAKER_COOLDOWN", "5"))
+
+# Circuit breaker states
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+# ReaScript getters (GetTrack, TrackFX_GetParam, CountTracks, EnumProjects, ...) and reapy
+# property getters / get_* methods; safe to send again after a dropped connection
+_READ_RE = re.compile(r"^(?:\w+_)?(?:Get(?!Set)|Count|Enum|Is|Has|TimeMap)|(?:^|\.)(?:fget|_?get_\w*)$")
+
+
+def request_name(function: Any) -> str:
+    """Name of a bridge request's function (``function`` as passed to ``Client.request``)."""
+    if isinstance(function, dict):
+        return function.get("name", "")
+    if callable(function):
+        return getattr(function, "__qualname__", "")
+    return str(function)
+
+
+def is_idempotent(function: Any) -> bool:
+    """Whether a bridge request only reads REAPER state."""
+    if not (isinstance(function, dict) or callable(function)):
+        # HOLD / RELEASE
+        return False
+    return bool(_READ_RE.search(request_name(function)))
+
+
+class BridgeUnavailable(ConnectionError):
+    """Raised without contacting REAPER while an instance's circuit breaker is open."""
+
+
+class Instance:
+    """One REAPER instance, reached through the web interface port reapy uses for discovery.
+
+    The bridge socket is shared by every thread routed here, so requests are
+    serialized with ``lock`` (re-entrant, so a ``bridge_batch`` can hold it across
+    its HOLD/RELEASE span). The connection is opened lazily and dropped on any
+    failure, to be re-opened by the next request.
+
+    Each request has a deadline of ``call_timeout`` seconds; read-only requests are
+    retried with backoff on connection failures. After ``BREAKER_THRESHOLD``
+    consecutive failures the circuit breaker opens and requests fail fast for
+    ``BREAKER_COOLDOWN`` seconds, after which a single probe request decides
+    whether it closes again.
+    """
+
+    def __init__(self, name: str, host: str, port: int) -> None:
+        self.name = name
+        self.host = host
+        self.port = port
+        self.lock = threading.RLock()
+        self.client: Optional[_BridgeClient] = None
+        self.call_timeout = CALL_TIMEOUT or None
+        self.read_retries = READ_RETRIES
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._breaker_lock = threading.Lock()
+        self.handle = _Handle(self)
+
+    @property
+    def healthy(self) -> bool:
+        return self.consecutive_failures == 0
+
+    def connect(self) -> _BridgeClient:
+        with self.lock:
+            if self.client is None:
+                try:
+                    server_port = WebInterface(self.port, self.host).get_reapy_server_port()
+                    self.client = _BridgeClient(server_port, self.host, CONNECT_TIMEOUT, self.call_timeout)
+                except Exception as e:
+                    raise ConnectionError(
+                        f"REAPER instance '{self.name}' at {self.host}:{self.port} is unreachable: {e}"
+                    ) from e
+                logger.info(f"Connected to REAPER instance '{self.name}' at {self.host}:{self.port}")
+            return self.client
+
+    def request(self, function: Any, input: Any = None) -> Any:
+        """Send one bridge request with the deadline, circuit breaker and read retries applied."""
+        attempts = 1 + (self.read_retries if is_idempotent(function) else 0)
+        for attempt in range(attempts):
+            self._admit()
+            with self.lock:
+                if self.state == OPEN:
+                    # The breaker opened while this request waited for the connection
+                    self._admit()
+                self.requests += 1
+                try:
+                    result = self.connect().send_request(function, input)
+                except DistError:
+                    # REAPER answered with a Python error, so the bridge itself is fine
+                    self._record_success()
+                    raise
+                except Exception as e:
+                    self.mark_failed(e)
+                    if not isinstance(e, OSError):
+                        raise
+                    error = e
+                else:
+                    self._record_success()
+                    return result
+            if attempt + 1 == attempts or self.state != CLOSED:
+                break
+            delay = min(1.0, 0.05 * 2 ** attempt)
+            time.sleep(delay + random.uniform(0, delay))
+        if isinstance(error, TimeoutError):
+            raise TimeoutError(
+                f"REAPER instance '{self.name}' did not answer within {self.call_timeout:g}s"
+            ) from error
+        raise ConnectionError(
+            f"Lost connection to REAPER instance '{self.name}': {str(error) or type(error).__name__}"
+        ) from error
+
+    def _admit(self) -> None:
+        with self._breaker_lock:
+            if self.state == CLOSED:
+                return
+            retry_in = self._opened_at + BREAKER_COOLDOWN - time.monotonic()
+            if self.state == OPEN and retry_in <= 0:
+                # This request is the probe; others keep failing fast until it completes
+                self.state = HALF_OPEN
+                return
+            raise BridgeUnavailable(
+                f"REAPER instance '{self.name}' is not responding "
+                f"(circuit open after {self.consecutive_failures} failures, retry in {max(0.0, retry_in):.1f}s): "
+                f"{self.last_error}"
+            )
+
+    def _record_success(self) -> None:
+        with self._breaker_lock:
+            if self.state != CLOSED:
+                logger.info(f"REAPER instance '{self.name}' is responding again; circuit closed")
+            self.state = CLOSED
+            self.consecutive_failures = 0
+
+    def mark_failed(self, error: BaseException) -> None:
+        with self.lock:
+            self.failures += 1
+            self.last_error = str(error) or type(error).__name__
+            if self.client is not None:
+                try:
+                    self.client.close()
+                except OSError:
+                    pass
+                self.client = None
+        with self._breaker_lock:
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= BREAKER_THRESHOLD:
+                if self.state != OPEN:
+                    logger.warning(f"REAPER instance '{self.name}' is not responding; circuit open: {self.last_error}")
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+
+    def status(self) -> Dict[str, Any]:
+        retry_in = self._opened_at + BREAKER_COOLDOWN - time.monotonic() if self.state == OPEN else 0.0
+        return {
+            "name": self.name,
+            "host": self.host,
+            "port": self.port,
+            "connected": self.client is not None,
+            "healthy": self.healthy,
+            "state": self.state,
+            "retry_in": round(max(0.0, retry_in), 3),
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+        }
+
+
+class _BridgeClient(Client):
+    """reapy bridge client with deadlines on connecting and on each answer."""
+
+    def __init__(self, port: int, host: str, connect_timeout: float, call_timeout: Optional[float]) -> None:
+        self.connect_timeout = connect_timeout
+        self.call_timeout = call_timeout
+        super().__init__(port, host)
+
+    def _connect(self, port, host):
+        self.settimeout(self.connect_timeout)
+        Socket.connect(self, (host, port))
+        self.address = self.recv(timeout=self.connect_timeout).decode("ascii")
+
+    def send_request(self, function, input=None):
+        with tracer.span("encode", "serialize") as span:
+            request = json.dumps({"function": function, "input": input}).encode()
+            span["bytes"] = len(request)
+        self.settimeout(self.call_timeout)
+        with tracer.span("send + wait for REAPER", "rpc"):
+            self.send(request)
+            raw = self.recv(timeout=self.call_timeout)
+        with tracer.span("decode", "serialize", bytes=len(raw)):
+            result = json.loads(raw.decode())
+        if result["type"] == "error":
+            raise DistError(result["traceback"])
+        return result["value"]
+
+
+class _Handle:
+    """What reapy sees as the selected client; every request goes through the instance."""
+
+    def __init__(self, instance: Instance) -> None:
+        self.instance = instance
+        self.host = instance.host
+
+    def request(self, function, input=None):
+        with tracer.span(request_name(function), "rpc", instance=self.instance.name):
+            return self.instance.request(function, input)
+
+
+def parse_instances(spec: str) -> List[Instance]:
+    """Parse ``"name=host:port,host:port,..."``; the port is REAPER's web interface port."""
+    instances: List[Instance] = []
+    for entry in (e.strip() for e in spec.split(",")):
+        if not entry:
+            continue
+        name, _, address = entry.rpartition("=")
+        host, _, port = address.rpartition(":")
+        if not host or not port.isdigit():
+            raise ValueError(f"Invalid instance '{entry}' (expected [name=]host:port)")
+        name = name or address
+        if any(i.name == name for i in instances):
+            raise ValueError(f"Duplicate instance name '{name}'")
+        instances.append(Instance(name, host, int(port)))
+    return instances
+
+
+class BridgePool:
+    """Named REAPER instances with per-thread routing of reapy calls.
+
+    Empty by default, in which case every reapy call goes to ``default`` (the
+    REAPER reapy itself connected to). Once configured, every reapy call made on a
+    thread is sent to the instance selected with ``use`` (or the first instance
+    outside of ``use``).
+    """
+
+    def __init__(self) -> None:
+        self.instances: Dict[str, Instance] = {}
+        self.default: Optional[Instance] = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.instances)
+
+    def configure(self, instances: List[Instance]) -> None:
+        self.instances = {i.name: i for i in instances}
+
+    def current(self) -> Optional[Instance]:
+        """Instance reapy calls on this thread go to (None when the pool is not in use)."""
+        inst = getattr(self._local, "instance", None)
+        if inst is None and self.instances:
+            inst = next(iter(self.instances.values()))
+        return inst
+
+    def target(self) -> Optional[Instance]:
+        """Instance this thread's reapy calls are sent to, including the unpooled default."""
+        return self.current() or self.default
+
+    def current_name(self) -> Optional[str]:
+        inst = self.current()
+        return inst.name if inst is not None else None
+
+    def select(self, name: Optional[str] = None) -> Instance:
+        if not self.instances:
+            raise KeyError("No REAPER instances configured (set REAPER_MCP_INSTANCES)")
+        if not name:
+            return next(iter(self.instances.values()))
+        if name == AUTO:
+            instances = list(self.instances.values())
+            candidates = (
+                [i for i in instances if i.healthy]
+                or [i for i in instances if i.state != OPEN]
+                or instances
+            )
+            return min(candidates, key=lambda i: (i.in_flight, i.requests))
+        try:
+            return self.instances[name]
+        except KeyError:
+            raise KeyError(f"Unknown REAPER instance '{name}' (available: {', '.join(self.instances)})") from None
+
+    @contextmanager
+    def use(self, name: Optional[str] = None) -> Iterator[Instance]:
+        """Route this thread's reapy calls to an instance for the duration of the block."""
+        inst = self.select(name)
+        previous = getattr(self._local, "instance", None)
+        with self._lock:
+            inst.in_flight += 1
+        self._local.instance = inst
+        try:
+            yield inst
+        finally:
+            self._local.instance = previous
+            with self._lock:
+                inst.in_flight -= 1
+
+    def health(self) -> Dict[str, Any]:
+        """Breaker state of every instance; "unavailable" once none of them accepts requests."""
+        instances = list(self.instances.values()) or ([self.default] if self.default is not None else [])
+        if all(i.healthy for i in instances):
+            status = "ok"
+        elif any(i.state != OPEN for i in instances):
+            status = "degraded"
+        else:
+            status = "unavailable"
+        return {"status": status, "pooled": self.enabled, "instances": [i.status() for i in instances]}
+
+    def load_api(self) -> None:
+        """Define reapy's ReaScript API functions from the first instance that answers.
+
+        reapy only defines them (``reascript_api.CountTracks`` and so on) when it reaches
+        its default REAPER on import, so with a pool of other instances they are loaded
+        here, before any tool uses them. Raises BridgeUnavailable if no instance answers.
+        """
+        from reapy import reascript_api
+
+        if not self.instances or hasattr(reascript_api, "__all__"):
+            return
+        errors = []
+        for inst in self.instances.values():
+            try:
+                with self.use(inst.name):
+                    names = reascript_api._get_api_names()
+            except Exception as e:
+                errors.append(f"{inst.name}: {e}")
+                continue
+            exec("\n".join(_API_FUNCTION.format(name=name) for name in names), reascript_api.__dict__)
+            reascript_api.__all__ = names
+            logger.info(f"Loaded {len(names)} ReaScript API functions from REAPER instance '{inst.name}'")
+            return
+        raise BridgeUnavailable(f"Could not load the ReaScript API from any REAPER instance ({'; '.join(errors)})")
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        """Hold the current instance's connection for a multi-request block."""
+        inst = self.target()
+        if inst is None:
+            yield
+            return
+        with inst.lock:
+            yield
+
+
+pool = BridgePool()
+pool.configure(parse_instances(os.environ.get("REAPER_MCP_INSTANCES", "")))
+
+if not reapy.is_inside_reaper():
+    host = machines.get_selected_machine_host() or "localhost"
+    pool.default = Instance("default", host, reapy.config.WEB_INTERFACE_PORT)
+
+_default_selected_client = machines.get_selected_client
+
+
+def _selected_client():
+    inst = pool.target()
+    return _default_selected_client() if inst is None else inst.handle
+
+
+# reapy looks the client up on every request; route it through the pool
+machines.get_selected_client = _selected_client
+
+
+__all__ = ["AUTO", "BridgePool", "BridgeUnavailable", "Instance", "is_idempotent", "parse_instances", "pool", "request_name"]
@@ -1,22 +1,60 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
-
-import reapy
+import logging
+from typing import Any, Dict, List, Optional
 
+from reaper_mcp.cache import single_flight
 from reaper_mcp.mcp_core import mcp
+from reaper_mcp.rpp import iter_rpp_files, read_rpp, read_rpp_many
+from reaper_mcp.snapshot import collect_snapshot
+from reaper_mcp.util import (
+    bridge_batch,
+    cache_scope,
+    current_project,
+    list_open_projects,
+    paginate,
+    remove_tracks,
+    select_fields,
+)
+
+logger = logging.getLogger(__name__)
+
+# Per-track fields get_project_details/list_tracks can return
+TRACK_LIST_FIELDS = ("guid", "name", "volume", "pan", "mute", "solo", "armed", "color", "depth")
 
 
 @mcp.tool()
-def get_project_details() -> Dict[str, Any]:
-    """Get basic project details: bpm, track count, track names."""
+@single_flight(scope=cache_scope)
+def get_project_details(
+    rpp_path: Optional[str] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    name_filter: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """Get basic project details: bpm, track count, track names.
+
+    Args:
+        rpp_path: Read a saved .rpp file from disk instead of the live project
+        offset: Skip this many (matching) tracks
+        limit: Return at most this many tracks (default: all); pass next_offset back as
+            offset to get the following page
+        name_filter: Only tracks whose name contains this text (case-insensitive)
+        fields: Per-track fields to return besides index (default ["name"]):
+            guid, name, volume, pan, mute, solo, armed, color, depth
+    """
     try:
-        project = reapy.Project()
-        bpm = project.bpm
-        tracks = []
-        for i, track in enumerate(project.tracks):
-            tracks.append({"index": i, "name": track.name})
-        return {"bpm": bpm, "track_count": len(tracks), "tracks": tracks}
+        want = select_fields(fields, TRACK_LIST_FIELDS, ("name",))
+        if rpp_path:
+            parsed = read_rpp(rpp_path)
+            bpm, tracks = parsed["project"]["bpm"], parsed["tracks"]
+        else:
+            # Live read in one held bridge session; only the requested fields are read
+            read = select_fields(set(want) | ({"name"} if name_filter else set()), TRACK_LIST_FIELDS, want)
+            _, snapshot = collect_snapshot(current_project(), {"project": ("bpm",), "track": read}, cached=False)
+            bpm, tracks = snapshot["project"]["bpm"], snapshot["tracks"]
+        page = paginate(tracks, "tracks", offset, limit, name_filter, fields=want)
+        return {"bpm": bpm, "track_count": len(tracks), **page}
     except Exception as e:
         return {"error": f"Failed to query project details: {e}"}
 
@@ -26,20 +64,26 @@ def new_project(clear_tracks: bool = True) -> Dict[str, Any]:
     """Initialize the current project (optionally clearing all tracks)."""
     try:
         if clear_tracks:
-            project = reapy.Project()
-            # Delete tracks in reverse order to avoid index shifting issues
-            for track in reversed(list(project.tracks)):
-                track.delete()
+            project = current_project()
+            with bridge_batch("Clear project tracks"):
+                remove_tracks(project, range(project.n_tracks))
         return {"ok": True}
     except Exception as e:
         return {"error": f"Failed to initialize project: {e}"}
 
 
 @mcp.tool()
-def get_project_length() -> Dict[str, Any]:
-    """Get the project length in seconds."""
+def get_project_length(rpp_path: Optional[str] = None) -> Dict[str, Any]:
+    """Get the project length in seconds.
+
+    Args:
+        rpp_path: Read a saved .rpp file from disk instead of the live project
+            (length is the end of the last item)
+    """
     try:
-        project = reapy.Project()
+        if rpp_path:
+            return {"length": read_rpp(rpp_path)["project"]["length"]}
+        project = current_project()
         length = project.length
         return {"length": length}
     except Exception as e:
@@ -50,7 +94,7 @@ def get_project_length() -> Dict[str, Any]:
 def save_project() -> Dict[str, Any]:
     """Save the current project."""
     try:
-        project = reapy.Project()
+        project = current_project()
         project.save()
         return {"ok": True}
     except Exception as e:
@@ -61,7 +105,7 @@ def save_project() -> Dict[str, Any]:
 def get_play_state() -> Dict[str, Any]:
     """Get the current playback state (playing, paused, stopped, recording)."""
     try:
-        project = reapy.Project()
+        project = current_project()
         state = {
             "is_playing": project.is_playing,
             "is_paused": project.is_paused,
@@ -77,7 +121,7 @@ def get_play_state() -> Dict[str, Any]:
 def get_play_position() -> Dict[str, Any]:
     """Get the current play position in seconds."""
     try:
-        project = reapy.Project()
+        project = current_project()
         position = project.play_position
         return {"position": position}
     except Exception as e:
@@ -88,7 +132,7 @@ def get_play_position() -> Dict[str, Any]:
 def get_play_rate() -> Dict[str, Any]:
     """Get the current playback rate (1.0 is normal speed)."""
     try:
-        project = reapy.Project()
+        project = current_project()
         rate = project.play_rate
         return {"rate": rate}
     except Exception as e:
@@ -103,7 +147,7 @@ def undo() -> Dict[str, Any]:
         Dict with ok status on success or error message
     """
     try:
-        project = reapy.Project()
+        project = current_project()
         project.undo()
         return {"ok": True, "action": "undo"}
     except Exception as e:
@@ -118,7 +162,7 @@ def redo() -> Dict[str, Any]:
         Dict with ok status on success or error message
     """
     try:
-        project = reapy.Project()
+        project = current_project()
         project.redo()
         return {"ok": True, "action": "redo"}
     except Exception as e:
@@ -133,7 +177,7 @@ def can_undo() -> Dict[str, Any]:
         Dict with can_undo boolean
     """
     try:
-        project = reapy.Project()
+        project = current_project()
         can_undo_val = project.can_undo()
         return {"can_undo": can_undo_val}
     except Exception as e:
@@ -148,7 +192,7 @@ def can_redo() -> Dict[str, Any]:
         Dict with can_redo boolean
     """
     try:
-        project = reapy.Project()
+        project = current_project()
         can_redo_val = project.can_redo()
         return {"can_redo": can_redo_val}
     except Exception as e:
@@ -166,7 +210,7 @@ def beats_to_time(beats: float) -> Dict[str, Any]:
         Dict with time in seconds
     """
     try:
-        project = reapy.Project()
+        project = current_project()
         time = project.beats_to_time(float(beats))
         return {"beats": beats, "time": time}
     except Exception as e:
@@ -184,13 +228,30 @@ def time_to_beats(time: float) -> Dict[str, Any]:
         Dict with beats (quarter notes)
     """
     try:
-        project = reapy.Project()
+        project = current_project()
         beats = project.time_to_beats(float(time))
         return {"time": time, "beats": beats}
     except Exception as e:
         return {"error": f"Failed to convert time to beats: {e}"}
 
 
+@mcp.tool()
+def list_projects() -> Dict[str, Any]:
+    """List the open project tabs.
+
+    Any tool can target one of them with project=<tab index> or project=<.rpp path or
+    file name>, without switching tabs in REAPER; by default tools act on the current tab.
+
+    Returns:
+        Dict with projects (index, name, file, current)
+    """
+    try:
+        projects = [{k: p[k] for k in ("index", "name", "file", "current")} for p in list_open_projects()]
+        return {"projects": projects, "count": len(projects)}
+    except Exception as e:
+        return {"error": f"Failed to list projects: {e}"}
+
+
 @mcp.tool()
 def get_project_name() -> Dict[str, Any]:
     """Get the project name.
@@ -199,7 +260,7 @@ def get_project_name() -> Dict[str, Any]:
         Dict with project name
     """
     try:
-        project = reapy.Project()
+        project = current_project()
         name = project.name
         return {"name": name}
     except Exception as e:
@@ -214,7 +275,7 @@ def get_project_path() -> Dict[str, Any]:
         Dict with project path (empty string if not saved)
     """
     try:
-        project = reapy.Project()
+        project = current_project()
         path = project.path
         return {"path": path}
     except Exception as e:
@@ -229,8 +290,66 @@ def is_project_dirty() -> Dict[str, Any]:
         Dict with is_dirty boolean
     """
     try:
-        project = reapy.Project()
+        project = current_project()
         dirty = project.is_dirty()
         return {"is_dirty": dirty}
     except Exception as e:
         return {"error": f"Failed to check project dirty status: {e}"}
+
+
+@mcp.tool()
+def index_rpp_projects(
+    directories: List[str],
+    query: Optional[str] = None,
+    limit: int = 200,
+    max_workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Summarise saved .rpp projects under directories without going through REAPER.
+
+    Files are parsed in parallel across cores and cached by modification time, so
+    re-indexing an unchanged archive is cheap.
+
+    Args:
+        directories: Directories to scan recursively for .rpp files
+        query: Only return projects whose file name, track names, FX names or item
+            source files contain this text (case-insensitive)
+        limit: Maximum number of projects to return
+        max_workers: Worker processes for parsing (default: CPU count)
+
+    Returns:
+        Dict with per-project summaries (path, bpm, length, track names, FX names,
+        source files), the number of files scanned and any parse errors
+    """
+    logger.info(f"index_rpp_projects called with directories={directories}, query={query}, limit={limit}")
+    try:
+        paths = list(iter_rpp_files([str(d) for d in directories]))
+        parsed = read_rpp_many(paths, max_workers=max_workers)
+        needle = query.lower() if query else None
+        projects, errors = [], []
+        for path in paths:
+            data = parsed[path]
+            if "error" in data:
+                errors.append({"path": path, "error": data["error"]})
+                continue
+            tracks = data["tracks"]
+            summary = {
+                "path": path,
+                "bpm": data["project"]["bpm"],
+                "length": data["project"]["length"],
+                "track_count": len(tracks),
+                "tracks": [t["name"] for t in tracks],
+                "fx": sorted({fx["name"] for t in tracks for fx in t["fx"]}),
+                "sources": sorted({i["source"] for t in tracks for i in t["items"] if i["source"]}),
+            }
+            if needle:
+                haystack = [path] + summary["tracks"] + summary["fx"] + summary["sources"]
+                if not any(needle in h.lower() for h in haystack):
+                    continue
+            projects.append(summary)
+            if len(projects) >= max(1, int(limit)):
+                break
+        return {"projects": projects, "scanned": len(paths), "errors": errors}
+    except Exception as e:
+        error_msg = f"Failed to index projects: {e}"
+        logger.error(error_msg, exc_info=True)
+        return {"error": error_msg}
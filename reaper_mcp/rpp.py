@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from reaper_mcp.audio import file_key
+from reaper_mcp.cache import LRUCache
+from reaper_mcp.tracing import tracer
+
+# FX block tags inside <FXCHAIN>; the plugin name is the first argument
+_FX_TAGS = {"VST", "AU", "CLAP", "DX", "LV2", "JS", "VIDEO_EFFECT"}
+# Set in PEAKCOL / I_CUSTOMCOLOR when the track has a custom color
+_CUSTOM_COLOR_FLAG = 0x1000000
+
+# (path, size, mtime) -> parsed project
+_rpp_cache = LRUCache(maxsize=256)
+
+
+def split_rpp_line(line: str) -> List[str]:
+    """Split an .rpp line into tokens, honouring ", ' and ` quoting."""
+    out: List[str] = []
+    i, n = 0, len(line)
+    while i < n:
+        c = line[i]
+        if c == " " or c == "\t":
+            i += 1
+        elif c == '"' or c == "'" or c == "`":
+            j = line.find(c, i + 1)
+            if j < 0:
+                j = n
+            out.append(line[i + 1:j])
+            i = j + 1
+        else:
+            j = i
+            while j < n and line[j] != " " and line[j] != "\t":
+                j += 1
+            out.append(line[i:j])
+            i = j
+    return out
+
+
+def _num(tokens: List[str], i: int, default: float = 0.0) -> float:
+    try:
+        return float(tokens[i])
+    except (IndexError, ValueError):
+        return default
+
+
+def _new_track(index: int, guid: str) -> Dict[str, Any]:
+    return {
+        "index": index,
+        "guid": guid,
+        "name": "",
+        "volume": 1.0,
+        "pan": 0.0,
+        "mute": False,
+        "solo": 0,
+        "armed": False,
+        "color": 0,
+        "depth": 0,
+        "items": [],
+        "fx": [],
+        "sends": [],
+    }
+
+
+def _finish_item(item: Dict[str, Any], takes: List[Dict[str, Any]], active: int) -> Dict[str, Any]:
+    take = takes[active] if 0 <= active < len(takes) else {}
+    item["name"] = take.get("name", "")
+    item["source"] = take.get("source", "")
+    item["midi"] = take.get("midi", False)
+    return item
+
+
+def iter_rpp_lines(path: str) -> Iterator[str]:
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for raw in f:
+            line = raw.strip()
+            if line:
+                yield line
+
+
+def parse_rpp(path: str) -> Dict[str, Any]:
+    """Parse a saved .rpp project into the same shape ``export_project_snapshot`` returns.
+
+    Streams the file line by line and only tokenises lines it needs, so plugin state
+    and MIDI event data are skipped cheaply. Sends come from the receiving track's
+    AUXRECV lines; an item's name/source are those of its active take.
+    """
+    tracks: List[Dict[str, Any]] = []
+    markers: List[Dict[str, Any]] = []
+    tempo: List[Dict[str, Any]] = []
+    receives: List[Tuple[int, int, List[str]]] = []
+    open_regions: Dict[int, Dict[str, Any]] = {}
+    bpm = 120.0
+    stack: List[str] = []
+    track: Optional[Dict[str, Any]] = None
+    item: Optional[Dict[str, Any]] = None
+    takes: List[Dict[str, Any]] = []
+    active_take = 0
+    fx_enabled = True
+
+    for line in iter_rpp_lines(path):
+        first = line[0]
+        if first == "<":
+            tokens = split_rpp_line(line[1:])
+            tag = tokens[0] if tokens else ""
+            parent = stack[-1] if stack else None
+            stack.append(tag)
+            if tag == "TRACK":
+                track = _new_track(len(tracks), tokens[1] if len(tokens) > 1 else "")
+            elif tag == "ITEM" and parent == "TRACK":
+                item = {"index": len(track["items"]), "guid": "", "position": 0.0, "length": 0.0, "mute": False}
+                takes, active_take = [{}], 0
+            elif tag == "SOURCE" and item is not None:
+                if len(tokens) > 1 and tokens[1] == "MIDI":
+                    takes[-1]["midi"] = True
+            elif parent == "FXCHAIN" and tag in _FX_TAGS and track is not None:
+                name = tokens[1] if len(tokens) > 1 else tag
+                if tag == "JS":
+                    name = f"JS: {name}"
+                track["fx"].append({"index": len(track["fx"]), "guid": "", "name": name, "enabled": fx_enabled})
+            continue
+        if first == ">":
+            if not stack:
+                continue
+            tag = stack.pop()
+            if tag == "TRACK" and track is not None:
+                tracks.append(track)
+                track = None
+            elif tag == "ITEM" and item is not None and track is not None and (not stack or stack[-1] == "TRACK"):
+                track["items"].append(_finish_item(item, takes, active_take))
+                item = None
+            continue
+
+        ctx = stack[-1] if stack else None
+        key, _, rest = line.partition(" ")
+        if ctx == "TRACK" and track is not None:
+            if key == "NAME":
+                tokens = split_rpp_line(rest)
+                track["name"] = tokens[0] if tokens else ""
+            elif key == "VOLPAN":
+                tokens = rest.split()
+                track["volume"] = _num(tokens, 0, 1.0)
+                track["pan"] = _num(tokens, 1)
+            elif key == "MUTESOLO":
+                tokens = rest.split()
+                track["mute"] = bool(int(_num(tokens, 0)))
+                track["solo"] = int(_num(tokens, 1))
+            elif key == "REC":
+                track["armed"] = bool(int(_num(rest.split(), 0)))
+            elif key == "PEAKCOL":
+                # Like I_CUSTOMCOLOR: only a custom color (0x1000000 flag set) counts, else 0
+                color = int(_num(rest.split(), 0))
+                track["color"] = color if color & _CUSTOM_COLOR_FLAG else 0
+            elif key == "ISBUS":
+                tokens = rest.split()
+                track["depth"] = int(_num(tokens, 1)) if int(_num(tokens, 0)) else 0
+            elif key == "TRACKID" and not track["guid"]:
+                track["guid"] = rest.strip()
+            elif key == "AUXRECV":
+                tokens = split_rpp_line(rest)
+                receives.append((int(_num(tokens, 0)), track["index"], tokens))
+        elif ctx == "ITEM" and item is not None:
+            if key == "POSITION":
+                item["position"] = _num(rest.split(), 0)
+            elif key == "LENGTH":
+                item["length"] = _num(rest.split(), 0)
+            elif key == "MUTE":
+                item["mute"] = bool(int(_num(rest.split(), 0)))
+            elif key == "IGUID":
+                item["guid"] = rest.strip()
+            elif key == "NAME":
+                tokens = split_rpp_line(rest)
+                takes[-1]["name"] = tokens[0] if tokens else ""
+            elif key == "TAKE":
+                takes.append({})
+                if "SEL" in rest.split():
+                    active_take = len(takes) - 1
+        elif ctx == "SOURCE" and item is not None:
+            if key == "FILE":
+                tokens = split_rpp_line(rest)
+                takes[-1]["source"] = tokens[0] if tokens else ""
+        elif ctx == "FXCHAIN" and track is not None:
+            if key == "BYPASS":
+                fx_enabled = not int(_num(rest.split(), 0))
+            elif key == "FXID" and track["fx"]:
+                track["fx"][-1]["guid"] = rest.strip()
+        elif ctx == "REAPER_PROJECT":
+            if key == "TEMPO":
+                bpm = _num(rest.split(), 0, bpm)
+            elif key == "MARKER":
+                tokens = split_rpp_line(rest)
+                number = int(_num(tokens, 0))
+                position = _num(tokens, 1)
+                flags = int(_num(tokens, 3))
+                if flags & 1:
+                    region = open_regions.pop(number, None)
+                    if region is not None:
+                        region["end"] = position
+                        continue
+                    entry = {"number": number, "region": True, "position": position, "end": position}
+                    open_regions[number] = entry
+                else:
+                    entry = {"number": number, "region": False, "position": position, "end": None}
+                entry["name"] = tokens[2] if len(tokens) > 2 else ""
+                entry["color"] = int(_num(tokens, 4))
+                markers.append(entry)
+        elif ctx == "TEMPOENVEX" and key == "PT":
+            tokens = rest.split()
+            timesig = int(_num(tokens, 3))
+            tempo.append({
+                "time": _num(tokens, 0),
+                "bpm": _num(tokens, 1),
+                "num": timesig & 0xFFFF,
+                "denom": timesig >> 16,
+                "linear": int(_num(tokens, 2, 1.0)) == 0,
+            })
+
+    guids = [t["guid"] for t in tracks]
+    for src, dest, tokens in receives:
+        if 0 <= src < len(tracks):
+            tracks[src]["sends"].append({
+                "index": len(tracks[src]["sends"]),
+                "dest": dest,
+                "dest_guid": guids[dest],
+                "volume": _num(tokens, 2, 1.0),
+                "pan": _num(tokens, 3),
+                "mute": bool(int(_num(tokens, 4))),
+            })
+    length = max((i["position"] + i["length"] for t in tracks for i in t["items"]), default=0.0)
+    markers.sort(key=lambda m: m["position"])
+    return {
+        "project": {
+            "name": os.path.basename(path),
+            "path": os.path.dirname(os.path.abspath(path)),
+            "bpm": bpm,
+            "length": length,
+        },
+        "tracks": tracks,
+        "markers": markers,
+        "tempo": tempo,
+    }
+
+
+def read_rpp(path: str) -> Dict[str, Any]:
+    """Parsed contents of ``path``, re-parsed only when the file's size or mtime changes.
+
+    Raises OSError if the file cannot be read.
+    """
+    key = file_key(path)
+    parsed = _rpp_cache.get(key)
+    if parsed is None:
+        with tracer.span("parse rpp", "file", path=path):
+            parsed = parse_rpp(path)
+        _rpp_cache.put(key, parsed)
+    return parsed
+
+
+def _parse_or_error(path: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    try:
+        return parse_rpp(path), None
+    except Exception as e:
+        return None, str(e)
+
+
+def read_rpp_many(paths: List[str], max_workers: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """Parse many projects, using the cache where possible and a process pool for the rest.
+
+    Files that fail to parse map to ``{"error": ...}``.
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    pending: Dict[str, Tuple[str, int, int]] = {}
+    for path in dict.fromkeys(paths):
+        try:
+            key = file_key(path)
+        except OSError as e:
+            results[path] = {"error": str(e)}
+            continue
+        cached = _rpp_cache.get(key)
+        if cached is not None:
+            results[path] = cached
+        else:
+            pending[path] = key
+    if len(pending) == 1:
+        outcomes = [_parse_or_error(next(iter(pending)))]
+    elif pending:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            outcomes = list(pool.map(_parse_or_error, pending, chunksize=8))
+    else:
+        outcomes = []
+    for (path, key), (parsed, error) in zip(pending.items(), outcomes):
+        if parsed is None:
+            results[path] = {"error": error}
+        else:
+            _rpp_cache.put(key, parsed)
+            results[path] = parsed
+    return results
+
+
+def iter_rpp_files(dirs: List[str]) -> Iterator[str]:
+    """Yield .rpp files under ``dirs`` (backups such as .rpp-bak are skipped)."""
+    for d in dirs:
+        for root, _, files in os.walk(d):
+            for fn in files:
+                if fn.lower().endswith(".rpp"):
+                    yield os.path.join(root, fn)
+
+
+__all__ = ["iter_rpp_files", "parse_rpp", "read_rpp", "read_rpp_many", "split_rpp_line"]
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from reaper_mcp.audio import FEATURE_DIM, compute_features
+from reaper_mcp.cache import atomic_write
+from reaper_mcp.tracing import tracer
+
+AUDIO_EXTS = [".wav", ".aiff", ".aif", ".flac", ".mp3", ".ogg"]
+# Only these can be decoded locally for feature extraction
+ANALYSABLE_EXTS = (".wav",)
+
+
+def iter_audio_files(dirs: List[str], exts: Optional[List[str]] = None) -> Iterator[str]:
+    """Yield audio file paths under ``dirs`` whose names end with one of ``exts``."""
+    exts = tuple(e.lower() for e in (exts or AUDIO_EXTS))
+    for d in dirs:
+        for root, _, files in os.walk(d):
+            for fn in files:
+                if fn.lower().endswith(exts):
+                    yield os.path.join(root, fn)
+
+
+class SampleIndex:
+    """Persistent nearest-neighbour index over per-sample feature vectors.
+
+    Stored as ``sample_index.npy`` (float32 features, one row per file) and
+    ``sample_index.json`` (path, size, mtime per row) in ``directory``. Updates only
+    analyse files that are new or changed since the last update.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+        self._lock = threading.RLock()
+        # Serializes updates; feature extraction runs outside ``_lock`` so queries are not blocked
+        self._update_lock = threading.Lock()
+        self._loaded = False
+        # Set when the sample dir config changes; the next query updates first
+        self.stale = False
+        self.paths: List[str] = []
+        self.stamps: List[Tuple[int, int]] = []
+        self.features = np.zeros((0, FEATURE_DIM), dtype=np.float32)
+        # path -> row in ``features``
+        self._rows: Dict[str, int] = {}
+        self._normalized: Optional[np.ndarray] = None
+        self._mean: Optional[np.ndarray] = None
+        self._std: Optional[np.ndarray] = None
+
+    @property
+    def _matrix_file(self) -> Path:
+        return self.directory / "sample_index.npy"
+
+    @property
+    def _meta_file(self) -> Path:
+        return self.directory / "sample_index.json"
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with tracer.span("load sample index", "file", path=str(self.directory)):
+                meta = json.loads(self._meta_file.read_text(encoding="utf-8"))
+                features = np.load(self._matrix_file)
+        except (OSError, ValueError):
+            return
+        if features.shape != (len(meta.get("paths", [])), FEATURE_DIM):
+            return  # stale layout; rebuild from scratch
+        self.paths = list(meta["paths"])
+        self.stamps = [tuple(s) for s in meta["stamps"]]
+        self.features = features.astype(np.float32, copy=False)
+        self._rows = {p: i for i, p in enumerate(self.paths)}
+        self._normalized = None
+
+    def _save(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        buf = io.BytesIO()
+        with tracer.span("encode sample index", "serialize"):
+            np.save(buf, self.features)
+        atomic_write(self._matrix_file, buf.getvalue())
+        meta = {"paths": self.paths, "stamps": [list(s) for s in self.stamps]}
+        atomic_write(self._meta_file, json.dumps(meta).encode("utf-8"))
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._load()
+            return len(self.paths)
+
+    def invalidate(self) -> None:
+        """Forget in-memory state so the next access reloads from disk."""
+        with self._lock:
+            self._loaded = False
+            self.paths, self.stamps = [], []
+            self.features = np.zeros((0, FEATURE_DIM), dtype=np.float32)
+            self._rows = {}
+            self._normalized = None
+
+    def mark_stale(self) -> None:
+        self.stale = True
+
+    def update(self, dirs: List[str], rebuild: bool = False, max_workers: Optional[int] = None) -> Dict[str, int]:
+        """Bring the index in line with the files under ``dirs``; returns change counts.
+
+        New and changed files are analysed without holding the index lock, so queries
+        keep answering from the previous index until the new rows are swapped in.
+        """
+        with self._update_lock:
+            with self._lock:
+                self.stale = False
+                if rebuild:
+                    paths, stamps = [], []
+                    features = np.zeros((0, FEATURE_DIM), dtype=np.float32)
+                else:
+                    self._load()
+                    paths, stamps, features = self.paths, self.stamps, self.features
+            current: Dict[str, Tuple[int, int]] = {}
+            for path in iter_audio_files(dirs, list(ANALYSABLE_EXTS)):
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                current[path] = (st.st_size, st.st_mtime_ns)
+
+            keep = [i for i, p in enumerate(paths) if current.get(p) == stamps[i]]
+            known = {paths[i] for i in keep}
+            todo = [p for p in current if p not in known]
+            removed = len(paths) - len(keep)
+
+            new_paths: List[str] = []
+            new_rows: List[np.ndarray] = []
+            if todo:
+                if len(todo) == 1:
+                    results = [compute_features(todo[0])]
+                else:
+                    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                        results = list(pool.map(compute_features, todo, chunksize=16))
+                for path, vec in zip(todo, results):
+                    if vec is not None:
+                        new_paths.append(path)
+                        new_rows.append(vec)
+
+            if todo or removed or rebuild:
+                parts = [features[keep]]
+                if new_rows:
+                    parts.append(np.vstack(new_rows))
+                paths = [paths[i] for i in keep] + new_paths
+                stamps = [stamps[i] for i in keep] + [current[p] for p in new_paths]
+                features = np.concatenate(parts).astype(np.float32, copy=False)
+                with self._lock:
+                    self._loaded = True
+                    self.paths, self.stamps, self.features = paths, stamps, features
+                    self._rows = {p: i for i, p in enumerate(paths)}
+                    self._normalized = None
+                    self._save()
+            return {
+                "indexed": len(paths),
+                "added": len(new_paths),
+                "removed": removed,
+                "failed": len(todo) - len(new_paths),
+            }
+
+    def _prepare(self) -> np.ndarray:
+        if self._normalized is None:
+            self._mean = self.features.mean(axis=0)
+            self._std = self.features.std(axis=0) + 1e-6
+            z = (self.features - self._mean) / self._std
+            self._normalized = z / (np.linalg.norm(z, axis=1, keepdims=True) + 1e-12)
+        return self._normalized
+
+    def vector_for(self, path: str) -> Optional[np.ndarray]:
+        with self._lock:
+            self._load()
+            row = self._rows.get(path)
+            return None if row is None else self.features[row]
+
+    def query(self, vector: np.ndarray, k: int = 10, exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """Return up to ``k`` (path, cosine similarity) pairs closest to ``vector``."""
+        with self._lock:
+            self._load()
+            if not self.paths:
+                return []
+            matrix = self._prepare()
+            z = (np.asarray(vector, dtype=np.float32) - self._mean) / self._std
+            z /= np.linalg.norm(z) + 1e-12
+            scores = matrix @ z
+            n = min(len(scores), k + 1)
+            top = np.argpartition(-scores, n - 1)[:n]
+            top = top[np.argsort(-scores[top])]
+            hits = [(self.paths[i], float(scores[i])) for i in top if self.paths[i] != exclude]
+            return hits[:k]
+
+
+__all__ = ["AUDIO_EXTS", "SampleIndex", "iter_audio_files"]
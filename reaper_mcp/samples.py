@@ -1,22 +1,73 @@
 from __future__ import annotations
 
+import base64 as _b64
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import reapy
+from reapy import reascript_api as RPR
 
+from reaper_mcp.audio import compute_features, estimate_tempos, get_peaks
 from reaper_mcp.mcp_core import mcp
-from reaper_mcp.util import _load_sample_dirs, _save_sample_dirs
+from reaper_mcp.sample_index import AUDIO_EXTS, SampleIndex
+from reaper_mcp.tempo_map import get_tempo_map
+from reaper_mcp.util import (
+    SAMPLE_DIRS_FILE,
+    _load_sample_dirs,
+    _save_sample_dirs,
+    bridge_batch,
+    current_project,
+    paginate,
+    sample_dir_store,
+)
 
 logger = logging.getLogger(__name__)
 
+# Similarity index persisted next to sample_dirs.json; refreshed after the dir list changes
+_sample_index = SampleIndex(SAMPLE_DIRS_FILE.parent)
+sample_dir_store.subscribe(lambda dirs: _sample_index.mark_stale())
+
+
+def _insert_audio_item(track, file_path: str, position: float, playrate: Optional[float] = None):
+    """Create an item on ``track`` holding ``file_path`` at ``position`` and return it.
+
+    The item length follows the source length, adjusted for ``playrate``.
+    """
+    item = reapy.Item(RPR.AddMediaItemToTrack(track.id))
+    take = reapy.Take(RPR.AddTakeToMediaItem(item.id))
+    source = RPR.PCM_Source_CreateFromFile(file_path)
+    RPR.SetMediaItemTake_Source(take.id, source)
+    length = RPR.GetMediaSourceLength(source, False)[0]
+    rate = float(playrate) if playrate else 1.0
+    if playrate:
+        take.set_info_value("D_PLAYRATE", rate)
+    item.position = float(position)
+    item.length = length / rate
+    return item
+
+
+def _existing_files(paths: List[str]) -> Dict[str, bool]:
+    """Check which of ``paths`` are files, stat-ing them concurrently."""
+    unique = list(dict.fromkeys(paths))
+    if not unique:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(32, len(unique))) as pool:
+        return dict(zip(unique, pool.map(os.path.isfile, unique)))
+
 
 @mcp.tool()
-def list_sample_dirs() -> Dict[str, Any]:
-    """List configured sample directories."""
-    return {"sample_dirs": _load_sample_dirs()}
+def list_sample_dirs(offset: int = 0, limit: Optional[int] = None, name_filter: Optional[str] = None) -> Dict[str, Any]:
+    """List configured sample directories.
+
+    Args:
+        offset: Skip this many (matching) directories
+        limit: Return at most this many (default: all)
+        name_filter: Only directories whose path contains this text (case-insensitive)
+    """
+    return paginate(_load_sample_dirs(), "sample_dirs", offset, limit, name_filter)
 
 
 @mcp.tool()
@@ -28,7 +79,7 @@ def add_sample_dir(path: str) -> Dict[str, Any]:
     if path not in dirs:
         dirs.append(path)
         _save_sample_dirs(dirs)
-    return {"sample_dirs": dirs}
+    return {"sample_dirs": _load_sample_dirs()}
 
 
 @mcp.tool()
@@ -36,42 +87,51 @@ def remove_sample_dir(path: str) -> Dict[str, Any]:
     """Remove a sample directory."""
     dirs = [d for d in _load_sample_dirs() if d != path]
     _save_sample_dirs(dirs)
-    return {"sample_dirs": dirs}
+    return {"sample_dirs": sorted(dirs)}
 
 
 @mcp.tool()
-def search_samples(query: Optional[str] = None, exts: Optional[List[str]] = None, limit: int = 100) -> Dict[str, Any]:
+def search_samples(
+    query: Optional[str] = None, exts: Optional[List[str]] = None, limit: int = 100, offset: int = 0
+) -> Dict[str, Any]:
     """Search for audio samples across configured directories.
 
     query: substring to match in file names (case-insensitive)
     exts: list of extensions to include (default: wav,aiff,flac,mp3,ogg)
     limit: maximum results
+    offset: skip this many matches; pass next_offset back to continue a search
     """
     dirs = _load_sample_dirs()
     if not dirs:
         return {"error": "No sample directories configured."}
     if not exts:
-        exts = [".wav", ".aiff", ".aif", ".flac", ".mp3", ".ogg"]
+        exts = AUDIO_EXTS
     q = (query or "").lower()
-    results: List[str] = []
-    try:
+
+    def matches():
         for d in dirs:
-            base = Path(d)
-            for root, _, files in os.walk(base):
+            for root, _, files in os.walk(Path(d)):
                 root_p = Path(root)
                 for fn in files:
                     if any(fn.lower().endswith(e) for e in exts):
                         if not q or q in fn.lower():
-                            results.append(str(root_p / fn))
-                            if len(results) >= limit:
-                                return {"files": results}
-        return {"files": results}
+                            yield str(root_p / fn)
+
+    try:
+        # The walk stops as soon as the page is full
+        return paginate(matches(), "files", offset, limit, count_total=False)
     except Exception as e:
         return {"error": f"Failed to search samples: {e}"}
 
 
 @mcp.tool()
-def import_sample_to_track(track_index: int, file_path: str, insert_time: float = 0.0, time_stretch_playrate: Optional[float] = None) -> Dict[str, Any]:
+def import_sample_to_track(
+    track_index: int,
+    file_path: str,
+    insert_time: float = 0.0,
+    time_stretch_playrate: Optional[float] = None,
+    match_tempo: bool = False,
+) -> Dict[str, Any]:
     """Import a sample onto the given track at time position. Optionally set take playrate for time-stretching.
 
     Args:
@@ -79,32 +139,288 @@ def import_sample_to_track(track_index: int, file_path: str, insert_time: float
         file_path: Full path to the audio file to import
         insert_time: Time position in seconds to insert the sample
         time_stretch_playrate: If provided, sets the active take's playback rate (1.0 = no stretch, 2.0 = double speed)
+        match_tempo: If true (and no explicit playrate), stretch the sample from its detected tempo
+            to the project tempo at insert_time
     
     Note: If you receive a 422 error, ensure numeric parameters (track_index, insert_time, time_stretch_playrate)
           are sent as numbers, not strings.
     """
     logger.info(f"import_sample_to_track called with track_index={track_index}, file_path={file_path}, "
-                f"insert_time={insert_time}, time_stretch_playrate={time_stretch_playrate}")
+                f"insert_time={insert_time}, time_stretch_playrate={time_stretch_playrate}, match_tempo={match_tempo}")
     if not Path(file_path).is_file():
         error_msg = f"File not found: {file_path}"
         logger.warning(error_msg)
         return {"error": error_msg}
     try:
-        project = reapy.Project()
+        project = current_project()
         tracks = list(project.tracks)
         if track_index < 0 or track_index >= len(tracks):
             error_msg = f"Track index out of range: {track_index} (valid: 0-{len(tracks)-1})"
             logger.warning(error_msg)
             return {"error": error_msg}
         track = tracks[track_index]
+        playrate = time_stretch_playrate
+        if playrate is None and match_tempo:
+            sample_bpm = estimate_tempos([file_path])[file_path]["bpm"]
+            if not sample_bpm:
+                error_msg = f"Could not detect tempo of {file_path}"
+                logger.warning(error_msg)
+                return {"error": error_msg}
+            playrate = get_tempo_map(project).bpm_at(float(insert_time)) / sample_bpm
         # Insert audio item at the specified position
-        item = track.add_audio_item(file_path=file_path, position=float(insert_time))
-        if time_stretch_playrate is not None:
-            take = item.active_take
-            take.playback_rate = float(time_stretch_playrate)
+        with bridge_batch("Import sample"):
+            _insert_audio_item(track, file_path, float(insert_time), playrate)
+        RPR.UpdateArrange()
         logger.info(f"Successfully imported sample to track {track_index} at time {insert_time}")
-        return {"ok": True}
+        return {"ok": True, "playrate": playrate}
     except Exception as e:
         error_msg = f"Failed to import sample: {e}"
         logger.error(error_msg, exc_info=True)
         return {"error": error_msg}
+
+
+def _grid_entries(project, kit: List[Dict[str, Any]], grid: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Expand a kit plus step-grid spec into per-hit import entries."""
+    steps = grid.get("steps") or []
+    if len(steps) != len(kit):
+        raise ValueError(f"grid.steps must have one row per kit pad ({len(kit)}), got {len(steps)}")
+    step_qn = float(grid.get("step_qn", 0.25))
+    repeat = max(1, int(grid.get("repeat", 1)))
+    start_qn = project.time_to_beats(float(grid.get("start_time", 0.0)))
+    entries = []
+    for pad, row in zip(kit, steps):
+        if isinstance(row, str):
+            hits = [i for i, c in enumerate(row) if c not in ".-_ "]
+            length = len(row)
+        else:
+            hits = [int(i) for i in row]
+            length = int(grid.get("length", max(hits, default=-1) + 1))
+        for r in range(repeat):
+            for h in hits:
+                entries.append({
+                    "track_index": pad["track_index"],
+                    "file_path": pad["file_path"],
+                    "insert_qn": start_qn + (r * length + h) * step_qn,
+                    "playrate": pad.get("playrate"),
+                    "match_tempo": pad.get("match_tempo"),
+                })
+    return entries
+
+
+@mcp.tool()
+def import_samples(
+    entries: Optional[List[Dict[str, Any]]] = None,
+    kit: Optional[List[Dict[str, Any]]] = None,
+    grid: Optional[Dict[str, Any]] = None,
+    match_tempo: bool = False,
+) -> Dict[str, Any]:
+    """Import many samples in one batch (single bridge session and undo point).
+
+    Either pass explicit entries, or a kit plus a step grid.
+
+    Args:
+        entries: List of {track_index, file_path, insert_time (s), playrate (optional),
+            match_tempo (optional, overrides the call-level default)}
+        kit: List of pads {track_index, file_path, playrate (optional), match_tempo (optional)}
+        grid: Step grid for the kit: {"steps": one row per pad, either a pattern string
+            like "x...x..." or a list of step indices, "step_qn": 0.25, "start_time": 0.0,
+            "repeat": 1, "length": steps per repeat when rows are index lists}
+        match_tempo: Default for entries without an explicit playrate: stretch each sample
+            from its detected tempo to the project tempo at its position
+
+    Returns: { ok: true, imported: int } or { error, missing: [paths] } if files are missing
+    """
+    logger.info(f"import_samples called with {len(entries or [])} entries, kit={len(kit or [])} pads, grid={grid is not None}")
+    if not entries and not (kit and grid):
+        return {"error": "Provide entries, or kit together with grid"}
+    try:
+        project = current_project()
+        todo = list(entries or [])
+        if kit and grid:
+            todo.extend(_grid_entries(project, kit, grid))
+        # Disk checks happen before the bridge is held
+        exists = _existing_files([str(e.get("file_path", "")) for e in todo])
+        missing = [p for p, ok in exists.items() if not ok]
+        if missing:
+            error_msg = f"File not found: {', '.join(missing)}"
+            logger.warning(error_msg)
+            return {"error": error_msg, "missing": missing}
+
+        n_tracks = project.n_tracks
+        for e in todo:
+            track_index = int(e["track_index"])
+            if track_index < 0 or track_index >= n_tracks:
+                error_msg = f"Track index out of range: {track_index} (valid: 0-{n_tracks-1})"
+                logger.warning(error_msg)
+                return {"error": error_msg}
+        stretch = [
+            e.get("playrate") is None and (match_tempo if e.get("match_tempo") is None else bool(e["match_tempo"]))
+            for e in todo
+        ]
+        # Tempo detection reads and analyses the files; keep it out of the held batch
+        tempos = estimate_tempos([str(e["file_path"]) for e, do_stretch in zip(todo, stretch) if do_stretch])
+        undetected = [p for p, t in tempos.items() if not t["bpm"]]
+        if undetected:
+            error_msg = f"Could not detect tempo of: {', '.join(undetected)}"
+            logger.warning(error_msg)
+            return {"error": error_msg}
+
+        with bridge_batch("Import samples"):
+            tracks = list(project.tracks)
+            tempo_map = get_tempo_map(project)
+            positions = [
+                float(e.get("insert_time", 0.0)) if "insert_qn" not in e
+                else float(tempo_map.qn_to_time(e["insert_qn"])) if not tempo_map.has_ramps
+                else project.beats_to_time(e["insert_qn"])
+                for e in todo
+            ]
+            for e, position, do_stretch in zip(todo, positions, stretch):
+                playrate = e.get("playrate")
+                if do_stretch:
+                    playrate = tempo_map.bpm_at(position) / tempos[str(e["file_path"])]["bpm"]
+                _insert_audio_item(tracks[int(e["track_index"])], str(e["file_path"]), position, playrate)
+        RPR.UpdateArrange()
+        logger.info(f"Successfully imported {len(todo)} samples")
+        return {"ok": True, "imported": len(todo)}
+    except Exception as e:
+        error_msg = f"Failed to import samples: {e}"
+        logger.error(error_msg, exc_info=True)
+        return {"error": error_msg}
+
+
+@mcp.tool()
+def detect_sample_tempo(file_paths: List[str]) -> Dict[str, Any]:
+    """Detect the tempo of audio files (cached per file).
+
+    Sources, in order: an explicit tempo tag in the file name (e.g. "Loop_120bpm.wav"), WAV
+    ACID metadata, then onset analysis of the audio (WAV only; files are analysed in
+    parallel). A bare number in the name ("Break_96_Am.wav") is only used when the onset
+    analysis agrees with it.
+
+    Returns: { tempos: { path: { bpm: float | null,
+        source: "filename" | "acid" | "onsets" | "filename+onsets" | null } } }
+    """
+    logger.info(f"detect_sample_tempo called with {len(file_paths)} files")
+    exists = _existing_files(file_paths)
+    missing = [p for p, ok in exists.items() if not ok]
+    if missing:
+        return {"error": f"File not found: {', '.join(missing)}", "missing": missing}
+    try:
+        return {"tempos": estimate_tempos(file_paths)}
+    except Exception as e:
+        error_msg = f"Failed to detect sample tempo: {e}"
+        logger.error(error_msg, exc_info=True)
+        return {"error": error_msg}
+
+
+@mcp.tool()
+def get_sample_peaks(
+    file_path: str,
+    samples_per_peak: Optional[List[int]] = None,
+    encoding: str = "json",
+) -> Dict[str, Any]:
+    """Get min/max waveform peaks of a WAV sample for previews, without importing it.
+
+    Peaks are computed once per file version and kept in an on-disk cache, so repeat
+    previews only read the cache.
+
+    Args:
+        file_path: Full path to a WAV file
+        samples_per_peak: Zoom levels as samples per peak (default: [256, 2048, 16384])
+        encoding: "json" for per-channel min/max lists (values -1..1), or "base64" for a
+            little-endian int16 buffer of shape (peaks, channels, 2) per level
+
+    Returns: { sample_rate, length, channels, cached, levels: [{ samples_per_peak, count, ... }] }
+    """
+    logger.info(f"get_sample_peaks called with file_path={file_path}, samples_per_peak={samples_per_peak}, encoding={encoding}")
+    if not Path(file_path).is_file():
+        error_msg = f"File not found: {file_path}"
+        logger.warning(error_msg)
+        return {"error": error_msg}
+    if encoding not in ("json", "base64"):
+        return {"error": f"Unknown encoding: {encoding} (use json or base64)"}
+    try:
+        sample_rate, n_frames, channels, peaks, cached = get_peaks(file_path, samples_per_peak or [256, 2048, 16384])
+        levels = []
+        for level, p in sorted(peaks.items()):
+            entry: Dict[str, Any] = {"samples_per_peak": level, "count": len(p)}
+            if encoding == "base64":
+                entry["peaks_base64"] = _b64.b64encode(p.tobytes()).decode("ascii")
+            else:
+                scaled = (p / 32767.0).round(4)
+                entry["channels"] = [
+                    {"min": scaled[:, ch, 0].tolist(), "max": scaled[:, ch, 1].tolist()}
+                    for ch in range(channels)
+                ]
+            levels.append(entry)
+        return {
+            "sample_rate": sample_rate,
+            "length": n_frames / sample_rate if sample_rate else 0.0,
+            "channels": channels,
+            "cached": cached,
+            "levels": levels,
+        }
+    except ValueError as e:
+        return {"error": f"Cannot compute peaks: {e}"}
+    except Exception as e:
+        error_msg = f"Failed to get sample peaks: {e}"
+        logger.error(error_msg, exc_info=True)
+        return {"error": error_msg}
+
+
+@mcp.tool()
+def update_sample_index(rebuild: bool = False) -> Dict[str, Any]:
+    """Update the sample similarity index from the configured sample directories.
+
+    Only new or changed WAV files are analysed (in parallel worker processes); removed
+    files are dropped. Set rebuild to re-analyse everything.
+
+    Returns: { indexed, added, removed, failed }
+    """
+    logger.info(f"update_sample_index called with rebuild={rebuild}")
+    dirs = _load_sample_dirs()
+    if not dirs:
+        return {"error": "No sample directories configured."}
+    try:
+        return _sample_index.update(dirs, rebuild=rebuild)
+    except Exception as e:
+        error_msg = f"Failed to update sample index: {e}"
+        logger.error(error_msg, exc_info=True)
+        return {"error": error_msg}
+
+
+@mcp.tool()
+def find_similar_samples(file_path: str, k: int = 10, update_index: bool = False) -> Dict[str, Any]:
+    """Find the samples that sound most like a given file (k nearest neighbours by timbre).
+
+    Args:
+        file_path: Reference WAV file (does not need to be in the index)
+        k: Number of matches to return
+        update_index: Incrementally update the index before querying (done automatically
+            after the sample directory list changes)
+
+    Returns: { matches: [{ file, similarity }] } with similarity in -1..1 (1 = identical features)
+    """
+    logger.info(f"find_similar_samples called with file_path={file_path}, k={k}, update_index={update_index}")
+    if not Path(file_path).is_file():
+        error_msg = f"File not found: {file_path}"
+        logger.warning(error_msg)
+        return {"error": error_msg}
+    try:
+        if update_index or _sample_index.stale:
+            dirs = _load_sample_dirs()
+            if dirs:
+                _sample_index.update(dirs)
+        if not len(_sample_index):
+            return {"error": "Sample index is empty; run update_sample_index first."}
+        vector = _sample_index.vector_for(file_path)
+        if vector is None:
+            vector = compute_features(file_path)
+        if vector is None:
+            return {"error": f"Cannot analyse {file_path} (only WAV files are supported)"}
+        matches = _sample_index.query(vector, k=max(1, int(k)), exclude=file_path)
+        return {"matches": [{"file": p, "similarity": round(sim, 4)} for p, sim in matches]}
+    except Exception as e:
+        error_msg = f"Failed to find similar samples: {e}"
+        logger.error(error_msg, exc_info=True)
+        return {"error": error_msg}
@@ -0,0 +1,519 @@
+from __future__ import annotations
+
+import base64
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import reapy
+from reapy import reascript_api as RPR
+
+from reaper_mcp.cache import LRUCache
+from reaper_mcp.mcp_core import mcp
+from reaper_mcp.rpp import read_rpp
+from reaper_mcp.util import (
+    bridge_batch,
+    current_project,
+    note_local_write,
+    project_cache_key,
+    project_state_version,
+)
+
+try:
+    import msgpack
+except ImportError:  # optional extra: pip install "reaper-mcp[msgpack]"
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+# Fields returned per group when no projection is given. "fx.params" is opt-in
+# because it costs one bridge call per parameter.
+DEFAULT_FIELDS: Dict[str, tuple] = {
+    "project": ("name", "path", "bpm", "length"),
+    "track": ("guid", "name", "volume", "pan", "mute", "solo", "armed", "color", "depth", "items", "fx", "sends"),
+    "items": ("guid", "position", "length", "mute", "name", "source", "midi"),
+    "fx": ("guid", "name", "enabled"),
+    "sends": ("dest", "dest_guid", "volume", "pan", "mute"),
+    "markers": ("number", "region", "position", "end", "name", "color"),
+    "tempo": ("time", "bpm", "num", "denom", "linear"),
+}
+EXTRA_FIELDS: Dict[str, tuple] = {"fx": ("params",)}
+_COLLECTIONS = ("items", "fx", "sends")
+_SECTIONS = ("project", "markers", "tempo")
+
+_TRACK_VALUES = {
+    "volume": ("D_VOL", float),
+    "pan": ("D_PAN", float),
+    "mute": ("B_MUTE", bool),
+    "solo": ("I_SOLO", int),
+    "armed": ("I_RECARM", bool),
+    "color": ("I_CUSTOMCOLOR", int),
+    "depth": ("I_FOLDERDEPTH", int),
+}
+_ITEM_VALUES = {"position": ("D_POSITION", float), "length": ("D_LENGTH", float), "mute": ("B_MUTE", bool)}
+_SEND_VALUES = {"volume": ("D_VOL", float), "pan": ("D_PAN", float), "mute": ("B_MUTE", bool)}
+
+# (instance, project id, state version, fields, track filter) -> snapshot
+_snapshots = LRUCache(maxsize=8)
+# (instance, project id, state version) -> full default snapshot; the bases get_project_changes diffs against
+_history = LRUCache(maxsize=int(os.environ.get("REAPER_MCP_SNAPSHOT_HISTORY", "32")))
+_FULL_VARIANT = (tuple(sorted(DEFAULT_FIELDS.items())), None, None)
+# (instance, project id) -> last track probe, to notice edits REAPER did not count
+_track_probes = LRUCache(maxsize=64)
+
+# Identity fields per collection, used to match entries between two snapshots
+_DIFF_KEYS: Dict[str, tuple] = {
+    "tracks": ("guid",),
+    "items": ("guid",),
+    "fx": ("guid",),
+    "sends": ("index",),
+    "markers": ("region", "number"),
+    "tempo": ("time",),
+}
+
+
+def resolve_fields(fields: Optional[List[str]]) -> Dict[str, tuple]:
+    """Turn a projection like ``["name", "items.position", "markers"]`` into per-group field tuples.
+
+    Bare names select a section (``project``/``markers``/``tempo``/``tracks``), a track field,
+    or a whole per-track collection (``items``/``fx``/``sends``); ``group.field`` selects a
+    single field of a collection or section. Raises ValueError for unknown names.
+    """
+    if not fields:
+        return dict(DEFAULT_FIELDS)
+    spec: Dict[str, Optional[set]] = {}
+
+    def select(group: str, field: Optional[str]) -> None:
+        allowed = DEFAULT_FIELDS[group] + EXTRA_FIELDS.get(group, ())
+        if field is not None and field not in allowed:
+            raise ValueError(f"Unknown field '{group}.{field}' (valid: {', '.join(allowed)})")
+        current = spec.get(group, set())
+        if field is None:
+            spec[group] = None
+        elif current is not None:
+            current.add(field)
+            spec[group] = current
+
+    for raw in fields:
+        name = str(raw).strip()
+        group, _, field = name.partition(".")
+        if group == "tracks":
+            group = "track"
+        if field:
+            if group not in DEFAULT_FIELDS:
+                raise ValueError(f"Unknown field group '{group}'")
+            select(group, field)
+            if group in _COLLECTIONS:
+                select("track", group)
+        elif group in _SECTIONS or group == "track":
+            select(group, None)
+        elif group in _COLLECTIONS:
+            select("track", group)
+            select(group, None)
+        elif group in DEFAULT_FIELDS["track"]:
+            select("track", group)
+        else:
+            raise ValueError(f"Unknown field '{name}'")
+
+    resolved = {}
+    for group, selected in spec.items():
+        if selected is None:
+            resolved[group] = DEFAULT_FIELDS[group]
+        else:
+            order = DEFAULT_FIELDS[group] + EXTRA_FIELDS.get(group, ())
+            resolved[group] = tuple(f for f in order if f in selected)
+    # A bare "tracks" pulls collections in full unless they were narrowed explicitly
+    for group in _COLLECTIONS:
+        if group in resolved.get("track", ()) and group not in resolved:
+            resolved[group] = DEFAULT_FIELDS[group]
+    return resolved
+
+
+def _is_null(pointer: Any) -> bool:
+    return str(pointer).endswith("0x0000000000000000")
+
+
+def _track_name(track_id: str) -> str:
+    return RPR.GetTrackName(track_id, "", 512)[2]
+
+
+def _collect_items(track_id: str, want: tuple) -> List[Dict[str, Any]]:
+    items = []
+    for j in range(RPR.CountTrackMediaItems(track_id)):
+        item_id = RPR.GetTrackMediaItem(track_id, j)
+        entry: Dict[str, Any] = {"index": j}
+        if "guid" in want:
+            entry["guid"] = RPR.GetSetMediaItemInfo_String(item_id, "GUID", "", False)[3]
+        for field in want:
+            if field in _ITEM_VALUES:
+                param, conv = _ITEM_VALUES[field]
+                entry[field] = conv(RPR.GetMediaItemInfo_Value(item_id, param))
+        if "name" in want or "source" in want or "midi" in want:
+            take = RPR.GetActiveTake(item_id)
+            has_take = not _is_null(take)
+            if "name" in want:
+                entry["name"] = RPR.GetTakeName(take) if has_take else ""
+            if "midi" in want:
+                entry["midi"] = bool(RPR.TakeIsMIDI(take)) if has_take else False
+            if "source" in want:
+                source = ""
+                if has_take:
+                    src = RPR.GetMediaItemTake_Source(take)
+                    source = RPR.GetMediaSourceFileName(src, "", 4096)[1]
+                entry["source"] = source
+        items.append(entry)
+    return items
+
+
+def _collect_fx(track_id: str, want: tuple) -> List[Dict[str, Any]]:
+    fx_list = []
+    for k in range(RPR.TrackFX_GetCount(track_id)):
+        entry: Dict[str, Any] = {"index": k}
+        if "guid" in want:
+            entry["guid"] = RPR.TrackFX_GetFXGUID(track_id, k)
+        if "name" in want:
+            entry["name"] = RPR.TrackFX_GetFXName(track_id, k, "", 2048)[3]
+        if "enabled" in want:
+            entry["enabled"] = bool(RPR.TrackFX_GetEnabled(track_id, k))
+        if "params" in want:
+            entry["params"] = [
+                float(RPR.TrackFX_GetParamNormalized(track_id, k, p))
+                for p in range(RPR.TrackFX_GetNumParams(track_id, k))
+            ]
+        fx_list.append(entry)
+    return fx_list
+
+
+def _collect_sends(track_id: str, want: tuple) -> List[Dict[str, Any]]:
+    sends = []
+    for s in range(RPR.GetTrackNumSends(track_id, 0)):
+        entry: Dict[str, Any] = {"index": s}
+        if "dest" in want or "dest_guid" in want:
+            pointer = RPR.GetTrackSendInfo_Value(track_id, 0, s, "P_DESTTRACK")
+            dest_id = reapy.Track._get_id_from_pointer(pointer)
+            if "dest" in want:
+                entry["dest"] = int(RPR.GetMediaTrackInfo_Value(dest_id, "IP_TRACKNUMBER")) - 1
+            if "dest_guid" in want:
+                entry["dest_guid"] = RPR.GetTrackGUID(dest_id)
+        for field in want:
+            if field in _SEND_VALUES:
+                param, conv = _SEND_VALUES[field]
+                entry[field] = conv(RPR.GetTrackSendInfo_Value(track_id, 0, s, param))
+        sends.append(entry)
+    return sends
+
+
+def _collect_markers(project_id: str, want: tuple) -> List[Dict[str, Any]]:
+    counts = RPR.CountProjectMarkers(project_id, 0, 0)
+    markers = []
+    for i in range(counts[2] + counts[3]):
+        res = RPR.EnumProjectMarkers3(project_id, i, 0, 0, 0, 0, 0, 0)
+        values = {
+            "region": bool(res[3]),
+            "position": float(res[4]),
+            "end": float(res[5]) if res[3] else None,
+            "name": res[6],
+            "number": int(res[7]),
+            "color": int(res[8]),
+        }
+        markers.append({f: values[f] for f in want})
+    return markers
+
+
+def _collect_tempo(project_id: str, want: tuple) -> List[Dict[str, Any]]:
+    points = []
+    for i in range(RPR.CountTempoTimeSigMarkers(project_id)):
+        res = RPR.GetTempoTimeSigMarker(project_id, i, 0, 0, 0, 0, 0, 0, 0)
+        values = {
+            "time": float(res[3]),
+            "bpm": float(res[6]),
+            "num": int(res[7]),
+            "denom": int(res[8]),
+            "linear": bool(res[9]),
+        }
+        points.append({f: values[f] for f in want})
+    return points
+
+
+def _check_track_probe(project) -> None:
+    """Note a local write when track GUIDs, volumes or pans changed since the last probe.
+
+    Catches edits REAPER's state counter missed (scripts setting values outside an
+    undo block); one bridge session of four calls per track.
+    """
+    with bridge_batch():
+        track_ids = [RPR.GetTrack(project.id, i) for i in range(RPR.CountTracks(project.id))]
+        probe = tuple(
+            (
+                RPR.GetTrackGUID(t),
+                RPR.GetMediaTrackInfo_Value(t, "D_VOL"),
+                RPR.GetMediaTrackInfo_Value(t, "D_PAN"),
+            )
+            for t in track_ids
+        )
+    key = project_cache_key(project)
+    previous = _track_probes.get(key)
+    if previous is not None and previous != probe:
+        note_local_write()
+    _track_probes.put(key, probe)
+
+
+def collect_snapshot(
+    project,
+    spec: Optional[Dict[str, tuple]] = None,
+    track_indices: Optional[List[int]] = None,
+    track_name_filter: Optional[str] = None,
+    cached: bool = True,
+) -> Tuple[int, Dict[str, Any]]:
+    """Read the requested parts of the project graph in one held bridge session.
+
+    Results are cached per project state version, so repeated exports of an
+    unchanged project skip collecting. Snapshots with tracks first run a cheap track
+    probe (``_check_track_probe``) to catch edits the version missed. With ``cached``
+    False the snapshot is always read live and not stored. Returns
+    ``(state version, snapshot)``.
+    """
+    spec = spec or dict(DEFAULT_FIELDS)
+    indices = tuple(sorted(set(int(i) for i in track_indices))) if track_indices is not None else None
+    needle = track_name_filter.lower() if track_name_filter else None
+    variant = (tuple(sorted(spec.items())), indices, needle)
+    base = project_cache_key(project)
+    if cached:
+        if "track" in spec:
+            _check_track_probe(project)
+        version = project_state_version(project)
+        cache = _history if variant == _FULL_VARIANT else _snapshots
+        key = (*base, version) if variant == _FULL_VARIANT else (*base, version, variant)
+        snapshot = cache.get(key)
+        if snapshot is not None:
+            return version, snapshot
+
+    snapshot = {}
+    with bridge_batch():
+        # Re-read under the hold so the version matches exactly what was collected
+        version = project_state_version(project)
+        if "project" in spec:
+            getters = {
+                "name": lambda: project.name,
+                "path": lambda: project.path,
+                "bpm": lambda: float(project.bpm),
+                "length": lambda: float(project.length),
+            }
+            snapshot["project"] = {f: getters[f]() for f in spec["project"]}
+        if "track" in spec:
+            want = spec["track"]
+            tracks = []
+            n = RPR.CountTracks(project.id)
+            for i in indices if indices is not None else range(n):
+                if i < 0 or i >= n:
+                    continue
+                track_id = RPR.GetTrack(project.id, i)
+                name = _track_name(track_id) if ("name" in want or needle) else None
+                if needle and needle not in name.lower():
+                    continue
+                entry: Dict[str, Any] = {"index": i}
+                if "guid" in want:
+                    entry["guid"] = RPR.GetTrackGUID(track_id)
+                if "name" in want:
+                    entry["name"] = name
+                for field in want:
+                    if field in _TRACK_VALUES:
+                        param, conv = _TRACK_VALUES[field]
+                        entry[field] = conv(RPR.GetMediaTrackInfo_Value(track_id, param))
+                if "items" in want:
+                    entry["items"] = _collect_items(track_id, spec["items"])
+                if "fx" in want:
+                    entry["fx"] = _collect_fx(track_id, spec["fx"])
+                if "sends" in want:
+                    entry["sends"] = _collect_sends(track_id, spec["sends"])
+                tracks.append(entry)
+            snapshot["tracks"] = tracks
+        if "markers" in spec:
+            snapshot["markers"] = _collect_markers(project.id, spec["markers"])
+        if "tempo" in spec:
+            snapshot["tempo"] = _collect_tempo(project.id, spec["tempo"])
+    if not cached:
+        return version, snapshot
+    if variant == _FULL_VARIANT:
+        _history.put((*base, version), snapshot)
+    else:
+        _snapshots.put((*base, version, variant), snapshot)
+    return version, snapshot
+
+
+def project_snapshot(
+    full: Dict[str, Any],
+    spec: Dict[str, tuple],
+    track_indices: Optional[List[int]] = None,
+    track_name_filter: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Apply a field projection and track filter to an already collected full snapshot.
+
+    Fields the source does not have (e.g. "fx.params" for a parsed .rpp) are omitted.
+    """
+    wanted = set(int(i) for i in track_indices) if track_indices is not None else None
+    needle = track_name_filter.lower() if track_name_filter else None
+
+    def pick(entry: Dict[str, Any], fields: tuple) -> Dict[str, Any]:
+        return {f: entry[f] for f in fields if f in entry}
+
+    out: Dict[str, Any] = {}
+    if "project" in spec:
+        out["project"] = pick(full["project"], spec["project"])
+    if "track" in spec:
+        tracks = []
+        for track in full["tracks"]:
+            if wanted is not None and track["index"] not in wanted:
+                continue
+            if needle and needle not in track["name"].lower():
+                continue
+            entry: Dict[str, Any] = {"index": track["index"]}
+            for field in spec["track"]:
+                if field in _COLLECTIONS:
+                    entry[field] = [{"index": e["index"], **pick(e, spec[field])} for e in track[field]]
+                elif field in track:
+                    entry[field] = track[field]
+            tracks.append(entry)
+        out["tracks"] = tracks
+    for section in ("markers", "tempo"):
+        if section in spec:
+            out[section] = [pick(e, spec[section]) for e in full[section]]
+    return out
+
+
+def _diff_collection(name: str, old: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Diff two lists of snapshot entries matched on their identity fields.
+
+    Returns ``{"added": [...], "removed": [...], "modified": [...]}`` with empty parts
+    omitted, or None when nothing changed. Removed and modified entries carry their
+    identity fields; modified entries add only the fields that changed, recursing into
+    nested collections (a track's items, FX and sends).
+    """
+    key_fields = _DIFF_KEYS[name]
+
+    def ident(entry: Dict[str, Any]) -> tuple:
+        return tuple(entry.get(f) for f in key_fields)
+
+    old_map = {ident(e): e for e in old}
+    new_map = {ident(e): e for e in new}
+    added = [e for k, e in new_map.items() if k not in old_map]
+    removed = [dict(zip(key_fields, k)) for k in old_map if k not in new_map]
+    modified = []
+    for k, entry in new_map.items():
+        before = old_map.get(k)
+        if before is None or before == entry:
+            continue
+        change = dict(zip(key_fields, k))
+        for field, value in entry.items():
+            if field in _DIFF_KEYS:
+                sub = _diff_collection(field, before.get(field, []), value)
+                if sub:
+                    change[field] = sub
+            elif before.get(field) != value:
+                change[field] = value
+        modified.append(change)
+    diff = {part: v for part, v in (("added", added), ("removed", removed), ("modified", modified)) if v}
+    return diff or None
+
+
+def diff_snapshots(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the per-section changes between two full snapshots."""
+    changes: Dict[str, Any] = {}
+    project = {f: v for f, v in new.get("project", {}).items() if old.get("project", {}).get(f) != v}
+    if project:
+        changes["project"] = project
+    for section in ("tracks", "markers", "tempo"):
+        diff = _diff_collection(section, old.get(section, []), new.get(section, []))
+        if diff:
+            changes[section] = diff
+    return changes
+
+
+@mcp.tool()
+def export_project_snapshot(
+    fields: Optional[List[str]] = None,
+    track_indices: Optional[List[int]] = None,
+    track_name_filter: Optional[str] = None,
+    format: str = "json",
+    rpp_path: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Export the project graph (tracks, items, FX, sends, markers, tempo) in one round trip.
+
+    Args:
+        fields: Optional projection. Bare names select a section ("project", "tracks",
+            "markers", "tempo"), a track field ("name", "volume", "pan", "mute", "solo",
+            "armed", "color", "depth", "guid") or a whole per-track collection ("items",
+            "fx", "sends"); dotted names select one field, e.g. "items.position" or
+            "fx.params" (opt-in: normalized values of every FX parameter). Default: everything
+            except "fx.params".
+        track_indices: Only include these tracks (0-based)
+        track_name_filter: Only include tracks whose name contains this text (case-insensitive)
+        format: "json" (structured result) or "msgpack" (base64-encoded msgpack bytes in
+            "data"; requires the msgpack extra)
+        rpp_path: Read a saved .rpp file from disk instead of the live project (no
+            "version" is returned; "fx.params" is not available)
+
+    Returns:
+        Dict with "version" (project state version, usable as a sync token) and either
+        "snapshot" or "data"
+    """
+    logger.info(
+        f"export_project_snapshot called with fields={fields}, track_indices={track_indices}, "
+        f"track_name_filter={track_name_filter}, format={format}"
+    )
+    try:
+        if format not in ("json", "msgpack"):
+            return {"error": f"Unsupported format: {format} (expected 'json' or 'msgpack')"}
+        if format == "msgpack" and msgpack is None:
+            return {"error": "msgpack is not installed; install reaper-mcp[msgpack]"}
+        try:
+            spec = resolve_fields(fields)
+        except ValueError as e:
+            return {"error": str(e)}
+        if rpp_path:
+            version = None
+            snapshot = project_snapshot(read_rpp(rpp_path), spec, track_indices, track_name_filter)
+        else:
+            project = current_project()
+            version, snapshot = collect_snapshot(project, spec, track_indices, track_name_filter)
+        if format == "msgpack":
+            data = base64.b64encode(msgpack.packb(snapshot, use_bin_type=True)).decode("ascii")
+            return {"version": version, "format": "msgpack", "data": data}
+        return {"version": version, "snapshot": snapshot}
+    except Exception as e:
+        error_msg = f"Failed to export project snapshot: {e}"
+        logger.error(error_msg, exc_info=True)
+        return {"error": error_msg}
+
+
+@mcp.tool()
+def get_project_changes(since_version: Optional[int] = None) -> Dict[str, Any]:
+    """Return what changed in the project since a version returned by an earlier call.
+
+    Tracks, items and FX are matched by GUID, sends by index, markers by (region, number)
+    and tempo points by time. Only the server's recent snapshots are kept, so an unknown
+    or expired ``since_version`` (or none) yields a full snapshot to resync from instead.
+
+    Args:
+        since_version: "version" from a previous get_project_changes/export_project_snapshot
+            call (default snapshot fields only)
+
+    Returns:
+        Dict with "version" (pass it as since_version next time) and either "changes"
+        (sections with added/removed/modified entries; empty when nothing changed) or,
+        with "full": true, the complete "snapshot"
+    """
+    logger.info(f"get_project_changes called with since_version={since_version}")
+    try:
+        project = current_project()
+        version, snapshot = collect_snapshot(project)
+        if since_version is not None and int(since_version) == version:
+            return {"version": version, "since": version, "full": False, "changes": {}}
+        base = _history.get((*project_cache_key(project), int(since_version))) if since_version is not None else None
+        if base is None:
+            return {"version": version, "full": True, "snapshot": snapshot}
+        return {"version": version, "since": int(since_version), "full": False, "changes": diff_snapshots(base, snapshot)}
+    except Exception as e:
+        error_msg = f"Failed to get project changes: {e}"
+        logger.error(error_msg, exc_info=True)
+        return {"error": error_msg}
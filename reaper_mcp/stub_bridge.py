@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# reapy's defaults (reapy.config); importing reapy here before faking REAPER would
+# make it try to connect as a client
+WEB_INTERFACE_PORT = 2307
+REAPY_SERVER_PORT = 2306
+# Ticks per quarter note of stub MIDI takes
+PPQ = 960
+
+
+def _pointer(kind: str, n: int) -> str:
+    return f"({kind}*)0x{n:016X}"
+
+
+class StubReaper:
+    """In-memory stand-in for the ReaScript API of one REAPER project.
+
+    Implements the ``RPR_*`` functions that the transport, mixer and MIDI tools
+    reach (directly or through reapy's object layer), with plausible results and
+    state; ``module()`` exposes them as the ``reaper_python`` module REAPER provides
+    to ReaScripts. Calls to anything else fail as they would on a REAPER without
+    that function.
+    """
+
+    def __init__(self, n_tracks: int = 16, bpm: float = 120.0) -> None:
+        self.project = _pointer("ReaProject", 0x1000)
+        self.bpm = bpm
+        self.cursor = 0.0
+        self.time_selection = (0.0, 0.0)
+        self.play_state = 0
+        self._next_id = 0x10000
+        self.tracks: List[Dict[str, Any]] = []
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self.takes: Dict[str, Dict[str, Any]] = {}
+        for i in range(n_tracks):
+            self.tracks.append({"id": self._new_id("MediaTrack"), "name": f"Track {i + 1}", "D_VOL": 1.0, "D_PAN": 0.0})
+        # Bumped by every edit, like REAPER's project state change count
+        self.changes = 0
+
+    def _new_id(self, kind: str) -> str:
+        self._next_id += 1
+        return _pointer(kind, self._next_id)
+
+    def _track(self, track_id: str) -> Dict[str, Any]:
+        for track in self.tracks:
+            if track["id"] == track_id:
+                return track
+        raise ValueError(f"Invalid track pointer {track_id}")
+
+    # Projects and transport
+
+    def EnumProjects(self, idx: int, fn: Any, size: int) -> Tuple:
+        if idx in (-1, 0):
+            return (self.project, idx, "", size)
+        return (_pointer("ReaProject", 0), idx, "", size)
+
+    def GetProjectStateChangeCount(self, proj: str) -> int:
+        return self.changes
+
+    def GetCursorPositionEx(self, proj: str) -> float:
+        return self.cursor
+
+    def SetEditCurPos(self, time_: float, moveview: bool, seekplay: bool) -> None:
+        self.cursor = float(time_)
+
+    def SetEditCurPos2(self, proj: str, time_: float, moveview: bool, seekplay: bool) -> None:
+        self.cursor = float(time_)
+
+    def GetSet_LoopTimeRange2(self, proj: str, is_set: bool, is_loop: bool, start: float, end: float, allow_autoseek: bool) -> Tuple:
+        if is_set:
+            self.time_selection = (float(start), float(end))
+        start, end = self.time_selection
+        return (proj, is_set, is_loop, start, end, allow_autoseek)
+
+    def GetPlayStateEx(self, proj: str) -> int:
+        return self.play_state
+
+    def OnPlayButtonEx(self, proj: str) -> None:
+        self.play_state = 1
+
+    def OnPauseButtonEx(self, proj: str) -> None:
+        self.play_state = 2
+
+    def OnStopButtonEx(self, proj: str) -> None:
+        self.play_state = 0
+
+    def Master_GetTempo(self) -> float:
+        return self.bpm
+
+    def GetSetProjectInfo(self, proj: str, desc: str, value: float, is_set: bool) -> float:
+        return 0.0
+
+    def GetProjectTimeSignature2(self, proj: str, bpm: float, bpi: float) -> Tuple:
+        return (proj, self.bpm, 4.0)
+
+    def TimeMap_GetDividedBpmAtTime(self, time_: float) -> float:
+        return self.bpm
+
+    def CountTempoTimeSigMarkers(self, proj: str) -> int:
+        return 0
+
+    def TimeMap2_timeToQN(self, proj: str, time_: float) -> float:
+        return float(time_) * self.bpm / 60.0
+
+    def TimeMap2_QNToTime(self, proj: str, qn: float) -> float:
+        return float(qn) * 60.0 / self.bpm
+
+    # UI refresh and undo; no-ops here
+
+    def PreventUIRefresh(self, prevent_count: int) -> None:
+        pass
+
+    def Undo_BeginBlock(self) -> None:
+        pass
+
+    def Undo_BeginBlock2(self, proj: str) -> None:
+        pass
+
+    def Undo_EndBlock(self, desc: str, flags: int) -> None:
+        pass
+
+    def Undo_EndBlock2(self, proj: str, desc: str, flags: int) -> None:
+        pass
+
+    def UpdateArrange(self) -> None:
+        pass
+
+    def TrackList_AdjustWindows(self, is_minor: bool) -> None:
+        pass
+
+    # Tracks
+
+    def CountTracks(self, proj: str) -> int:
+        return len(self.tracks)
+
+    def GetTrack(self, proj: str, idx: int) -> str:
+        if 0 <= idx < len(self.tracks):
+            return self.tracks[idx]["id"]
+        return _pointer("MediaTrack", 0)
+
+    def GetMediaTrackInfo_Value(self, tr: str, parm: str) -> float:
+        track = self._track(tr)
+        if parm == "IP_TRACKNUMBER":
+            return float(self.tracks.index(track) + 1)
+        return float(track.get(parm, 0.0))
+
+    def SetMediaTrackInfo_Value(self, tr: str, parm: str, value: float) -> bool:
+        self._track(tr)[parm] = float(value)
+        self.changes += 1
+        return True
+
+    def GetSetMediaTrackInfo_String(self, tr: str, parm: str, value: str, is_set: bool) -> Tuple:
+        track = self._track(tr)
+        key = "name" if parm == "P_NAME" else parm
+        if is_set:
+            track[key] = value
+            self.changes += 1
+        return (True, tr, parm, str(track.get(key, "")), is_set)
+
+    def GetTrackGUID(self, tr: str) -> str:
+        return "{00000000-0000-0000-0000-%012X}" % int(self._track(tr)["id"].rsplit("x", 1)[-1], 16)
+
+    def GetTrackName(self, tr: str, buf: str, size: int) -> Tuple:
+        return (True, tr, self._track(tr)["name"], size)
+
+    def ValidatePtr2(self, proj: str, pointer: str, ctypename: str) -> bool:
+        return pointer in self.items or pointer in self.takes or any(t["id"] == pointer for t in self.tracks)
+
+    def CountTrackMediaItems(self, tr: str) -> int:
+        return sum(1 for item in self.items.values() if item["track"] == tr)
+
+    # MIDI items and notes
+
+    def CreateNewMIDIItemInProj(self, tr: str, start: float, end: float, qn: Any) -> Tuple:
+        self._track(tr)
+        item_id, take_id = self._new_id("MediaItem"), self._new_id("MediaItem_Take")
+        self.items[item_id] = {"track": tr, "take": take_id, "D_POSITION": float(start), "D_LENGTH": float(end) - float(start)}
+        self.takes[take_id] = {"item": item_id, "notes": []}
+        self.changes += 1
+        return (item_id, tr, start, end, qn)
+
+    def GetActiveTake(self, item: str) -> str:
+        return self.items[item]["take"]
+
+    def GetMediaItemInfo_Value(self, item: str, parm: str) -> float:
+        return float(self.items[item].get(parm, 0.0))
+
+    def GetMediaItemTake_Item(self, take: str) -> str:
+        return self.takes[take]["item"]
+
+    def _take_start_qn(self, take: str) -> float:
+        return self.TimeMap2_timeToQN(self.project, self.items[self.takes[take]["item"]]["D_POSITION"])
+
+    def MIDI_GetProjQNFromPPQPos(self, take: str, ppqpos: float) -> float:
+        return self._take_start_qn(take) + float(ppqpos) / PPQ
+
+    def MIDI_GetPPQPosFromProjQN(self, take: str, qn: float) -> float:
+        return (float(qn) - self._take_start_qn(take)) * PPQ
+
+    def MIDI_GetPPQPosFromProjTime(self, take: str, time_: float) -> float:
+        return self.MIDI_GetPPQPosFromProjQN(take, self.TimeMap2_timeToQN(self.project, time_))
+
+    def MIDI_InsertNote(self, take: str, selected: bool, muted: bool, start: float, end: float,
+                        chan: int, pitch: int, vel: int, no_sort: Any) -> bool:
+        self.takes[take]["notes"].append((selected, muted, start, end, chan, pitch, vel))
+        self.changes += 1
+        return True
+
+    def MIDI_Sort(self, take: str) -> None:
+        self.takes[take]["notes"].sort(key=lambda note: note[2])
+
+    def MIDI_CountEvts(self, take: str, notecnt: int, ccevtcnt: int, textsyxevtcnt: int) -> Tuple:
+        return (1, take, len(self.takes[take]["notes"]), 0, 0)
+
+    def module(self) -> types.ModuleType:
+        """The stub as a ``reaper_python`` module (``RPR_<name>`` functions)."""
+        module = types.ModuleType("reaper_python")
+        for name in dir(self):
+            if name[:1].isupper():
+                setattr(module, f"RPR_{name}", getattr(self, name))
+        module.RPR_GetResourcePath = lambda: ""
+        return module
+
+
+def _web_interface(port: int, server_port: int) -> ThreadingHTTPServer:
+    """Answer reapy's discovery request for the bridge port like REAPER's web interface."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.endswith("/EXTSTATE/reapy/server_port"):
+                body = f"EXTSTATE\treapy\tserver_port\t{server_port}\n".encode("ascii")
+            else:
+                body = b"\n"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+def serve(
+    n_tracks: int = 16,
+    tick: float = 0.03,
+    web_port: int = WEB_INTERFACE_PORT,
+    server_port: int = REAPY_SERVER_PORT,
+    ready: Optional[threading.Event] = None,
+) -> None:
+    """Run reapy's own bridge server against a ``StubReaper``, polling every ``tick`` seconds.
+
+    Must run in a process of its own: reapy is imported here in "inside REAPER" mode.
+    REAPER runs the bridge from a deferred script (about 30 times a second); ``tick``
+    mimics that, or use 0 to measure the server without it.
+    """
+    stub = StubReaper(n_tracks)
+    sys.modules["reaper_python"] = stub.module()
+    # reapy decides whether it runs inside REAPER from this attribute of __main__
+    sys.modules["__main__"].obj = None
+    from reapy.tools.network import Server
+
+    server = Server(server_port)
+    _web_interface(web_port, server_port)
+    logger.info(f"Stub REAPER bridge on port {server_port} (web interface {web_port}), {n_tracks} tracks")
+    if ready is not None:
+        ready.set()
+    while True:
+        server.accept()
+        results = server.process_requests(server.get_requests())
+        server.send_results(results)
+        if tick > 0:
+            time.sleep(tick)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a stub REAPER bridge for load tests (no REAPER needed)")
+    parser.add_argument("--tracks", type=int, default=16, help="Tracks in the stub project (default: 16)")
+    parser.add_argument(
+        "--tick-ms",
+        type=float,
+        default=30.0,
+        help="Bridge polling interval in ms, like REAPER's defer loop (default: 30; 0 polls continuously)",
+    )
+    parser.add_argument("--web-port", type=int, default=WEB_INTERFACE_PORT, help="Web interface port reapy discovers the bridge through")
+    parser.add_argument("--server-port", type=int, default=REAPY_SERVER_PORT, help="Bridge port")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    serve(args.tracks, args.tick_ms / 1000.0, args.web_port, args.server_port)
+
+
+if __name__ == "__main__":
+    main()
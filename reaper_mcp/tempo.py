@@ -1,20 +1,26 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict
-
-import reapy
+from typing import Any, Dict, Optional
 
 from reaper_mcp.mcp_core import mcp
+from reaper_mcp.rpp import read_rpp
+from reaper_mcp.util import current_project
 
 logger = logging.getLogger(__name__)
 
 
 @mcp.tool()
-def get_bpm() -> Dict[str, Any]:
-    """Get current project BPM."""
+def get_bpm(rpp_path: Optional[str] = None) -> Dict[str, Any]:
+    """Get current project BPM.
+
+    Args:
+        rpp_path: Read a saved .rpp file from disk instead of the live project
+    """
     try:
-        project = reapy.Project()
+        if rpp_path:
+            return {"bpm": read_rpp(rpp_path)["project"]["bpm"]}
+        project = current_project()
         bpm = project.bpm
         return {"bpm": bpm}
     except Exception as e:
@@ -52,7 +58,7 @@ def set_bpm(bpm: float) -> Dict[str, Any]:
         return {"error": error_msg}
     
     try:
-        project = reapy.Project()
+        project = current_project()
         project.bpm = bpm_value
         logger.info(f"Successfully set BPM to {bpm_value}")
         return {"bpm": bpm_value}
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from typing import List
+
+import numpy as np
+import reapy
+from reapy import reascript_api as RPR
+
+from reaper_mcp.cache import LRUCache
+from reaper_mcp.util import project_cache_key, project_state_version
+
+
+class TempoMap:
+    """Local copy of a project's tempo markers for bridge-free time/tempo lookups.
+
+    ``times`` are marker positions in seconds, ``qns`` their positions in quarter notes
+    and ``bpms`` the tempo starting at each marker. Index 0 is always time 0.
+    """
+
+    __slots__ = ("times", "qns", "bpms", "has_ramps")
+
+    def __init__(self, times: List[float], qns: List[float], bpms: List[float], has_ramps: bool = False) -> None:
+        self.times = np.asarray(times, dtype=np.float64)
+        self.qns = np.asarray(qns, dtype=np.float64)
+        self.bpms = np.asarray(bpms, dtype=np.float64)
+        self.has_ramps = has_ramps
+
+    def bpm_at(self, time: float) -> float:
+        i = max(0, int(np.searchsorted(self.times, float(time), side="right")) - 1)
+        return float(self.bpms[i])
+
+    def time_to_qn(self, times: np.ndarray) -> np.ndarray:
+        """Convert project times (seconds) to quarter notes; exact for maps without ramps."""
+        t = np.asarray(times, dtype=np.float64)
+        i = np.maximum(np.searchsorted(self.times, t, side="right") - 1, 0)
+        return self.qns[i] + (t - self.times[i]) * self.bpms[i] / 60.0
+
+    def qn_to_time(self, qns: np.ndarray) -> np.ndarray:
+        """Convert quarter notes to project times (seconds); inverse of ``time_to_qn``."""
+        q = np.asarray(qns, dtype=np.float64)
+        i = np.maximum(np.searchsorted(self.qns, q, side="right") - 1, 0)
+        return self.times[i] + (q - self.qns[i]) * 60.0 / self.bpms[i]
+
+
+# (instance, project id, state version) -> TempoMap
+_tempo_maps = LRUCache(maxsize=16)
+
+
+def get_tempo_map(project) -> TempoMap:
+    """Return the project's tempo map, re-reading markers only after project edits."""
+    key = (*project_cache_key(project), project_state_version(project))
+    tempo_map = _tempo_maps.get(key)
+    if tempo_map is None:
+        with reapy.inside_reaper():
+            times, qns, bpms, ramps = [0.0], [0.0], [float(project.bpm)], False
+            for i in range(RPR.CountTempoTimeSigMarkers(project.id)):
+                res = RPR.GetTempoTimeSigMarker(project.id, i, 0, 0, 0, 0, 0, 0, 0)
+                time, bpm, linear = float(res[3]), float(res[6]), bool(res[9])
+                ramps = ramps or linear
+                if time <= 0.0:
+                    bpms[0] = bpm
+                    continue
+                times.append(time)
+                qns.append(float(RPR.TimeMap2_timeToQN(project.id, time)))
+                bpms.append(bpm)
+        tempo_map = TempoMap(times, qns, bpms, ramps)
+        _tempo_maps.put(key, tempo_map)
+    return tempo_map
+
+
+__all__ = ["TempoMap", "get_tempo_map"]
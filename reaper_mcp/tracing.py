@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import cProfile
+import itertools
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Events kept per trace; later events are counted but dropped
+MAX_EVENTS = 100_000
+# File system audit events recorded as instant events while a trace is active
+_FILE_AUDIT_EVENTS = frozenset({"open", "os.scandir", "os.listdir", "os.remove", "os.rename", "shutil.copyfile"})
+_UNSAFE_NAME_RE = re.compile(r"[^\w.-]+")
+
+
+class Trace:
+    """Spans recorded for one tool call, in Chrome trace event format (Perfetto, speedscope, chrome://tracing)."""
+
+    def __init__(self, tool: str, path: Path, requested: bool) -> None:
+        self.tool = tool
+        self.path = path
+        self.requested = requested
+        # Arguments of the root span; callers may add to them while the call runs
+        self.args: Dict[str, Any] = {}
+        self.events: List[Dict[str, Any]] = []
+        self.dropped = 0
+        self.pid = os.getpid()
+        self.tid = threading.get_ident()
+
+    def add(self, event: Dict[str, Any]) -> None:
+        if len(self.events) >= MAX_EVENTS:
+            self.dropped += 1
+            return
+        event.setdefault("pid", self.pid)
+        event.setdefault("tid", self.tid)
+        self.events.append(event)
+
+    def to_json(self) -> Dict[str, Any]:
+        thread = {"name": "thread_name", "ph": "M", "pid": self.pid, "tid": self.tid, "args": {"name": self.tool}}
+        return {
+            "traceEvents": [thread] + self.events,
+            "displayTimeUnit": "ms",
+            "otherData": {"tool": self.tool, "dropped_events": self.dropped},
+        }
+
+
+class Tracer:
+    """Opt-in per-call tracing of tool calls.
+
+    Disabled until ``configure`` sets a trace directory. Then a call is traced when
+    requested (the tools' ``trace`` argument), picked by the sampling ``rate``, or
+    when its tool is in ``profile_tools`` (which also runs it under cProfile). A
+    traced call records spans for bridge RPCs, file operations and (de)serialization
+    made on its thread and is written as ``<dir>/<time>-<tool>-<n>.trace.json``
+    (plus ``.prof`` for cProfile runs, readable with pstats/snakeviz).
+    """
+
+    def __init__(self) -> None:
+        self.directory: Optional[Path] = None
+        self.rate = 0.0
+        self.profile_tools: frozenset = frozenset()
+        self._local = threading.local()
+        self._counter = itertools.count(1)
+        # cProfile cannot profile two threads' calls at once
+        self._profile_lock = threading.Lock()
+        self._audit_hooked = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def configure(
+        self, directory: Optional[str], rate: float = 0.0, profile_tools: Iterable[str] = ()
+    ) -> None:
+        self.directory = Path(directory).expanduser() if directory else None
+        self.rate = min(1.0, max(0.0, float(rate)))
+        self.profile_tools = frozenset(profile_tools)
+        if self.enabled and not self._audit_hooked:
+            # Audit hooks cannot be removed; the hook is a no-op on untraced threads
+            sys.addaudithook(self._audit)
+            self._audit_hooked = True
+
+    def active(self) -> Optional[Trace]:
+        return getattr(self._local, "trace", None)
+
+    @contextmanager
+    def span(self, name: str, cat: str, **args: Any) -> Iterator[Dict[str, Any]]:
+        """Record the block as a span of the active trace (no-op when the thread is not traced).
+
+        Yields the span's argument dict, so details known only at the end (sizes,
+        attempts) can be added to it.
+        """
+        trace = getattr(self._local, "trace", None)
+        if trace is None:
+            yield {}
+            return
+        start = time.perf_counter_ns()
+        try:
+            yield args
+        finally:
+            end = time.perf_counter_ns()
+            event = {"name": name, "cat": cat, "ph": "X", "ts": start / 1000, "dur": (end - start) / 1000}
+            if args:
+                event["args"] = {k: _arg(v) for k, v in args.items()}
+            trace.add(event)
+
+    def _audit(self, event: str, args: tuple) -> None:
+        if event not in _FILE_AUDIT_EVENTS:
+            return
+        trace = getattr(self._local, "trace", None)
+        if trace is None:
+            return
+        path = args[0] if args else None
+        trace.add({
+            "name": event,
+            "cat": "file",
+            "ph": "i",
+            "s": "t",
+            "ts": time.perf_counter_ns() / 1000,
+            "args": {"path": _arg(path)},
+        })
+
+    def should_trace(self, tool: str, requested: Optional[bool]) -> bool:
+        if not self.enabled or requested is False:
+            return False
+        return bool(requested) or tool in self.profile_tools or (self.rate > 0 and random.random() < self.rate)
+
+    @contextmanager
+    def record(self, tool: str, requested: Optional[bool] = None) -> Iterator[Optional[Trace]]:
+        """Trace one tool call if selected; yields the trace (None when not traced)."""
+        if not self.should_trace(tool, requested) or self.active() is not None:
+            yield None
+            return
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        base = str(self.directory / f"{stamp}-{_UNSAFE_NAME_RE.sub('_', tool)}-{next(self._counter)}")
+        trace = Trace(tool, Path(base + ".trace.json"), bool(requested))
+        profile = None
+        if tool in self.profile_tools and self._profile_lock.acquire(blocking=False):
+            profile = cProfile.Profile()
+        self._local.trace = trace
+        try:
+            with self.span(tool, "tool") as trace.args:
+                if profile is None:
+                    yield trace
+                else:
+                    profile.enable()
+                    try:
+                        yield trace
+                    finally:
+                        profile.disable()
+        finally:
+            self._local.trace = None
+            if profile is not None:
+                self._profile_lock.release()
+            self._write(trace, profile, base)
+
+    def _write(self, trace: Trace, profile: Optional[cProfile.Profile], base: str) -> None:
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            trace.path.write_text(json.dumps(trace.to_json()), encoding="utf-8")
+            if profile is not None:
+                profile.dump_stats(base + ".prof")
+            logger.info(f"Wrote trace for {trace.tool} to {trace.path}")
+        except Exception as e:
+            logger.error(f"Failed to write trace for {trace.tool}: {e}", exc_info=True)
+
+
+def _arg(value: Any) -> Any:
+    """Trace event argument: JSON scalars as-is, anything else as a short repr."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    text = value if isinstance(value, str) else repr(value)
+    return text if len(text) <= 200 else text[:197] + "..."
+
+
+tracer = Tracer()
+tracer.configure(
+    os.environ.get("REAPER_MCP_TRACE_DIR"),
+    float(os.environ.get("REAPER_MCP_TRACE_RATE", "0") or 0),
+    [t.strip() for t in os.environ.get("REAPER_MCP_PROFILE_TOOLS", "").split(",") if t.strip()],
+)
+
+
+__all__ = ["Trace", "Tracer", "tracer"]
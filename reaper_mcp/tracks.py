@@ -1,15 +1,30 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import reapy
-
+from reapy import reascript_api as RPR
+
+from reaper_mcp.chunks import (
+    get_track_chunk,
+    load_track_template,
+    regenerate_guids,
+    resolve_track_template,
+    rewrite_receives,
+    set_track_chunk,
+)
+from reaper_mcp.coalesce import coalescer
 from reaper_mcp.mcp_core import mcp
 from reaper_mcp.project import get_project_details
+from reaper_mcp.rpp import read_rpp
+from reaper_mcp.util import as_current_project, bridge_batch, current_project, insert_tracks, remove_tracks
 
 logger = logging.getLogger(__name__)
 
+# Send settings copied onto duplicated tracks' new sends
+_SEND_PARAMS = ("D_VOL", "D_PAN", "D_PANLAW", "B_MUTE", "B_PHASE", "B_MONO", "I_SENDMODE", "I_SRCCHAN", "I_DSTCHAN", "I_MIDIFLAGS")
+
 
 @mcp.tool()
 def create_track(name: Optional[str] = None, index: Optional[int] = None) -> Dict[str, Any]:
@@ -23,7 +38,7 @@ def create_track(name: Optional[str] = None, index: Optional[int] = None) -> Dic
     """
     logger.info(f"create_track called with name={name}, index={index} (type: {type(index).__name__})")
     try:
-        project = reapy.Project()
+        project = current_project()
         n = len(project.tracks)
         idx = max(0, min(index if isinstance(index, int) else n, n))
         track = project.add_track(index=idx)
@@ -49,7 +64,7 @@ def delete_track(index: int) -> Dict[str, Any]:
     """
     logger.info(f"delete_track called with index={index} (type: {type(index).__name__})")
     try:
-        project = reapy.Project()
+        project = current_project()
         tracks = list(project.tracks)
         if index < 0 or index >= len(tracks):
             error_msg = f"Track index out of range: {index} (valid: 0-{len(tracks)-1})"
@@ -65,21 +80,290 @@ def delete_track(index: int) -> Dict[str, Any]:
 
 
 @mcp.tool()
-def list_tracks() -> Dict[str, Any]:
-    """List tracks with indices and names."""
-    return get_project_details()
+def create_tracks(tracks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Create many tracks in one batch (single bridge pass, one undo point).
+    
+    Args:
+        tracks: List of track specs, each with optional keys:
+            name: Track name
+            index: Insert position (0-based, clamped; applied in list order as if the
+                tracks were created one by one). Omit to append.
+            color: RGB color [r, g, b], each value 0-255
+            depth: Folder depth change (1 = folder parent, 0 = normal, -1 = closes one folder level, ...)
+    
+    Returns:
+        Dict with the created tracks (final index and name) and their count
+    """
+    logger.info(f"create_tracks called with {len(tracks) if tracks is not None else 0} tracks")
+    try:
+        if not tracks:
+            return {"error": "No tracks given"}
+        project = current_project()
+        try:
+            with bridge_batch("Create tracks"):
+                created = insert_tracks(project, tracks)
+        except (ValueError, TypeError) as e:
+            return {"error": f"Invalid track spec: {e}"}
+        logger.info(f"Successfully created {len(created)} tracks")
+        return {"ok": True, "tracks": created, "count": len(created)}
+    except Exception as e:
+        error_msg = f"Failed to create tracks: {e}"
+        logger.error(error_msg, exc_info=True)
+        return {"error": error_msg}
 
 
 @mcp.tool()
-def get_track_name(index: int) -> Dict[str, Any]:
+def delete_tracks(indices: Optional[List[int]] = None, all_tracks: bool = False) -> Dict[str, Any]:
+    """Delete many tracks in one batch (single bridge pass, one undo point).
+    
+    Args:
+        indices: Track indices (0-based) to delete; refer to positions before deletion
+        all_tracks: Delete every track in the project (indices is ignored)
+    
+    Returns:
+        Dict with the number of deleted tracks
+    """
+    logger.info(f"delete_tracks called with indices={indices}, all_tracks={all_tracks}")
+    try:
+        project = current_project()
+        if all_tracks:
+            indices = range(project.n_tracks)
+        elif not indices:
+            return {"error": "No track indices given"}
+        try:
+            with bridge_batch("Delete tracks"):
+                deleted = remove_tracks(project, indices)
+        except IndexError as e:
+            logger.warning(str(e))
+            return {"error": str(e)}
+        logger.info(f"Successfully deleted {deleted} tracks")
+        return {"ok": True, "deleted": deleted}
+    except Exception as e:
+        error_msg = f"Failed to delete tracks: {e}"
+        logger.error(error_msg, exc_info=True)
+        return {"error": error_msg}
+
+
+def _read_sends(track_id: str) -> List[tuple]:
+    sends = []
+    for s in range(RPR.GetTrackNumSends(track_id, 0)):
+        dest = reapy.Track._get_id_from_pointer(RPR.GetTrackSendInfo_Value(track_id, 0, s, "P_DESTTRACK"))
+        sends.append((dest, {p: RPR.GetTrackSendInfo_Value(track_id, 0, s, p) for p in _SEND_PARAMS}))
+    return sends
+
+
+def _track_number(track_id: str) -> int:
+    return int(RPR.GetMediaTrackInfo_Value(track_id, "IP_TRACKNUMBER")) - 1
+
+
+def _folder_end(depths: List[int], start: int) -> int:
+    """Index of the last track in the folder opened at ``start`` (``start`` itself for other tracks)."""
+    level = depths[start]
+    end = start
+    while level > 0 and end + 1 < len(depths):
+        end += 1
+        level += depths[end]
+    return end
+
+
+@mcp.tool()
+def duplicate_tracks(indices: List[int], count: int = 1, copy_sends: bool = True) -> Dict[str, Any]:
+    """Duplicate fully configured tracks (FX chains, items, envelopes, receives, sends) in one batch.
+    
+    Copies are made from each track's state chunk with fresh GUIDs and inserted right
+    after the original. A folder parent is duplicated together with all of its
+    children, and each copy of the folder follows the original folder's last track.
+    Indices inside a folder that is itself being duplicated are covered by that folder.
+    Routing between tracks of a duplicated folder is recreated between the copies.
+    
+    Args:
+        indices: Track indices (0-based) to duplicate
+        count: Number of copies per track (or folder)
+        copy_sends: Also recreate the tracks' sends to other tracks on the copies
+    
+    Returns:
+        Dict with the indices of the new tracks
+    """
+    logger.info(f"duplicate_tracks called with indices={indices}, count={count}, copy_sends={copy_sends}")
+    try:
+        if not indices:
+            return {"error": "No track indices given"}
+        if count < 1:
+            return {"error": f"count must be at least 1, got {count}"}
+        project = current_project()
+        n = project.n_tracks
+        for i in indices:
+            if i < 0 or i >= n:
+                return {"error": f"Track index out of range: {i} (valid: 0-{n-1})"}
+        created = []
+        with bridge_batch("Duplicate tracks"):
+            track_ids = [RPR.GetTrack(project.id, i) for i in range(n)]
+            depths = [int(RPR.GetMediaTrackInfo_Value(t, "I_FOLDERDEPTH")) for t in track_ids]
+            spans = []
+            for i in sorted(set(int(i) for i in indices)):
+                if spans and i <= spans[-1][1]:
+                    continue
+                spans.append((i, _folder_end(depths, i)))
+            # Read everything before inserting: receives in a chunk refer to track
+            # indices at the time it is read
+            sources = {
+                k: (get_track_chunk(track_ids[k]), _read_sends(track_ids[k]) if copy_sends else [])
+                for start, end in spans
+                for k in range(start, end + 1)
+            }
+
+            def current_index(k: int) -> Optional[int]:
+                return _track_number(track_ids[k]) if 0 <= k < n else None
+
+            for start, end in reversed(spans):
+                m = end - start + 1
+                span_ids = set(track_ids[start:end + 1])
+                # Folder levels the span's last track closes beyond the span itself (negative),
+                # or leaves open at the end of the project (positive)
+                carry = sum(depths[start:end + 1])
+                span_depths = depths[start:end] + [depths[end] - carry]
+                copies = []
+                for c in range(count):
+                    base = current_index(end) + 1 + c * m
+                    # Create the whole copy first so receives between its tracks resolve
+                    with as_current_project(project):
+                        for j in range(m):
+                            RPR.InsertTrackAtIndex(base + j, False)
+                    copy_ids = [RPR.GetTrack(project.id, base + j) for j in range(m)]
+
+                    def remap(k: int, base: int = base) -> Optional[int]:
+                        return base + k - start if start <= k <= end else current_index(k)
+
+                    for j, copy_id in enumerate(copy_ids):
+                        chunk, sends = sources[start + j]
+                        set_track_chunk(copy_id, rewrite_receives(regenerate_guids(chunk), remap))
+                        RPR.SetMediaTrackInfo_Value(copy_id, "I_FOLDERDEPTH", span_depths[j])
+                        for dest, values in sends:
+                            # Sends inside the folder arrive through the copied receives
+                            if dest in span_ids:
+                                continue
+                            s = RPR.CreateTrackSend(copy_id, dest)
+                            for param, value in values.items():
+                                RPR.SetTrackSendInfo_Value(copy_id, 0, s, param, value)
+                    copies.extend(copy_ids)
+                # Copies follow the original, so the last copy takes over closing any outer folders
+                if carry:
+                    RPR.SetMediaTrackInfo_Value(track_ids[end], "I_FOLDERDEPTH", span_depths[-1])
+                if carry < 0:
+                    RPR.SetMediaTrackInfo_Value(copies[-1], "I_FOLDERDEPTH", depths[end])
+                created.extend(copies)
+            new_indices = sorted(_track_number(t) for t in created)
+        logger.info(f"Successfully duplicated {len(spans)} tracks/folders into {len(new_indices)} copies")
+        return {"ok": True, "tracks": new_indices, "count": len(new_indices)}
+    except Exception as e:
+        error_msg = f"Failed to duplicate tracks: {e}"
+        logger.error(error_msg, exc_info=True)
+        return {"error": error_msg}
+
+
+@mcp.tool()
+def instantiate_track_template(
+    template: str,
+    count: int = 1,
+    index: Optional[int] = None,
+    name_pattern: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Insert one or more instances of a track template (.RTrackTemplate) in one batch.
+    
+    Parsed templates are cached by file content, so repeated instantiation skips disk
+    and parsing entirely.
+    
+    Args:
+        template: Template file path, or a template name under REAPER's TrackTemplates folder
+        count: Number of instances to insert
+        index: Insert position (0-based, clamped). Omit to append.
+        name_pattern: Optional track name pattern with {n} (1-based instance number) and
+            {name} (the template track's name), e.g. "Ch {n}"
+    
+    Returns:
+        Dict with the indices of the new tracks and the template path used
+    """
+    logger.info(f"instantiate_track_template called with template={template}, count={count}, index={index}")
+    try:
+        if count < 1:
+            return {"error": f"count must be at least 1, got {count}"}
+        if name_pattern:
+            try:
+                name_pattern.format(n=1, name="")
+            except (KeyError, IndexError, ValueError) as e:
+                return {"error": f"Invalid name_pattern: {e}"}
+        try:
+            path = resolve_track_template(template)
+        except FileNotFoundError as e:
+            return {"error": str(e)}
+        chunks = load_track_template(path)
+        project = current_project()
+        m = len(chunks)
+        with bridge_batch("Insert track template"):
+            n = RPR.CountTracks(project.id)
+            pos = max(0, min(index if isinstance(index, int) else n, n))
+            for inst in range(count):
+                base = pos + inst * m
+                # Create the whole instance first so receives between its tracks resolve
+                with as_current_project(project):
+                    for j in range(m):
+                        RPR.InsertTrackAtIndex(base + j, False)
+                for j, chunk in enumerate(chunks):
+                    track_id = RPR.GetTrack(project.id, base + j)
+                    chunk = rewrite_receives(regenerate_guids(chunk), lambda k: base + k if 0 <= k < m else None)
+                    set_track_chunk(track_id, chunk)
+                    if name_pattern:
+                        name = RPR.GetTrackName(track_id, "", 512)[2] if "{name}" in name_pattern else ""
+                        RPR.GetSetMediaTrackInfo_String(track_id, "P_NAME", name_pattern.format(n=inst + 1, name=name), True)
+        new_indices = list(range(pos, pos + count * m))
+        logger.info(f"Successfully inserted {count} instance(s) of {path}")
+        return {"ok": True, "tracks": new_indices, "count": len(new_indices), "template": str(path)}
+    except Exception as e:
+        error_msg = f"Failed to instantiate track template: {e}"
+        logger.error(error_msg, exc_info=True)
+        return {"error": error_msg}
+
+
+@mcp.tool()
+def list_tracks(
+    rpp_path: Optional[str] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    name_filter: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """List tracks with indices and names.
+
+    Args:
+        rpp_path: Read a saved .rpp file from disk instead of the live project
+        offset: Skip this many (matching) tracks
+        limit: Return at most this many tracks (default: all); pass next_offset back as
+            offset to get the following page
+        name_filter: Only tracks whose name contains this text (case-insensitive)
+        fields: Per-track fields to return besides index (default ["name"]):
+            guid, name, volume, pan, mute, solo, armed, color, depth
+    """
+    return get_project_details(
+        rpp_path=rpp_path, offset=offset, limit=limit, name_filter=name_filter, fields=fields
+    )
+
+
+@mcp.tool()
+def get_track_name(index: int, rpp_path: Optional[str] = None) -> Dict[str, Any]:
     """Get the name of a track by index.
     
     Args:
         index: Track index (0-based).
+        rpp_path: Read a saved .rpp file from disk instead of the live project
     """
     logger.info(f"get_track_name called with index={index}")
     try:
-        project = reapy.Project()
+        if rpp_path:
+            tracks = read_rpp(rpp_path)["tracks"]
+            if index < 0 or index >= len(tracks):
+                return {"error": f"Track index out of range: {index} (valid: 0-{len(tracks)-1})"}
+            return {"index": index, "name": tracks[index]["name"]}
+        project = current_project()
         tracks = list(project.tracks)
         if index < 0 or index >= len(tracks):
             error_msg = f"Track index out of range: {index} (valid: 0-{len(tracks)-1})"
@@ -95,15 +379,21 @@ def get_track_name(index: int) -> Dict[str, Any]:
 
 
 @mcp.tool()
-def get_track_item_count(index: int) -> Dict[str, Any]:
+def get_track_item_count(index: int, rpp_path: Optional[str] = None) -> Dict[str, Any]:
     """Get the number of items on a track by index.
     
     Args:
         index: Track index (0-based).
+        rpp_path: Read a saved .rpp file from disk instead of the live project
     """
     logger.info(f"get_track_item_count called with index={index}")
     try:
-        project = reapy.Project()
+        if rpp_path:
+            tracks = read_rpp(rpp_path)["tracks"]
+            if index < 0 or index >= len(tracks):
+                return {"error": f"Track index out of range: {index} (valid: 0-{len(tracks)-1})"}
+            return {"index": index, "item_count": len(tracks[index]["items"])}
+        project = current_project()
         tracks = list(project.tracks)
         if index < 0 or index >= len(tracks):
             error_msg = f"Track index out of range: {index} (valid: 0-{len(tracks)-1})"
@@ -128,7 +418,7 @@ def set_track_color(index: int, color: tuple) -> Dict[str, Any]:
     """
     logger.info(f"set_track_color called with index={index}, color={color}")
     try:
-        project = reapy.Project()
+        project = current_project()
         tracks = list(project.tracks)
         if index < 0 or index >= len(tracks):
             error_msg = f"Track index out of range: {index} (valid: 0-{len(tracks)-1})"
@@ -155,7 +445,7 @@ def mute_track(index: int) -> Dict[str, Any]:
     """
     logger.info(f"mute_track called with index={index}")
     try:
-        project = reapy.Project()
+        project = current_project()
         tracks = list(project.tracks)
         if index < 0 or index >= len(tracks):
             error_msg = f"Track index out of range: {index} (valid: 0-{len(tracks)-1})"
@@ -179,7 +469,7 @@ def unmute_track(index: int) -> Dict[str, Any]:
     """
     logger.info(f"unmute_track called with index={index}")
     try:
-        project = reapy.Project()
+        project = current_project()
         tracks = list(project.tracks)
         if index < 0 or index >= len(tracks):
             error_msg = f"Track index out of range: {index} (valid: 0-{len(tracks)-1})"
@@ -203,7 +493,7 @@ def solo_track(index: int) -> Dict[str, Any]:
     """
     logger.info(f"solo_track called with index={index}")
     try:
-        project = reapy.Project()
+        project = current_project()
         tracks = list(project.tracks)
         if index < 0 or index >= len(tracks):
             error_msg = f"Track index out of range: {index} (valid: 0-{len(tracks)-1})"
@@ -227,7 +517,7 @@ def unsolo_track(index: int) -> Dict[str, Any]:
     """
     logger.info(f"unsolo_track called with index={index}")
     try:
-        project = reapy.Project()
+        project = current_project()
         tracks = list(project.tracks)
         if index < 0 or index >= len(tracks):
             error_msg = f"Track index out of range: {index} (valid: 0-{len(tracks)-1})"
@@ -243,18 +533,24 @@ def unsolo_track(index: int) -> Dict[str, Any]:
 
 
 @mcp.tool()
-def get_track_volume(index: int) -> Dict[str, Any]:
+def get_track_volume(index: int, rpp_path: Optional[str] = None) -> Dict[str, Any]:
     """Get the volume of a track by index.
     
     Args:
         index: Track index (0-based).
+        rpp_path: Read a saved .rpp file from disk instead of the live project
     
     Returns:
         Dict with volume (0.0 to 2.0+, where 1.0 = 0dB)
     """
     logger.info(f"get_track_volume called with index={index}")
     try:
-        project = reapy.Project()
+        if rpp_path:
+            tracks = read_rpp(rpp_path)["tracks"]
+            if index < 0 or index >= len(tracks):
+                return {"error": f"Track index out of range: {index} (valid: 0-{len(tracks)-1})"}
+            return {"index": index, "volume": tracks[index]["volume"]}
+        project = current_project()
         tracks = list(project.tracks)
         if index < 0 or index >= len(tracks):
             error_msg = f"Track index out of range: {index} (valid: 0-{len(tracks)-1})"
@@ -270,16 +566,22 @@ def get_track_volume(index: int) -> Dict[str, Any]:
 
 
 @mcp.tool()
-def set_track_volume(index: int, volume: float) -> Dict[str, Any]:
+def set_track_volume(index: int, volume: float, coalesce: bool = False) -> Dict[str, Any]:
     """Set the volume of a track by index.
     
     Args:
         index: Track index (0-based).
         volume: Volume value (0.0 to 2.0+, where 1.0 = 0dB, 0.0 = -inf dB).
+        coalesce: Queue the write and return a ticket; rapid writes to the same track are
+            merged and applied in batches by a background flusher once the coalescing
+            window has passed (see flush_writes/get_write_status).
     """
-    logger.info(f"set_track_volume called with index={index}, volume={volume}")
+    logger.info(f"set_track_volume called with index={index}, volume={volume}, coalesce={coalesce}")
     try:
-        project = reapy.Project()
+        if coalesce:
+            ticket = coalescer.submit("track_volume", (int(index),), float(volume))
+            return {"ok": True, "queued": True, "ticket": ticket, "index": index, "volume": volume}
+        project = current_project()
         tracks = list(project.tracks)
         if index < 0 or index >= len(tracks):
             error_msg = f"Track index out of range: {index} (valid: 0-{len(tracks)-1})"
@@ -295,18 +597,24 @@ def set_track_volume(index: int, volume: float) -> Dict[str, Any]:
 
 
 @mcp.tool()
-def get_track_pan(index: int) -> Dict[str, Any]:
+def get_track_pan(index: int, rpp_path: Optional[str] = None) -> Dict[str, Any]:
     """Get the pan of a track by index.
     
     Args:
         index: Track index (0-based).
+        rpp_path: Read a saved .rpp file from disk instead of the live project
     
     Returns:
         Dict with pan (-1.0 = left, 0.0 = center, 1.0 = right)
     """
     logger.info(f"get_track_pan called with index={index}")
     try:
-        project = reapy.Project()
+        if rpp_path:
+            tracks = read_rpp(rpp_path)["tracks"]
+            if index < 0 or index >= len(tracks):
+                return {"error": f"Track index out of range: {index} (valid: 0-{len(tracks)-1})"}
+            return {"index": index, "pan": tracks[index]["pan"]}
+        project = current_project()
         tracks = list(project.tracks)
         if index < 0 or index >= len(tracks):
             error_msg = f"Track index out of range: {index} (valid: 0-{len(tracks)-1})"
@@ -322,23 +630,29 @@ def get_track_pan(index: int) -> Dict[str, Any]:
 
 
 @mcp.tool()
-def set_track_pan(index: int, pan: float) -> Dict[str, Any]:
+def set_track_pan(index: int, pan: float, coalesce: bool = False) -> Dict[str, Any]:
     """Set the pan of a track by index.
     
     Args:
         index: Track index (0-based).
         pan: Pan value (-1.0 = full left, 0.0 = center, 1.0 = full right).
+        coalesce: Queue the write and return a ticket; rapid writes to the same track are
+            merged and applied in batches by a background flusher once the coalescing
+            window has passed (see flush_writes/get_write_status).
     """
-    logger.info(f"set_track_pan called with index={index}, pan={pan}")
+    logger.info(f"set_track_pan called with index={index}, pan={pan}, coalesce={coalesce}")
     try:
-        project = reapy.Project()
+        # Clamp pan to valid range
+        pan_value = max(-1.0, min(1.0, float(pan)))
+        if coalesce:
+            ticket = coalescer.submit("track_pan", (int(index),), pan_value)
+            return {"ok": True, "queued": True, "ticket": ticket, "index": index, "pan": pan_value}
+        project = current_project()
         tracks = list(project.tracks)
         if index < 0 or index >= len(tracks):
             error_msg = f"Track index out of range: {index} (valid: 0-{len(tracks)-1})"
             logger.warning(error_msg)
             return {"error": error_msg}
-        # Clamp pan to valid range
-        pan_value = max(-1.0, min(1.0, float(pan)))
         tracks[index].set_info_value("D_PAN", pan_value)
         logger.info(f"Successfully set track {index} pan to {pan_value}")
         return {"ok": True, "index": index, "pan": pan_value}
@@ -357,7 +671,7 @@ def select_track(index: int) -> Dict[str, Any]:
     """
     logger.info(f"select_track called with index={index}")
     try:
-        project = reapy.Project()
+        project = current_project()
         tracks = list(project.tracks)
         if index < 0 or index >= len(tracks):
             error_msg = f"Track index out of range: {index} (valid: 0-{len(tracks)-1})"
@@ -381,7 +695,7 @@ def unselect_track(index: int) -> Dict[str, Any]:
     """
     logger.info(f"unselect_track called with index={index}")
     try:
-        project = reapy.Project()
+        project = current_project()
         tracks = list(project.tracks)
         if index < 0 or index >= len(tracks):
             error_msg = f"Track index out of range: {index} (valid: 0-{len(tracks)-1})"
@@ -1,41 +1,423 @@
 from __future__ import annotations
 
 import json
+import logging
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from contextlib import AbstractContextManager, contextmanager, nullcontext
 from pathlib import Path
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Union
 
 # Top-level imports for performance/simplicity
 import reapy
-# Mandatory configuration per python-reapy docs
-reapy.configure_reaper()
+
+from reaper_mcp.cache import atomic_write
+from reaper_mcp.pool import pool
+# Mandatory configuration per python-reapy docs; needs a running REAPER, so it can be
+# turned off (REAPER_MCP_CONFIGURE_REAPER=0) when the bridge is the load-test stub
+if os.environ.get("REAPER_MCP_CONFIGURE_REAPER", "1") != "0":
+    reapy.configure_reaper()
+
+logger = logging.getLogger(__name__)
 
 # ----------------------
 # Utilities & constants
 # ----------------------
 PACKAGE_DIR = Path(__file__).parent
-SAMPLE_DIRS_FILE = PACKAGE_DIR / "sample_dirs.json"
 
 
-def _load_sample_dirs() -> List[str]:
-    try:
-        if SAMPLE_DIRS_FILE.exists():
-            with SAMPLE_DIRS_FILE.open("r", encoding="utf-8") as f:
+def _default_data_dir() -> Path:
+    if os.name == "nt":
+        base = Path(os.environ.get("APPDATA") or Path.home() / "AppData" / "Roaming")
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Application Support"
+    else:
+        base = Path(os.environ.get("XDG_DATA_HOME") or Path.home() / ".local" / "share")
+    return base / "reaper-mcp"
+
+
+# Writable per-user data dir (sample dirs config, indexes); override with REAPER_MCP_DATA_DIR
+DATA_DIR = Path(os.environ.get("REAPER_MCP_DATA_DIR") or _default_data_dir())
+SAMPLE_DIRS_FILE = DATA_DIR / "sample_dirs.json"
+# Where older versions kept the config; read once if the new file doesn't exist yet
+LEGACY_SAMPLE_DIRS_FILE = PACKAGE_DIR / "sample_dirs.json"
+
+
+class SampleDirStore:
+    """In-memory sample directory list backed by a JSON file.
+
+    The file is re-read only when its mtime/size changes (checked at most every
+    ``check_interval`` seconds), and writes are atomic. Callbacks registered with
+    ``subscribe`` run whenever the list changes, locally or on disk.
+    """
+
+    def __init__(self, path: Path, legacy_path: Optional[Path] = None, check_interval: float = 1.0) -> None:
+        self.path = path
+        self.legacy_path = legacy_path
+        self.check_interval = check_interval
+        self._dirs: List[str] = []
+        self._stamp: Optional[tuple] = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[List[str]], None]] = []
+
+    def subscribe(self, callback: Callable[[List[str]], None]) -> None:
+        self._listeners.append(callback)
+
+    def _notify(self, dirs: List[str]) -> None:
+        for callback in self._listeners:
+            try:
+                callback(list(dirs))
+            except Exception:
+                logger.warning("Sample dir listener failed", exc_info=True)
+
+    @staticmethod
+    def _read(path: Path) -> List[str]:
+        try:
+            with path.open("r", encoding="utf-8") as f:
                 data = json.load(f)
                 if isinstance(data, list):
                     return [d for d in data if isinstance(d, str)]
-    except Exception:
-        # Be forgiving; return empty on any parse/read error
-        pass
-    return []
+        except Exception:
+            # Be forgiving; return empty on any parse/read error
+            pass
+        return []
+
+    def get(self) -> List[str]:
+        changed = None
+        with self._lock:
+            now = time.monotonic()
+            if now - self._checked_at >= self.check_interval:
+                self._checked_at = now
+                try:
+                    st = self.path.stat()
+                    stamp = (st.st_mtime_ns, st.st_size)
+                    source = self.path
+                except OSError:
+                    stamp, source = None, None
+                    if self.legacy_path is not None and self.legacy_path.exists():
+                        stamp, source = ("legacy",), self.legacy_path
+                if stamp != self._stamp:
+                    self._stamp = stamp
+                    dirs = self._read(source) if source is not None else []
+                    if dirs != self._dirs:
+                        self._dirs = changed = dirs
+            dirs = list(self._dirs)
+        if changed is not None:
+            self._notify(changed)
+        return dirs
+
+    def set(self, dirs: List[str]) -> List[str]:
+        dirs = sorted(set(dirs))
+        with self._lock:
+            atomic_write(self.path, json.dumps(dirs, indent=2).encode("utf-8"))
+            st = self.path.stat()
+            self._stamp = (st.st_mtime_ns, st.st_size)
+            self._checked_at = time.monotonic()
+            changed = dirs != self._dirs
+            self._dirs = dirs
+        if changed:
+            self._notify(dirs)
+        return list(dirs)
+
+
+sample_dir_store = SampleDirStore(SAMPLE_DIRS_FILE, LEGACY_SAMPLE_DIRS_FILE)
+
+
+def _load_sample_dirs() -> List[str]:
+    return sample_dir_store.get()
 
 
 def _save_sample_dirs(dirs: List[str]) -> None:
-    with SAMPLE_DIRS_FILE.open("w", encoding="utf-8") as f:
-        json.dump(sorted(list(set(dirs))), f, indent=2)
+    sample_dir_store.set(dirs)
+
+
+# Project tab selected for the current tool call (see use_project)
+_project_selection = threading.local()
+
+
+def current_project():
+    """The project tools act on: the tab selected for this call, else the current tab."""
+    project = getattr(_project_selection, "project", None)
+    return project if project is not None else reapy.Project()
+
+
+def selected_project():
+    """The explicitly selected project of this call, or None for "whatever tab is current"."""
+    return getattr(_project_selection, "project", None)
+
+
+def list_open_projects() -> List[Dict[str, Any]]:
+    """All open project tabs as ``{"index", "id", "file", "name", "current"}`` in one bridge pass."""
+    RPR = reapy.reascript_api
+    projects = []
+    with bridge_batch():
+        current = RPR.EnumProjects(-1, "", 0)[0]
+        i = 0
+        while True:
+            project_id, _, file_name, _ = RPR.EnumProjects(i, "", 4096)
+            if not project_id or str(project_id).endswith("0x0000000000000000"):
+                break
+            projects.append({
+                "index": i,
+                "id": project_id,
+                "file": file_name,
+                "name": os.path.basename(file_name) if file_name else "",
+                "current": project_id == current,
+            })
+            i += 1
+    return projects
+
+
+def resolve_project(selector: Union[int, str]):
+    """Find an open project by tab index, .rpp path or file name (with or without .rpp)."""
+    projects = list_open_projects()
+    if isinstance(selector, int) or str(selector).strip().lstrip("-").isdigit():
+        index = int(selector)
+        if not 0 <= index < len(projects):
+            raise ValueError(f"Project tab index out of range: {index} (open tabs: {len(projects)})")
+        return reapy.Project(projects[index]["id"])
+    wanted = os.path.normcase(os.path.abspath(os.path.expanduser(str(selector))))
+    matches = [p for p in projects if p["file"] and os.path.normcase(os.path.abspath(p["file"])) == wanted]
+    if not matches:
+        name = os.path.normcase(os.path.basename(str(selector)))
+        matches = [
+            p for p in projects
+            if os.path.normcase(p["name"]) in (name, f"{name}.rpp") or os.path.normcase(p["name"][:-4]) == name
+        ]
+    if not matches:
+        raise ValueError(f"No open project matches '{selector}'")
+    if len(matches) > 1:
+        raise ValueError(f"Several open projects match '{selector}'; use the tab index")
+    return reapy.Project(matches[0]["id"])
+
+
+@contextmanager
+def use_project(selector: Any = None) -> Iterator[None]:
+    """Make ``current_project()`` return the selected project tab on this thread.
+
+    ``selector`` is anything ``resolve_project`` accepts or a ``reapy.Project``;
+    ``None`` selects no tab (the tab that is current in REAPER at each call).
+    """
+    if selector is None or selector == "":
+        project = None
+    else:
+        project = selector if isinstance(selector, reapy.Project) else resolve_project(selector)
+    previous = getattr(_project_selection, "project", None)
+    _project_selection.project = project
+    try:
+        yield
+    finally:
+        _project_selection.project = previous
+
+
+def cache_scope() -> tuple:
+    """Ambient target of the current call (REAPER instance, selected project) for read caches."""
+    project = selected_project()
+    return (pool.current_name(), project.id if project is not None else None)
+
+
+def project_cache_key(project) -> tuple:
+    """Identity of ``project`` for cache keys; pointers are only unique per REAPER instance."""
+    return (pool.current_name(), project.id)
+
+
+# Writes made through this server (see note_local_write)
+_local_writes = 0
+_local_writes_lock = threading.Lock()
+
+
+def note_local_write() -> None:
+    """Record that project state may have changed without REAPER counting it.
+
+    Plain setter calls (e.g. ``SetMediaTrackInfo_Value`` outside an undo block) do not
+    always bump REAPER's project state change counter; this moves every
+    ``project_state_version`` on instead, so caches keyed on it are rebuilt.
+    """
+    global _local_writes
+    with _local_writes_lock:
+        _local_writes += 1
 
 
-@dataclass
+def project_state_version(project) -> int:
+    """Version of the project state, used to key caches and as a sync token.
+
+    REAPER's project state change counter plus the writes noted with
+    ``note_local_write``; both only grow, so the sum changes whenever either does.
+    """
+    return int(reapy.reascript_api.GetProjectStateChangeCount(project.id)) + _local_writes
+
+
+def as_current_project(project) -> AbstractContextManager:
+    """Make ``project`` REAPER's current tab for the block, restoring the previous tab after.
+
+    For APIs that only act on the current tab (e.g. ``InsertTrackAtIndex``); a no-op
+    unless a tab was selected for this call. Use inside ``bridge_batch`` so the
+    switch is not drawn.
+    """
+    if selected_project() is None:
+        return nullcontext()
+    return project.make_current_project()
+
+
+@contextmanager
+def _undo_block(undo_name: str) -> Iterator[None]:
+    # reapy.undo_block always records on the current tab; use the selected one
+    project = selected_project()
+    if project is None:
+        with reapy.undo_block(undo_name, -1):
+            yield
+        return
+    reapy.reascript_api.Undo_BeginBlock2(project.id)
+    try:
+        yield
+    finally:
+        reapy.reascript_api.Undo_EndBlock2(project.id, undo_name, -1)
+
+
+@contextmanager
+def bridge_batch(undo_name: Optional[str] = None) -> Iterator[None]:
+    """Run a block of reapy calls as one held bridge session.
+
+    Holds REAPER's defer loop for the duration of the block (so the calls are not
+    interleaved with REAPER's UI work), suspends UI refresh, and when ``undo_name``
+    is given records everything as a single undo point of the selected project tab.
+    With several REAPER instances configured, the instance's connection is held
+    exclusively meanwhile.
+    """
+    with pool.exclusive(), reapy.inside_reaper():
+        with reapy.prevent_ui_refresh():
+            if undo_name:
+                with _undo_block(undo_name):
+                    yield
+            else:
+                yield
+
+
+def select_fields(fields: Optional[Iterable[str]], valid: tuple, default: tuple) -> tuple:
+    """Validate a field projection; returns the selected fields in ``valid`` order."""
+    if not fields:
+        return default
+    unknown = sorted(set(fields) - set(valid))
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)} (valid: {', '.join(valid)})")
+    return tuple(f for f in valid if f in set(fields))
+
+
+def paginate(
+    rows: Iterable[Any],
+    key: str,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    name_filter: Optional[str] = None,
+    fields: Optional[tuple] = None,
+    name_key: str = "name",
+    count_total: bool = True,
+) -> Dict[str, Any]:
+    """Return one page of ``rows`` as ``{key: [...], "total", "offset", "next_offset"}``.
+
+    Rows are consumed lazily: only the page is materialized, and with ``count_total``
+    False iteration stops right after it (``total`` is then omitted). ``name_filter``
+    matches case-insensitively against ``row[name_key]`` (or the row itself for
+    strings); ``fields`` trims dict rows to those keys plus "index".
+    ``next_offset`` is None on the last page.
+    """
+    offset = max(0, int(offset))
+    if limit is not None:
+        limit = max(0, int(limit))
+    if name_filter:
+        needle = name_filter.lower()
+        rows = (
+            r for r in rows
+            if needle in (r if isinstance(r, str) else str(r.get(name_key) or "")).lower()
+        )
+    it = iter(rows)
+    skipped = sum(1 for _ in islice(it, offset))
+    page = list(islice(it, limit)) if limit is not None else list(it)
+    if fields is not None:
+        keep = ("index",) + tuple(fields)
+        page = [{f: r[f] for f in keep if f in r} for r in page]
+    result: Dict[str, Any] = {key: page, "offset": offset}
+    if count_total:
+        total = skipped + len(page) + sum(1 for _ in it)
+        result["total"] = total
+        has_more = offset + len(page) < total
+    else:
+        has_more = limit is not None and next(it, None) is not None
+    result["next_offset"] = offset + len(page) if has_more else None
+    return result
+
+
+def _validate_track_spec(spec: Mapping[str, Any]) -> None:
+    color = spec.get("color")
+    if color is not None:
+        if len(color) != 3 or any(not 0 <= int(c) <= 255 for c in color):
+            raise ValueError(f"color must be an [r, g, b] triplet of 0-255 values, got {color}")
+    depth = spec.get("depth")
+    if depth is not None and not -64 <= int(depth) <= 1:
+        raise ValueError(f"depth must be between -64 and 1, got {depth}")
+
+
+def insert_tracks(project, specs: Iterable[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+    """Insert one track per spec (``name``, ``index``, ``color`` as [r, g, b], folder ``depth``).
+
+    Each spec's index is applied in order, as if the tracks were created one by one;
+    entries without an index are appended. Meant to run inside ``bridge_batch``.
+    Returns the created tracks with their final indices.
+    """
+    specs = list(specs)
+    for spec in specs:
+        _validate_track_spec(spec)
+    RPR = reapy.reascript_api
+    n = RPR.CountTracks(project.id)
+    created = []
+    for spec in specs:
+        index = spec.get("index")
+        idx = max(0, min(int(index) if index is not None else n, n))
+        # InsertTrackAtIndex has no project argument
+        with as_current_project(project):
+            RPR.InsertTrackAtIndex(idx, True)
+        n += 1
+        track_id = RPR.GetTrack(project.id, idx)
+        name = str(spec.get("name") or "")
+        if name:
+            RPR.GetSetMediaTrackInfo_String(track_id, "P_NAME", name, True)
+        if spec.get("color") is not None:
+            RPR.SetTrackColor(track_id, RPR.ColorToNative(*(int(c) for c in spec["color"])))
+        if spec.get("depth") is not None:
+            RPR.SetMediaTrackInfo_Value(track_id, "I_FOLDERDEPTH", int(spec["depth"]))
+        created.append((track_id, name))
+    # Later inserts may have shifted earlier ones; read back the final positions
+    return [
+        {"index": int(RPR.GetMediaTrackInfo_Value(track_id, "IP_TRACKNUMBER")) - 1, "name": name}
+        for track_id, name in created
+    ]
+
+
+def remove_tracks(project, indices: Iterable[int]) -> int:
+    """Delete the tracks at ``indices`` (highest first, so indices stay valid); returns the count.
+
+    Raises IndexError before deleting anything if an index is out of range. Meant to
+    run inside ``bridge_batch``.
+    """
+    RPR = reapy.reascript_api
+    n = RPR.CountTracks(project.id)
+    targets = sorted({int(i) for i in indices}, reverse=True)
+    for i in targets:
+        if i < 0 or i >= n:
+            raise IndexError(f"Track index out of range: {i} (valid: 0-{n-1})")
+    for i in targets:
+        RPR.DeleteTrack(RPR.GetTrack(project.id, i))
+    return len(targets)
+
+
+@dataclass(slots=True)
 class Note:
     start: float  # seconds
     end: float  # seconds
@@ -44,10 +426,147 @@ class Note:
     channel: int = 0  # 0-15
 
 
+def _midi_column(name: str, values: Iterable[Any], low: int, high: int) -> array:
+    """Round values to integers and pack them as a uint8 column, checking ``low..high``."""
+    col = [int(round(float(v))) for v in values]
+    if col and (min(col) < low or max(col) > high):
+        raise ValueError(f"{name} must be {low}-{high}")
+    return array("B", col)
+
+
+class NoteBuffer:
+    """Columnar note storage backed by typed arrays (times in seconds).
+
+    Accepts the three payload shapes ``add_midi_to_track`` understands: a list of
+    per-note dicts, parallel column lists, or a packed little-endian binary buffer::
+
+        uint32 count
+        float64 start[count], float64 end[count]
+        uint8 pitch[count], uint8 velocity[count], uint8 channel[count]
+    """
+
+    __slots__ = ("start", "end", "pitch", "velocity", "channel")
+
+    _HEADER = struct.Struct("<I")
+
+    def __init__(self) -> None:
+        self.start = array("d")
+        self.end = array("d")
+        self.pitch = array("B")
+        self.velocity = array("B")
+        self.channel = array("B")
+
+    def __len__(self) -> int:
+        return len(self.pitch)
+
+    def append(self, start: float, end: float, pitch: int, velocity: int = 100, channel: int = 0) -> None:
+        self.start.append(start)
+        self.end.append(end)
+        self.pitch.append(pitch)
+        self.velocity.append(velocity)
+        self.channel.append(channel)
+
+    def validate(self) -> None:
+        """Raise ValueError if columns differ in length or hold out-of-range values."""
+        n = len(self.pitch)
+        if not (len(self.start) == len(self.end) == len(self.velocity) == len(self.channel) == n):
+            raise ValueError("Note columns must all have the same length")
+        if n and max(self.pitch) > 127:
+            raise ValueError("pitch must be 0-127")
+        if n and (min(self.velocity) < 1 or max(self.velocity) > 127):
+            raise ValueError("velocity must be 1-127")
+        if n and max(self.channel) > 15:
+            raise ValueError("channel must be 0-15")
+
+    @property
+    def max_end(self) -> float:
+        return max(self.end, default=0.0)
+
+    @classmethod
+    def from_dicts(cls, notes: Iterable[Mapping[str, Any]]) -> "NoteBuffer":
+        notes = list(notes)
+        starts = [float(nd.get("start", 0.0)) for nd in notes]
+        return cls.from_columns({
+            "start": starts,
+            "end": [float(nd.get("end", start + 0.25)) for nd, start in zip(notes, starts)],
+            "pitch": [nd.get("pitch", 60) for nd in notes],
+            "velocity": [nd.get("velocity", 100) for nd in notes],
+            "channel": [nd.get("channel", 0) for nd in notes],
+        })
+
+    @classmethod
+    def from_columns(cls, columns: Mapping[str, Union[List[float], List[int], float, int]]) -> "NoteBuffer":
+        """Build from parallel lists; velocity and channel may also be a single scalar.
+
+        Pitch, velocity and channel values are rounded to the nearest integer.
+        """
+        buf = cls()
+        try:
+            buf.start = array("d", columns["start"])
+            buf.end = array("d", columns["end"])
+            buf.pitch = _midi_column("pitch", columns["pitch"], 0, 127)
+        except KeyError as e:
+            raise ValueError(f"Missing note column: {e.args[0]}") from None
+        n = len(buf.pitch)
+        for name, default, low, high in (("velocity", 100, 1, 127), ("channel", 0, 0, 15)):
+            col = columns.get(name, default)
+            setattr(buf, name, _midi_column(name, [col] * n if isinstance(col, (int, float)) else col, low, high))
+        buf.validate()
+        return buf
+
+    @classmethod
+    def from_packed(cls, data: bytes) -> "NoteBuffer":
+        (n,) = cls._HEADER.unpack_from(data)
+        if len(data) != cls._HEADER.size + 19 * n:
+            raise ValueError(f"Packed note buffer has wrong size for {n} notes")
+        buf = cls()
+        offset = cls._HEADER.size
+        for name, typecode, width in (("start", "d", 8), ("end", "d", 8), ("pitch", "B", 1),
+                                      ("velocity", "B", 1), ("channel", "B", 1)):
+            col = array(typecode)
+            col.frombytes(data[offset:offset + width * n])
+            if width > 1 and sys.byteorder != "little":
+                col.byteswap()
+            setattr(buf, name, col)
+            offset += width * n
+        buf.validate()
+        return buf
+
+    def to_packed(self) -> bytes:
+        starts, ends = array("d", self.start), array("d", self.end)
+        if sys.byteorder != "little":
+            starts.byteswap()
+            ends.byteswap()
+        return b"".join((
+            self._HEADER.pack(len(self)),
+            starts.tobytes(), ends.tobytes(),
+            self.pitch.tobytes(), self.velocity.tobytes(), self.channel.tobytes(),
+        ))
+
+
 __all__ = [
     "PACKAGE_DIR",
+    "DATA_DIR",
     "SAMPLE_DIRS_FILE",
+    "SampleDirStore",
+    "sample_dir_store",
     "_load_sample_dirs",
     "_save_sample_dirs",
+    "as_current_project",
+    "bridge_batch",
+    "insert_tracks",
+    "paginate",
+    "cache_scope",
+    "current_project",
+    "list_open_projects",
+    "note_local_write",
+    "project_cache_key",
+    "project_state_version",
+    "remove_tracks",
+    "resolve_project",
+    "selected_project",
+    "use_project",
+    "select_fields",
     "Note",
+    "NoteBuffer",
 ]
@@ -0,0 +1,4 @@
+import os
+
+# Importing the tool modules must not require a running REAPER
+os.environ.setdefault("REAPER_MCP_CONFIGURE_REAPER", "0")
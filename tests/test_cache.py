@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+
+import pytest
+
+from reaper_mcp.cache import DiskLRUCache, LRUCache, single_flight
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert "b" not in cache and cache.get("a") == 1 and cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_disk_lru_cache_evicts_by_size_and_recency(tmp_path):
+    cache = DiskLRUCache(tmp_path, max_bytes=10)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    # Reads refresh recency through the file's mtime
+    past = time.time() - 100
+    for path in tmp_path.iterdir():
+        os.utime(path, (past, past))
+    assert cache.get("a") == b"aaaa"
+    cache.put("c", b"cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa" and cache.get("c") == b"cccc"
+    assert cache.get("missing") is None
+
+
+def test_single_flight_shares_one_execution():
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    @single_flight()
+    def read(x, y=1):
+        calls.append(x)
+        started.set()
+        release.wait(5)
+        return {"value": x + y}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(read(1)))
+    leader.start()
+    started.wait(5)
+    waiters = [threading.Thread(target=lambda: results.append(read(1, y=1))) for _ in range(3)]
+    for t in waiters:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in [leader, *waiters]:
+        t.join(5)
+    assert calls == [1]
+    assert results == [{"value": 2}] * 4
+    # Nothing is kept once the flight lands (no ttl)
+    assert read(1) == {"value": 2} and calls == [1, 1]
+
+
+def test_single_flight_ttl_skips_error_results():
+    calls = []
+
+    @single_flight(ttl=60)
+    def read(x):
+        calls.append(x)
+        return {"error": "nope"} if x < 0 else {"value": x}
+
+    assert read(2) == read(2) == {"value": 2}
+    read(-1)
+    read(-1)
+    assert calls == [2, -1, -1]
+    read.cache_clear()
+    read(2)
+    assert calls[-1] == 2 and len(calls) == 4
+
+
+def test_single_flight_propagates_exceptions():
+    @single_flight()
+    def read():
+        raise KeyError("gone")
+
+    with pytest.raises(KeyError):
+        read()
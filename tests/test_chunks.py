@@ -0,0 +1,71 @@
+import re
+
+from reaper_mcp.chunks import apply_fx_chain, extract_fx_chain, find_block, regenerate_guids, split_blocks
+
+TRACK = """<TRACK {11111111-1111-1111-1111-111111111111}
+  NAME Keys
+  <FXCHAIN
+    WNDRECT 0 0 0 0
+    SHOW 0
+    LASTSEL 0
+    DOCKED 0
+    BYPASS 0 0 0
+    <JS loser/3BandEQ ""
+      0 0 0
+    >
+    FXID {AAAAAAAA-AAAA-AAAA-AAAA-AAAAAAAAAAAA}
+  >
+  <ITEM
+    POSITION 0
+    IGUID {CCCCCCCC-CCCC-CCCC-CCCC-CCCCCCCCCCCC}
+    <SOURCE MIDI
+      E 0 90 3c 60
+    >
+  >
+>
+"""
+
+GUID = re.compile(r"\{[0-9A-F-]{36}\}")
+
+
+def test_split_blocks_returns_whole_blocks_of_tag():
+    template = TRACK + "<TRACKER\n>\n" + TRACK.replace("Keys", "Pad")
+    blocks = split_blocks(template, "TRACK")
+    assert len(blocks) == 2
+    assert blocks[0] == TRACK.rstrip("\n")
+    assert "NAME Pad" in blocks[1]
+    assert split_blocks("NAME x\n", "TRACK") == []
+
+
+def test_find_block_spans_direct_children():
+    start, end = find_block(TRACK, "FXCHAIN")
+    assert TRACK[start:end].lstrip().startswith("<FXCHAIN")
+    assert TRACK[start:end].rstrip().endswith(">")
+    assert TRACK[end:].lstrip().startswith("<ITEM")
+    # SOURCE is nested inside ITEM, not a direct child of the track
+    assert find_block(TRACK, "SOURCE") is None
+    assert find_block(TRACK, "FX") is None
+
+
+def test_regenerate_guids_is_consistent_within_chunk():
+    chunk = TRACK + "AUXRECV {11111111-1111-1111-1111-111111111111}\n" + TRACK.lower()
+    out = regenerate_guids(chunk)
+    old, new = GUID.findall(chunk.upper()), GUID.findall(out)
+    assert len(old) == len(new)
+    assert not set(old) & set(new)
+    # The same old GUID (in any case) always maps to the same new one
+    assert len({(o, n) for o, n in zip(old, new)}) == len(set(old)) == len(set(new))
+
+
+def test_fx_chain_round_trip():
+    chain = extract_fx_chain(TRACK)
+    assert chain.splitlines()[0] == "BYPASS 0 0 0"
+    assert "WNDRECT" not in chain and "SHOW" not in chain
+    replaced = apply_fx_chain(TRACK, chain)
+    assert "{AAAAAAAA-AAAA-AAAA-AAAA-AAAAAAAAAAAA}" not in replaced
+    assert extract_fx_chain(replaced).count("<JS") == 1
+    assert extract_fx_chain(apply_fx_chain(TRACK, chain, append=True)).count("<JS") == 2
+    # Without an FX chain, a new one is inserted before the items
+    bare = TRACK[:find_block(TRACK, "FXCHAIN")[0]] + TRACK[find_block(TRACK, "FXCHAIN")[1]:]
+    added = apply_fx_chain(bare, chain)
+    assert find_block(added, "FXCHAIN")[1] == find_block(added, "ITEM")[0]
@@ -0,0 +1,127 @@
+import numpy as np
+import pytest
+
+from reaper_mcp import envelopes
+from reaper_mcp.envelopes import SHAPES, generate_curve, thin_points
+
+
+def lfo(kind, **spec):
+    return generate_curve({"type": kind, "start": 0.0, "end": 2.0, "from": 0.0, "to": 1.0, **spec})
+
+
+@pytest.mark.parametrize("kind", ["sine", "triangle", "square", "saw"])
+@pytest.mark.parametrize("phase", [0.0, 0.25, 0.5, 0.8])
+@pytest.mark.parametrize("freq", [0.8, 1.0, 3.0])
+def test_lfo_spans_exactly_start_to_end(kind, phase, freq):
+    t, y, s = lfo(kind, phase=phase, frequency=freq)
+    assert t[0] == pytest.approx(0.0)
+    assert t[-1] == pytest.approx(2.0)
+    assert np.all(np.diff(t) >= 0)
+    assert np.all((y >= 0.0) & (y <= 1.0))
+    assert len(t) == len(y) == len(s)
+
+
+def test_triangle_phase_shifts_values():
+    t, y, _ = lfo("triangle")
+    assert t.tolist() == pytest.approx([0.0, 0.5, 1.0, 1.5, 2.0])
+    assert y.tolist() == [0.0, 1.0, 0.0, 1.0, 0.0]
+    _, y_half, _ = lfo("triangle", phase=0.5)
+    assert y_half.tolist() == [1.0, 0.0, 1.0, 0.0, 1.0]
+
+
+def test_triangle_does_not_overshoot_end():
+    t, y, _ = generate_curve({"type": "triangle", "start": 0.0, "end": 1.0, "frequency": 0.8})
+    assert t.tolist() == pytest.approx([0.0, 0.625, 1.0])
+    # 0.8 cycles: 0.375 s after the peak, on the way down
+    assert y.tolist() == pytest.approx([0.0, 1.0, 0.4])
+
+
+def test_saw_with_phase_starts_mid_ramp():
+    t, y, s = lfo("saw", phase=0.25)
+    assert t[0] == 0.0 and y[0] == pytest.approx(0.25)
+    jumps = t[(s == SHAPES["square"])]
+    assert jumps.tolist() == pytest.approx([0.75, 1.75], abs=1e-5)
+    assert t[-1] == 2.0 and y[-1] == pytest.approx(0.25)
+
+
+def test_saw_full_cycles_end_on_top():
+    t, y, _ = lfo("saw")
+    assert t.tolist() == pytest.approx([0.0, 1.0, 1.0, 2.0], abs=1e-5)
+    assert y.tolist() == [0.0, 1.0, 0.0, 1.0]
+
+
+def test_square_phase_shifts_levels():
+    t, y, s = lfo("square", phase=0.25)
+    assert t.tolist() == pytest.approx([0.0, 0.25, 0.75, 1.25, 1.75, 2.0])
+    assert y.tolist() == [1.0, 0.0, 1.0, 0.0, 1.0, 1.0]
+    assert np.all(s == SHAPES["square"])
+
+
+def test_sine_phase():
+    t, y, _ = lfo("sine", phase=0.25, frequency=1.0)
+    assert y[0] == pytest.approx(1.0)
+    assert np.interp(0.5, t, y) == pytest.approx(0.0, abs=1e-3)
+
+
+def test_ramps():
+    t, y, s = generate_curve({"type": "linear", "start": 1.0, "end": 3.0, "from": 0.2, "to": 0.8})
+    assert t.tolist() == [1.0, 3.0] and y.tolist() == [0.2, 0.8]
+    t, y, _ = generate_curve({"type": "exponential", "start": 0.0, "end": 1.0, "resolution": 10})
+    assert len(t) == 11 and y[0] == 0.0 and y[-1] == pytest.approx(1.0)
+    assert np.all(np.diff(y) > 0)
+
+
+@pytest.mark.parametrize(
+    "spec",
+    [
+        {"type": "nope", "start": 0, "end": 1},
+        {"type": "linear", "start": 1, "end": 1},
+        {"type": "sine", "start": 0, "end": 1, "frequency": 0},
+    ],
+)
+def test_invalid_specs(spec):
+    with pytest.raises(ValueError):
+        generate_curve(spec)
+
+
+def test_thin_points_drops_collinear_points():
+    t = np.linspace(0.0, 1.0, 11)
+    keep = thin_points(t, 2.0 * t, 1e-9)
+    assert keep.tolist() == [0, 10]
+
+
+def test_thin_points_keeps_corners_within_tolerance():
+    t = np.linspace(0.0, 2.0, 201)
+    y = 1.0 - np.abs(t - 1.0)
+    keep = thin_points(t, y, 1e-6)
+    assert keep.tolist() == [0, 100, 200]
+    t_s = np.linspace(0.0, 1.0, 500)
+    y_s = np.sin(2 * np.pi * t_s)
+    keep = thin_points(t_s, y_s, 0.01)
+    assert len(keep) < len(t_s) // 5
+    assert np.max(np.abs(np.interp(t_s, t_s[keep], y_s[keep]) - y_s)) <= 0.01 + 1e-12
+
+
+def test_thin_points_disabled():
+    t = np.linspace(0.0, 1.0, 5)
+    assert thin_points(t, t, 0.0).tolist() == [0, 1, 2, 3, 4]
+    assert thin_points(t[:2], t[:2], 1.0).tolist() == [0, 1]
+
+
+def test_scale_to_envelope_mode_samples_reaper_once(monkeypatch):
+    calls = []
+
+    class FakeRPR:
+        @staticmethod
+        def ScaleToEnvelopeMode(mode, value):
+            calls.append(value)
+            return 1000.0 * (value / 4.0) ** 0.25
+
+    monkeypatch.setattr(envelopes, "RPR", FakeRPR)
+    monkeypatch.setattr(envelopes, "_scale_tables", {})
+    values = np.array([0.0, 0.001, 0.5, 1.0, 2.0])
+    scaled = envelopes._scale_to_envelope_mode(1, values)
+    assert scaled == pytest.approx(1000.0 * (values / 4.0) ** 0.25, rel=1e-4)
+    n = len(calls)
+    envelopes._scale_to_envelope_mode(1, values)
+    assert len(calls) == n
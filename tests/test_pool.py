@@ -0,0 +1,111 @@
+import pytest
+from reapy.errors import DistError
+
+from reaper_mcp import pool as pool_module
+from reaper_mcp.pool import CLOSED, HALF_OPEN, OPEN, BridgeUnavailable, Instance, is_idempotent, parse_instances
+
+READ = {"name": "CountTracks"}
+WRITE = {"name": "SetMediaTrackInfo_Value"}
+
+
+class FakeClient:
+    def __init__(self):
+        self.results = []
+        self.sent = []
+
+    def send_request(self, function, input=None):
+        self.sent.append(function)
+        result = self.results.pop(0)
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def instance(monkeypatch):
+    monkeypatch.setattr(pool_module, "BREAKER_THRESHOLD", 2)
+    monkeypatch.setattr(pool_module, "BREAKER_COOLDOWN", 60.0)
+    inst = Instance("test", "localhost", 1)
+    inst.read_retries = 0
+    client = FakeClient()
+    inst.connect = lambda: client
+    inst.fake = client
+    return inst
+
+
+def test_success_keeps_breaker_closed(instance):
+    instance.fake.results = [3]
+    assert instance.request(READ) == 3
+    assert (instance.state, instance.healthy, instance.requests) == (CLOSED, True, 1)
+
+
+def test_breaker_opens_after_threshold_and_fails_fast(instance):
+    instance.fake.results = [OSError("reset"), OSError("reset")]
+    with pytest.raises(ConnectionError, match="Lost connection"):
+        instance.request(WRITE)
+    assert instance.state == CLOSED and not instance.healthy
+    with pytest.raises(ConnectionError):
+        instance.request(WRITE)
+    assert instance.state == OPEN
+    with pytest.raises(BridgeUnavailable, match="circuit open after 2 failures"):
+        instance.request(READ)
+    # Fail-fast requests never reach the bridge
+    assert len(instance.fake.sent) == 2
+    assert instance.status()["retry_in"] > 0
+
+
+def test_half_open_probe_closes_or_reopens(instance, monkeypatch):
+    instance.fake.results = [OSError(), OSError()]
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            instance.request(WRITE)
+    monkeypatch.setattr(pool_module, "BREAKER_COOLDOWN", 0.0)
+    # A failed probe reopens the breaker straight away
+    instance.fake.results = [OSError()]
+    with pytest.raises(ConnectionError):
+        instance.request(READ)
+    assert instance.state == OPEN
+    instance.fake.results = [7]
+    assert instance.request(READ) == 7
+    assert (instance.state, instance.consecutive_failures) == (CLOSED, 0)
+
+
+def test_probe_admits_one_request(instance):
+    instance.state = OPEN
+    instance._opened_at = -1e9
+    instance._admit()
+    assert instance.state == HALF_OPEN
+    with pytest.raises(BridgeUnavailable):
+        instance._admit()
+
+
+def test_reaper_errors_do_not_count_as_failures(instance):
+    instance.fake.results = [DistError("boom"), DistError("boom"), DistError("boom")]
+    for _ in range(3):
+        with pytest.raises(DistError):
+            instance.request(WRITE)
+    assert (instance.state, instance.healthy) == (CLOSED, True)
+
+
+def test_reads_are_retried(instance, monkeypatch):
+    monkeypatch.setattr(pool_module.time, "sleep", lambda s: None)
+    instance.read_retries = 1
+    instance.fake.results = [OSError(), 5]
+    assert instance.request(READ) == 5
+    instance.fake.results = [OSError()]
+    with pytest.raises(ConnectionError):
+        instance.request(WRITE)
+    assert is_idempotent(READ) and not is_idempotent(WRITE) and not is_idempotent("HOLD")
+
+
+def test_parse_instances():
+    a, b = parse_instances("main=localhost:8080, 10.0.0.2:8081")
+    assert (a.name, a.host, a.port) == ("main", "localhost", 8080)
+    assert (b.name, b.host, b.port) == ("10.0.0.2:8081", "10.0.0.2", 8081)
+    with pytest.raises(ValueError, match="Duplicate"):
+        parse_instances("a=h:1,a=h:2")
+    with pytest.raises(ValueError, match="Invalid"):
+        parse_instances("nohost")
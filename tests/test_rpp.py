@@ -0,0 +1,130 @@
+import pytest
+
+from reaper_mcp.rpp import parse_rpp, split_rpp_line
+
+PROJECT = """<REAPER_PROJECT 0.1 "7.0/linux-x86_64" 1700000000
+  TEMPO 96 4 4
+  MARKER 1 2.5 "Verse" 0 0 1
+  MARKER 2 4 "Chorus" 1 0 1
+  MARKER 2 8 "" 1
+  <TEMPOENVEX
+    PT 0 96 1 262148
+    PT 10 120 0
+  >
+  <TRACK {11111111-1111-1111-1111-111111111111}
+    NAME "Lead Vox"
+    PEAKCOL 16576
+    VOLPAN 0.5 -0.25 -1 -1 1
+    MUTESOLO 1 2 0
+    ISBUS 1 1
+    REC 1 0 1 0 0 0 0 0
+    TRACKID {11111111-1111-1111-1111-111111111111}
+    <FXCHAIN
+      SHOW 0
+      BYPASS 0 0 0
+      <VST "VST: ReaEQ (Cockos)" reaeq.so 0 "" 1919247729<56535472656571726561657100000000>
+        ZXE=
+      >
+      FXID {AAAAAAAA-AAAA-AAAA-AAAA-AAAAAAAAAAAA}
+      BYPASS 1 0 0
+      <JS loser/3BandEQ ""
+        0 0 0
+      >
+      FXID {BBBBBBBB-BBBB-BBBB-BBBB-BBBBBBBBBBBB}
+    >
+    <ITEM
+      POSITION 1
+      LENGTH 2
+      MUTE 1 0
+      IGUID {CCCCCCCC-CCCC-CCCC-CCCC-CCCCCCCCCCCC}
+      NAME first
+      <SOURCE WAVE
+        FILE "a b.wav"
+      >
+      TAKE SEL
+      NAME `second take`
+      <SOURCE MIDI
+        HASDATA 1 960 QN
+        E 0 90 3c 60
+      >
+    >
+  >
+  <TRACK {22222222-2222-2222-2222-222222222222}
+    NAME Bus
+    PEAKCOL 16777471
+    AUXRECV 0 0 0.7 0.1 1 0 0 0 0 -1:U 0 -1 ''
+  >
+>
+"""
+
+
+@pytest.fixture
+def project(tmp_path):
+    path = tmp_path / "song.rpp"
+    path.write_text(PROJECT, encoding="utf-8")
+    return parse_rpp(str(path))
+
+
+def test_split_rpp_line_quoting():
+    assert split_rpp_line('NAME "a b" \'c d\' `e "f"` g') == ["NAME", "a b", "c d", 'e "f"', "g"]
+    assert split_rpp_line("  A\tB  ") == ["A", "B"]
+    assert split_rpp_line('X "unterminated') == ["X", "unterminated"]
+
+
+def test_project_section(project, tmp_path):
+    assert project["project"] == {"name": "song.rpp", "path": str(tmp_path), "bpm": 96.0, "length": 3.0}
+    assert project["tempo"] == [
+        {"time": 0.0, "bpm": 96.0, "num": 4, "denom": 4, "linear": False},
+        {"time": 10.0, "bpm": 120.0, "num": 0, "denom": 0, "linear": True},
+    ]
+
+
+def test_markers_and_regions(project):
+    assert [(m["number"], m["region"], m["position"], m["end"], m["name"]) for m in project["markers"]] == [
+        (1, False, 2.5, None, "Verse"),
+        (2, True, 4.0, 8.0, "Chorus"),
+    ]
+
+
+def test_track_fields(project):
+    vox, bus = project["tracks"]
+    assert vox["guid"] == "{11111111-1111-1111-1111-111111111111}"
+    assert (vox["name"], vox["volume"], vox["pan"]) == ("Lead Vox", 0.5, -0.25)
+    assert (vox["mute"], vox["solo"], vox["armed"], vox["depth"]) == (True, 2, True, 1)
+    # PEAKCOL without the custom color flag is no color, like I_CUSTOMCOLOR
+    assert vox["color"] == 0
+    assert (bus["name"], bus["color"]) == ("Bus", 0x1000000 | 255)
+
+
+def test_fx_chain(project):
+    assert project["tracks"][0]["fx"] == [
+        {"index": 0, "guid": "{AAAAAAAA-AAAA-AAAA-AAAA-AAAAAAAAAAAA}", "name": "VST: ReaEQ (Cockos)", "enabled": True},
+        {"index": 1, "guid": "{BBBBBBBB-BBBB-BBBB-BBBB-BBBBBBBBBBBB}", "name": "JS: loser/3BandEQ", "enabled": False},
+    ]
+
+
+def test_item_uses_active_take(project):
+    (item,) = project["tracks"][0]["items"]
+    assert item == {
+        "index": 0,
+        "guid": "{CCCCCCCC-CCCC-CCCC-CCCC-CCCCCCCCCCCC}",
+        "position": 1.0,
+        "length": 2.0,
+        "mute": True,
+        "name": "second take",
+        "source": "",
+        "midi": True,
+    }
+
+
+def test_sends_come_from_receives(project):
+    vox, bus = project["tracks"]
+    assert vox["sends"] == [{
+        "index": 0,
+        "dest": 1,
+        "dest_guid": bus["guid"],
+        "volume": 0.7,
+        "pan": 0.1,
+        "mute": True,
+    }]
+    assert bus["sends"] == []
@@ -0,0 +1,67 @@
+import pytest
+
+from reaper_mcp.snapshot import DEFAULT_FIELDS, diff_snapshots, resolve_fields
+
+
+def test_resolve_fields_defaults():
+    assert resolve_fields(None) == DEFAULT_FIELDS
+    assert resolve_fields([]) == DEFAULT_FIELDS
+
+
+def test_resolve_fields_projections():
+    assert resolve_fields(["volume", "name"]) == {"track": ("name", "volume")}
+    assert resolve_fields(["items.position", "markers"]) == {
+        "items": ("position",),
+        "track": ("items",),
+        "markers": DEFAULT_FIELDS["markers"],
+    }
+    # A bare collection pulls in all of its fields; fx.params is opt-in
+    assert resolve_fields(["fx"])["fx"] == DEFAULT_FIELDS["fx"]
+    assert resolve_fields(["fx.params", "fx.name"])["fx"] == ("name", "params")
+    full_tracks = resolve_fields(["tracks"])
+    assert full_tracks["track"] == DEFAULT_FIELDS["track"]
+    assert full_tracks["sends"] == DEFAULT_FIELDS["sends"]
+
+
+@pytest.mark.parametrize("fields", [["bogus"], ["items.bogus"], ["nope.name"]])
+def test_resolve_fields_rejects_unknown(fields):
+    with pytest.raises(ValueError):
+        resolve_fields(fields)
+
+
+def track(guid, **values):
+    return {"guid": guid, "name": guid, "volume": 1.0, "items": [], "fx": [], "sends": [], **values}
+
+
+def test_diff_snapshots():
+    old = {
+        "project": {"name": "a.rpp", "bpm": 120.0},
+        "tracks": [
+            track("A", items=[{"guid": "i1", "position": 0.0}, {"guid": "i2", "position": 1.0}]),
+            track("B"),
+        ],
+        "markers": [{"region": False, "number": 1, "position": 1.0}],
+        "tempo": [],
+    }
+    new = {
+        "project": {"name": "a.rpp", "bpm": 96.0},
+        "tracks": [
+            track("A", volume=0.5, items=[{"guid": "i1", "position": 2.0}]),
+            track("C"),
+        ],
+        "markers": [{"region": False, "number": 1, "position": 1.0}],
+        "tempo": [],
+    }
+    assert diff_snapshots(old, new) == {
+        "project": {"bpm": 96.0},
+        "tracks": {
+            "added": [track("C")],
+            "removed": [{"guid": "B"}],
+            "modified": [{
+                "guid": "A",
+                "volume": 0.5,
+                "items": {"removed": [{"guid": "i2"}], "modified": [{"guid": "i1", "position": 2.0}]},
+            }],
+        },
+    }
+    assert diff_snapshots(new, new) == {}
@@ -0,0 +1,93 @@
+import struct
+
+import pytest
+
+from reaper_mcp.util import NoteBuffer, paginate, select_fields
+
+ROWS = [{"index": i, "name": f"Track {i}", "volume": i / 10} for i in range(5)]
+
+
+def test_paginate_pages():
+    page = paginate(ROWS, "tracks", offset=1, limit=2)
+    assert [r["index"] for r in page["tracks"]] == [1, 2]
+    assert (page["offset"], page["total"], page["next_offset"]) == (1, 5, 3)
+    last = paginate(ROWS, "tracks", offset=3, limit=10)
+    assert [r["index"] for r in last["tracks"]] == [3, 4]
+    assert last["next_offset"] is None
+    assert paginate(ROWS, "tracks")["tracks"] == ROWS
+
+
+def test_paginate_filter_and_fields():
+    page = paginate(ROWS, "tracks", name_filter="TRACK 3", fields=("volume",))
+    assert page["tracks"] == [{"index": 3, "volume": 0.3}]
+    assert page["total"] == 1
+    names = paginate(["Kick", "Snare", "kick 2"], "names", name_filter="kick")
+    assert names["names"] == ["Kick", "kick 2"]
+
+
+def test_paginate_without_total_stops_after_page():
+    consumed = []
+
+    def rows():
+        for r in ROWS:
+            consumed.append(r["index"])
+            yield r
+
+    page = paginate(rows(), "tracks", limit=2, count_total=False)
+    assert "total" not in page and page["next_offset"] == 2
+    # One row past the page tells whether there is another page
+    assert consumed == [0, 1, 2]
+    assert paginate(iter(ROWS), "tracks", offset=3, limit=2, count_total=False)["next_offset"] is None
+
+
+def test_select_fields():
+    valid = ("name", "volume", "pan")
+    assert select_fields(None, valid, ("name",)) == ("name",)
+    assert select_fields(["pan", "name"], valid, ("name",)) == ("name", "pan")
+    with pytest.raises(ValueError, match="bogus"):
+        select_fields(["bogus"], valid, ("name",))
+
+
+def test_note_buffer_from_columns_rounds_and_broadcasts():
+    buf = NoteBuffer.from_columns({"start": [0, 1], "end": [0.5, 1.5], "pitch": [60.4, 61.6], "velocity": 99.7})
+    assert len(buf) == 2
+    assert list(buf.pitch) == [60, 62]
+    assert list(buf.velocity) == [100, 100]
+    assert list(buf.channel) == [0, 0]
+    assert buf.max_end == 1.5
+
+
+@pytest.mark.parametrize(
+    "column",
+    [{"pitch": [128]}, {"pitch": [-1]}, {"velocity": [0]}, {"velocity": 128}, {"channel": [16]}],
+)
+def test_note_buffer_rejects_out_of_range(column):
+    with pytest.raises(ValueError):
+        NoteBuffer.from_columns({"start": [0], "end": [1], "pitch": [60], **column})
+
+
+def test_note_buffer_validates_shape():
+    with pytest.raises(ValueError, match="Missing note column"):
+        NoteBuffer.from_columns({"start": [0], "pitch": [60]})
+    with pytest.raises(ValueError, match="same length"):
+        NoteBuffer.from_columns({"start": [0, 1], "end": [1], "pitch": [60]})
+
+
+def test_note_buffer_from_dicts_defaults():
+    buf = NoteBuffer.from_dicts([{"start": 1.0, "pitch": 64.0}, {"start": 2, "end": 3, "velocity": 1, "channel": 9}])
+    assert list(buf.end) == [1.25, 3.0]
+    assert list(buf.pitch) == [64, 60]
+    assert list(buf.velocity) == [100, 1]
+    assert list(buf.channel) == [0, 9]
+
+
+def test_note_buffer_pack_round_trip():
+    buf = NoteBuffer.from_columns({"start": [0.0, 0.5], "end": [0.25, 1.0], "pitch": [36, 38], "velocity": [127, 64], "channel": 9})
+    data = buf.to_packed()
+    assert len(data) == 4 + 19 * 2
+    assert struct.unpack_from("<I", data) == (2,)
+    back = NoteBuffer.from_packed(data)
+    for name in NoteBuffer.__slots__:
+        assert list(getattr(back, name)) == list(getattr(buf, name))
+    with pytest.raises(ValueError, match="wrong size"):
+        NoteBuffer.from_packed(data[:-1])